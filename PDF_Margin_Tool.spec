@@ -5,7 +5,7 @@ a = Analysis(
     ['app.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('itu_cyber_bee.svg', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -26,7 +26,8 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # UPX ile sıkıştırılmış DLL'ler her açılışta çözülür (ve antivirüs taramasını uzatır)
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
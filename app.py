@@ -1,25 +1,89 @@
+import time
+_STARTED = time.perf_counter()  # Açılış ölçümü (--startup-benchmark) için, tüm import'lardan önce
+
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk, ImageEnhance, ImageDraw  # Görsel efektler için eklendi
+import importlib
+import importlib.util
+import json
 import os
+import queue
 import sys
-import tempfile
+import threading
 
-# Kütüphane Kontrolleri
-try:
-    import fitz  # PyMuPDF
-except ImportError:
+# Kütüphane Kontrolleri: sadece kurulu mu diye bakılır, yüklenmez (açılışı yavaşlatmasın).
+# PyMuPDF / pypdf / Pillow ilk kullanımda (veya ilk kareden sonra arka planda) yüklenir.
+if importlib.util.find_spec("fitz") is None:
     import tkinter.messagebox
     root = tk.Tk()
     root.withdraw()
     tkinter.messagebox.showerror("Missing Library", "Preview requires PyMuPDF.\nPlease run: pip install pymupdf")
     sys.exit()
 
-try:
-    from pypdf import PdfReader, PdfWriter, Transformation, PageObject
-except ImportError:
+if importlib.util.find_spec("pypdf") is None:
     sys.exit()
 
+from pdf_engine import BACKENDS
+from pdf_imposition import NUP_GRIDS, NUP_ORDERS, SHEET_SIZES
+from pdf_optimize import format_size
+from output_cache import OutputCache
+from pdf_pipeline import Booklet, Margin, NUp
+from pdf_pool import DocumentPool
+from pdf_trace import TRACER, profile, span
+from processing import ProcessingJob
+from page_grid import PageGrid
+from page_model import PageRecord, PageImageStore
+from page_preview import PreviewPane, ResultPage, SourcePage
+from thumb_cache import ThumbnailCache, default_cache_dir, file_digest
+from thumbnails import ThumbnailLoader
+
+_IMPORTED = time.perf_counter()
+
+THUMB_POLL_MS = 30       # Worker sonuçlarını kontrol etme aralığı
+THUMB_BATCH_SIZE = 64    # Her turda işlenecek en fazla sonuç
+DRAG_FRAME_MS = 16       # Sürükleme güncellemeleri ~60 FPS ile sınırlanır
+PROCESS_POLL_MS = 50     # İşlem ilerlemesini kontrol etme aralığı
+PRELOAD_DELAY_MS = 200   # İlk kareden sonra ağır kütüphanelerin arka planda yüklenmesi
+PREVIEW_DELAY_MS = 300   # Ayar / sıra değişince canlı önizleme bu kadar sessizlikten sonra yenilenir
+
+# İlk kullanımda yüklenen ağır kütüphaneler (açılış ölçümü bunların yüklenip yüklenmediğini de raporlar)
+HEAVY_MODULES = ("fitz", "pypdf", "PIL.Image", "PIL.ImageTk")
+
+LOGO_FILE = "itu_cyber_bee.svg"
+LOGO_HEIGHT = 40         # px
+LOGO_COLOR = "#cccccc"
+
+# İlerleme çubuğunda her aşamanın kapladığı yüzde aralığı
+PROCESS_STAGE_RANGES = {"read": (0, 10), "margin": (10, 80), "booklet": (10, 80), "pipeline": (10, 80),
+                        "write": (80, 90), "optimize": (90, 100)}
+PROCESS_STAGE_LABELS = {"read": "Reading pages", "margin": "Adding margin", "booklet": "Imposing booklet",
+                        "pipeline": "Composing pages", "write": "Writing output", "optimize": "Optimizing size"}
+
+
+def logo_cache_path(svg_path):
+    """Hazır logo PNG'sinin yolu; SVG içeriği, yükseklik veya renk değişince adı da değişir."""
+    key = f"{file_digest(svg_path)[:16]}_{LOGO_HEIGHT}_{LOGO_COLOR.lstrip('#')}"
+    return os.path.join(default_cache_dir(), f"logo_{key}.png")
+
+
+def write_startup_report(path):
+    """
+    İlk kare çizildiğinde çağrılır (--startup-benchmark). pdf_bench.py startup bu dosyayı
+    okur; first_frame duvar saatidir, böylece process'i başlatan taraf exe açılışı
+    (PyInstaller onefile) dahil toplam süreyi hesaplar.
+    """
+    now = time.perf_counter()
+    report = {
+        "first_frame": time.time(),
+        "import_seconds": round(_IMPORTED - _STARTED, 4),
+        "window_seconds": round(now - _IMPORTED, 4),
+        "frozen": bool(getattr(sys, "frozen", False)),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f)
+
+
 class PDFToolApp:
     def __init__(self, root):
         self.root = root
@@ -28,8 +92,13 @@ class PDFToolApp:
         
         # --- VERİ YAPISI ---
         # Sayfaları hafızada tutmak için liste. 
-        # Her eleman şöyledir: { 'file_path': str, 'page_num': int, 'thumb': PhotoImage, 'is_deleted': bool, 'id': str }
+        # Her eleman bir PageRecord'dur: (file_id, page_index, deleted, color_index)
+        # file_id -> self.files listesindeki dosya yolu
         self.pdf_pages = [] 
+        self.files = []
+        self.file_keys = {}  # file_id -> küçük resim önbelleği anahtarı (içerik hash'i, yoksa None)
+        # Küçük resimler (JPEG) + görünenler için PhotoImage; bütçeden taşan JPEG'ler diskten geri okunur
+        self.images = PageImageStore(reload=self.reload_thumbnail)
         self.batch_counter = 0
         self.file_colors = ["black", "#0038A8", "#D60270", "#9B4F96"]
         
@@ -37,13 +106,39 @@ class PDFToolApp:
         self.output_folder = tk.StringVar()
         self.margin_value = tk.IntVar(value=0)
         self.operation_mode = tk.StringVar(value="margin")
+        self.fast_margin = tk.BooleanVar(value=False)
+        self.low_memory = tk.BooleanVar(value=False)
+        self.optimize_output = tk.BooleanVar(value=False)
+        self.reuse_output = tk.BooleanVar(value=True)
+        self.sheet_size = tk.StringVar(value="A4")
+        self.signature_sheets = tk.IntVar(value=0)
+        self.nup_count = tk.IntVar(value=4)
+        self.nup_order = tk.StringVar(value="sequential")
+        self.backend = tk.StringVar(value="pypdf")
         
         # Sürükle-Bırak için geçici değişkenler
-        self.drag_data = {"item": None, "x": 0, "y": 0, "index": None, "target_index_visual": None}
+        self.drag_data = {"item": None, "x": 0, "y": 0, "index": None, "target_index_visual": None,
+                          "is_dragging": False, "frame_job": None}
         self.drag_window = None  # Sürükleme animasyonu için pencere
-        self.drop_indicator = None # Sürükleme sırasında araya giren çizgi
         self.last_clicked_index = None
 
+        # Küçük resimler ve çıktı aynı kaynak belgeleri paylaşır (her dosya bir kez açılır)
+        self.doc_pool = DocumentPool()
+
+        # Arka plan küçük resim yükleyicisi
+        self.thumb_loader = ThumbnailLoader(cache=ThumbnailCache(), pool=self.doc_pool)
+        self.load_jobs = {}  # job_id -> {"color_index": int, "file_id": int}
+        self.load_polling = False
+
+        # Arka plandaki çıktı işi (ProcessingJob); değişmeyen işler/kaynaklar önbellekten gelir
+        self.job = None
+        self.output_cache = OutputCache()
+
+        # Büyük önizleme: sağ tıklanan sayfa (PageRecord; sıralama değişse de takip edilir)
+        self.preview_record = None
+        self.preview_result = tk.BooleanVar(value=False)  # Sayfa yerine çıktıdaki halini göster
+        self.preview_job = None
+
         self.style = ttk.Style()
         self.style.configure('TButton', font=('Segoe UI', 9))
         self.style.configure('TLabel', font=('Segoe UI', 10))
@@ -66,26 +161,42 @@ class PDFToolApp:
         
         ttk.Button(top_frame, text="Clear All", command=self.clear_all).pack(side=tk.RIGHT, padx=5)
 
-        # --- Orta Panel (Önizleme / Reorder Alanı) ---
-        preview_frame = ttk.LabelFrame(self.root, text="Preview (Drag to Reorder | Click to Delete)", padding="10")
-        preview_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-
-        self.canvas = tk.Canvas(preview_frame, bg="#e0e0e0")
+        # --- Sayfa Araçları (Toplu işaretleme) ---
+        tools_frame = ttk.Frame(self.root, padding=(10, 0))
+        tools_frame.pack(fill=tk.X)
+        ttk.Button(tools_frame, text="Delete All", command=self.delete_all).pack(side=tk.LEFT, padx=5)
+        ttk.Button(tools_frame, text="Restore All", command=self.restore_all).pack(side=tk.LEFT, padx=5)
+        ttk.Button(tools_frame, text="Invert", command=self.invert_deleted).pack(side=tk.LEFT, padx=5)
+        self.btn_cancel_load = ttk.Button(tools_frame, text="Cancel Loading", command=self.cancel_loading, state="disabled")
+        self.btn_cancel_load.pack(side=tk.RIGHT, padx=5)
+
+        # --- Orta Panel (Önizleme / Reorder Alanı + Büyük Sayfa Görünümü) ---
+        panes = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
+        panes.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        preview_frame = ttk.LabelFrame(panes, text="Preview (Drag to Reorder | Click to Delete)", padding="10")
+        panes.add(preview_frame, weight=3)
+
+        self.canvas = tk.Canvas(preview_frame, bg="#e0e0e0", highlightthickness=0)
         scrollbar = ttk.Scrollbar(preview_frame, orient="vertical", command=self.canvas.yview)
         
-        # Sayfaların duracağı iç çerçeve
-        self.scrollable_frame = tk.Frame(self.canvas, bg="#e0e0e0")
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        # Sanal grid: Sadece görünen hücreler için widget tutulur
+        self.grid = PageGrid(self.canvas, scrollbar, self.describe_page,
+                             self.on_click, self.on_drag, self.on_drop, self.on_select)
 
         self.canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
+
+        # Sayfa görünümü: kareler (tile) arka planda, sadece görünen alan için render edilir
+        view_frame = ttk.LabelFrame(panes, text="Page View (Right-click a Page | Ctrl+Wheel to Zoom)", padding="5")
+        panes.add(view_frame, weight=2)
+        self.page_view = PreviewPane(view_frame)
+        self.page_view.frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Checkbutton(self.page_view.toolbar, text="Show result", variable=self.preview_result,
+                        command=self.update_preview).pack(side=tk.RIGHT)
+        # Çıktıyı etkileyen ayarlar değişince canlı önizleme yenilenir
+        for var in (self.margin_value, self.operation_mode, self.sheet_size, self.signature_sheets,
+                    self.nup_count, self.nup_order):
+            var.trace_add("write", lambda *_: self.schedule_preview(result_only=True))
         
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
 
@@ -95,14 +206,49 @@ class PDFToolApp:
 
         # Modlar
         ttk.Label(bottom_frame, text="Mode:", style='Header.TLabel').grid(row=0, column=0, sticky="w")
-        ttk.Radiobutton(bottom_frame, text="Add Margin", variable=self.operation_mode, value="margin", command=self.toggle_inputs).grid(row=1, column=0, sticky="w")
-        ttk.Radiobutton(bottom_frame, text="Booklet (2-up)", variable=self.operation_mode, value="booklet", command=self.toggle_inputs).grid(row=1, column=1, sticky="w")
+        modes_frame = ttk.Frame(bottom_frame)
+        modes_frame.grid(row=1, column=0, columnspan=2, sticky="w")
+        for text, value in (("Add Margin", "margin"), ("Booklet (2-up)", "booklet"),
+                            ("Margin + Booklet", "margin_booklet"), ("N-up", "nup")):
+            ttk.Radiobutton(modes_frame, text=text, variable=self.operation_mode, value=value,
+                            command=self.toggle_inputs).pack(side=tk.LEFT, padx=(0, 8))
         
         # Margin
         self.lbl_margin = ttk.Label(bottom_frame, text="Margin (pts):")
         self.lbl_margin.grid(row=2, column=0, sticky="w")
         self.spin_margin = ttk.Spinbox(bottom_frame, from_=0, to=200, textvariable=self.margin_value, width=5)
         self.spin_margin.grid(row=2, column=1, sticky="w")
+        # Hızlı mod döndürülmüş sayfaları yavaş modla aynı gösterir; kırpılmış sayfalarda
+        # CropBox dışındaki içerik payda görünebilir (bkz. pdf_engine.expand_page_for_margin)
+        self.chk_fast = ttk.Checkbutton(bottom_frame, text="Fast margin (no re-encode)", variable=self.fast_margin)
+        self.chk_fast.grid(row=2, column=2, sticky="w")
+        ttk.Checkbutton(bottom_frame, text="Low-memory output", variable=self.low_memory).grid(row=1, column=2, sticky="w")
+        ttk.Checkbutton(bottom_frame, text="Optimize size", variable=self.optimize_output).grid(row=0, column=2, sticky="w")
+
+        # Motor ve booklet seçenekleri
+        options_frame = ttk.Frame(bottom_frame)
+        options_frame.grid(row=3, column=0, columnspan=3, sticky="w", pady=(5, 0))
+        ttk.Label(options_frame, text="Engine:").pack(side=tk.LEFT)
+        ttk.Combobox(options_frame, textvariable=self.backend, values=list(BACKENDS),
+                     state="readonly", width=8).pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(options_frame, text="Sheet:").pack(side=tk.LEFT)
+        self.combo_sheet = ttk.Combobox(options_frame, textvariable=self.sheet_size, values=list(SHEET_SIZES),
+                                        state="readonly", width=7)
+        self.combo_sheet.pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(options_frame, text="Signature (sheets, 0 = single):").pack(side=tk.LEFT)
+        self.spin_signature = ttk.Spinbox(options_frame, from_=0, to=50, textvariable=self.signature_sheets, width=4)
+        self.spin_signature.pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(options_frame, text="N-up:").pack(side=tk.LEFT)
+        self.combo_nup = ttk.Combobox(options_frame, textvariable=self.nup_count, values=list(NUP_GRIDS),
+                                      state="readonly", width=3)
+        self.combo_nup.pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(options_frame, text="Order:").pack(side=tk.LEFT)
+        self.combo_nup_order = ttk.Combobox(options_frame, textvariable=self.nup_order, values=list(NUP_ORDERS),
+                                            state="readonly", width=11)
+        self.combo_nup_order.pack(side=tk.LEFT, padx=2)
+        ttk.Checkbutton(options_frame, text="Reuse unchanged output",
+                        variable=self.reuse_output).pack(side=tk.LEFT, padx=(10, 0))
+        self.toggle_inputs()
 
         # Process Button
         self.btn_process = ttk.Button(bottom_frame, text="PROCESS PDF", command=self.start_processing, width=25)
@@ -110,62 +256,144 @@ class PDFToolApp:
 
         # Status
         self.lbl_status = ttk.Label(bottom_frame, text="Ready. Load a PDF to start.", foreground="gray")
-        self.lbl_status.grid(row=3, column=0, columnspan=4, sticky="w", pady=10)
+        self.lbl_status.grid(row=4, column=0, columnspan=4, sticky="w", pady=10)
+
+        # İlerleme ve İptal
+        self.progress = ttk.Progressbar(bottom_frame, orient="horizontal", mode="determinate", maximum=100, length=400)
+        self.progress.grid(row=5, column=0, columnspan=3, sticky="we")
+        self.btn_cancel_job = ttk.Button(bottom_frame, text="Cancel", command=self.cancel_processing, state="disabled")
+        self.btn_cancel_job.grid(row=5, column=3)
 
         # Watermark
         tk.Label(self.root, text="sphericly © 2026", fg="#cccccc", font=("Arial", 8)).place(relx=0.98, rely=0.99, anchor="se")
         
         self.load_logo()
+        self.root.after(PRELOAD_DELAY_MS, self.preload_modules)
 
     def _on_mousewheel(self, event):
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
 
     def toggle_inputs(self):
-        if self.operation_mode.get() == "margin":
-            self.spin_margin.state(["!disabled"])
-        else:
-            self.spin_margin.state(["disabled"])
+        mode = self.operation_mode.get()
+        # Margin + Booklet tek geçişli pipeline ile yapılır; hızlı margin (kutu genişletme) orada yok
+        self.spin_margin.state(["disabled"] if mode in ("booklet", "nup") else ["!disabled"])
+        self.chk_fast.state(["!disabled"] if mode == "margin" else ["disabled"])
+        self.combo_sheet.state(["disabled"] if mode == "margin" else ["!disabled", "readonly"])
+        self.spin_signature.state(["!disabled"] if mode in ("booklet", "margin_booklet") else ["disabled"])
+        for combo in (self.combo_nup, self.combo_nup_order):
+            combo.state(["!disabled", "readonly"] if mode == "nup" else ["disabled"])
 
     def load_logo(self):
+        """
+        Logo önbellekteki hazır PNG'den Tk ile doğrudan yüklenir (PyMuPDF / Pillow gerekmez).
+        PNG yoksa (ilk açılış, SVG değişmiş) ilk kare çizildikten sonra üretilip kaydedilir.
+        """
         try:
             # Dosya yolunu kontrol et
-            logo_path = "itu_cyber_bee.svg"
+            logo_path = LOGO_FILE
             if not os.path.exists(logo_path):
-                # Script'in olduğu klasöre de bak
-                logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "itu_cyber_bee.svg")
+                # Script'in (veya PyInstaller paketinin) olduğu klasöre de bak
+                logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), LOGO_FILE)
                 if not os.path.exists(logo_path):
                     return
 
-            doc = fitz.open(logo_path)
-            page = doc[0]
-            
-            # Boyutlandırma (Yükseklik ~40px)
-            zoom = 40 / page.rect.height
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=True)
-            
+            png_path = logo_cache_path(logo_path)
+            if os.path.exists(png_path):
+                self.show_logo(tk.PhotoImage(file=png_path))
+            else:
+                self.root.after(PRELOAD_DELAY_MS, self.render_logo, logo_path, png_path)
+        except Exception as e:
+            print(f"Logo yükleme hatası: {e}")
+
+    def render_logo(self, logo_path, png_path):
+        """SVG'yi PyMuPDF ile render edip renklendirir, PNG olarak önbelleğe yazar."""
+        try:
+            import fitz  # PyMuPDF
+            from PIL import Image, ImageTk
+
+            with fitz.open(logo_path) as doc:
+                page = doc[0]
+                # Boyutlandırma (Yükseklik ~40px)
+                zoom = LOGO_HEIGHT / page.rect.height
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=True)
+
             # PIL Image dönüşümü ve Renklendirme (#cccccc)
             img = Image.frombytes("RGBA", [pix.width, pix.height], pix.samples)
-            _, _, _, a = img.split()
-            colored_img = Image.new("RGBA", img.size, "#cccccc")
-            colored_img.putalpha(a)
-            
-            self.logo_photo = ImageTk.PhotoImage(colored_img)
-            
-            # Arayüze ekle (Yazının üstüne)
-            lbl_logo = tk.Label(self.root, image=self.logo_photo, bg=self.root.cget("bg"))
-            lbl_logo.place(relx=0.98, rely=0.95, anchor="se")
-            
+            colored_img = Image.new("RGBA", img.size, LOGO_COLOR)
+            colored_img.putalpha(img.getchannel("A"))
+
+            try:
+                os.makedirs(os.path.dirname(png_path), exist_ok=True)
+                part_path = png_path + ".part"
+                colored_img.save(part_path, "PNG")
+                os.replace(part_path, png_path)
+            except OSError:
+                pass  # Önbelleğe yazılamadı; logo yine gösterilir, sonraki açılışta tekrar denenir
+            self.show_logo(ImageTk.PhotoImage(colored_img))
         except Exception as e:
             print(f"Logo yükleme hatası: {e}")
 
+    def show_logo(self, photo):
+        self.logo_photo = photo
+        # Arayüze ekle (Yazının üstüne)
+        lbl_logo = tk.Label(self.root, image=self.logo_photo, bg=self.root.cget("bg"))
+        lbl_logo.place(relx=0.98, rely=0.95, anchor="se")
+
+    def preload_modules(self):
+        """
+        İlk kare çizildikten sonra ağır kütüphaneleri arka plan thread'inde yükler;
+        ilk PDF eklendiğinde veya işlem başlatıldığında import beklenmez.
+        """
+        def run():
+            for name in HEAVY_MODULES:
+                try:
+                    importlib.import_module(name)
+                except ImportError:
+                    pass
+
+        threading.Thread(target=run, name="Preload", daemon=True).start()
+
     def select_output_folder(self):
         path = filedialog.askdirectory()
         if path:
             self.output_folder.set(path)
 
-    def clear_all(self):
+    def stop_loading(self):
+        """
+        Yüklemeyi iptal eder ve bekleyen sonuçları yok sayar. İptal edilen dosyaların
+        küçük resmi artık gelmeyecek (yer tutucu) sayfaları listeden çıkarılır; çıkan
+        sayfa varsa True döner (grid yenilenmeli).
+        """
+        self.thumb_loader.cancel()
+        abandoned = {job["file_id"] for job in self.load_jobs.values() if job["file_id"] is not None}
+        self.load_jobs.clear()
+        if not abandoned:
+            return False
+
+        def unloaded(p):
+            return p.file_id in abandoned and not self.images.has_data(p.file_id, p.page_index)
+
+        kept = [p for p in self.pdf_pages if not unloaded(p)]
+        if len(kept) == len(self.pdf_pages):
+            return False
+        self.pdf_pages = kept
+        self.last_clicked_index = None
+        if self.preview_record is not None and unloaded(self.preview_record):
+            self.preview_record = None
+            self.page_view.clear()
+        return True
+
+    def reset_pages(self):
+        self.stop_loading()
         self.pdf_pages = []
+        self.files = []
+        self.file_keys.clear()
+        self.images.clear()
+        self.preview_record = None
+        self.page_view.clear()
+
+    def clear_all(self):
+        self.reset_pages()
         self.last_clicked_index = None
         self.refresh_grid()
         self.lbl_status.config(text="Cleared all pages.")
@@ -178,110 +406,145 @@ class PDFToolApp:
             return
 
         if clear:
-            self.pdf_pages = []
+            self.reset_pages()
+            self.refresh_grid()
             self.batch_counter = 0
             self.last_clicked_index = None
             # İlk dosyanın klasörünü çıktı klasörü olarak öner
             if not self.output_folder.get():
                 self.output_folder.set(os.path.dirname(files[0]))
 
-        self.lbl_status.config(text="Loading pages...", foreground="blue")
-        self.root.update()
-
+        # Sayfalar arka planda render edilir; grid yer tutucularla hemen dolar
         for file_path in files:
-            current_color = self.file_colors[self.batch_counter % len(self.file_colors)]
-            try:
-                doc = fitz.open(file_path)
-                for i, page in enumerate(doc):
-                    # Görseli oluştur (Thumbnail)
-                    pix = page.get_pixmap(matrix=fitz.Matrix(0.2, 0.2))
-                    img_pil = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    
-                    self.pdf_pages.append({
-                        "file_path": file_path,
-                        "page_num": i,
-                        "original_pil": img_pil,  # Orijinal temiz resim
-                        "is_deleted": False,
-                        "tk_image": ImageTk.PhotoImage(img_pil), # Ekranda görünen
-                        "text_color": current_color
-                    })
-                doc.close()
-                self.batch_counter += 1
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load {file_path}:\n{e}")
+            color_index = self.batch_counter % len(self.file_colors)
+            job_id = self.thumb_loader.submit(file_path)
+            self.load_jobs[job_id] = {"color_index": color_index, "file_id": None}
+            self.batch_counter += 1
 
-        self.refresh_grid()
-        self.lbl_status.config(text=f"Total pages: {len(self.pdf_pages)}", foreground="green")
+        self.btn_cancel_load.state(["!disabled"])
+        self.lbl_status.config(text="Loading pages...", foreground="blue")
+        if not self.load_polling:
+            self.load_polling = True
+            self.root.after(THUMB_POLL_MS, self.poll_thumbnails)
 
-    def get_display_image(self, page_data):
-        """Silinme durumuna göre görseli (Normal veya Karanlık+X) döndürür."""
-        pil_img = page_data["original_pil"].copy()
+    def cancel_loading(self):
+        """Devam eden küçük resim yüklemesini durdurur (yüklenen sayfalar kalır)."""
+        if self.stop_loading():
+            self.refresh_grid()
+            self.schedule_preview(result_only=True)  # Sayfa sayısı kitapçık dizilişini değiştirir
+        self.lbl_status.config(text=f"Loading cancelled. Total pages: {len(self.pdf_pages)}", foreground="orange")
 
-        if page_data["is_deleted"]:
-            # 1. Karart (Darken)
-            enhancer = ImageEnhance.Brightness(pil_img)
-            pil_img = enhancer.enhance(0.4) # %40 parlaklık
-            
-            # 2. Kırmızı X Çiz
-            draw = ImageDraw.Draw(pil_img)
-            w, h = pil_img.size
-            line_width = 5
-            draw.line((0, 0, w, h), fill="red", width=line_width)
-            draw.line((0, h, w, 0), fill="red", width=line_width)
+    def poll_thumbnails(self):
+        """Worker kuyruğundaki sonuçları parça parça alıp arayüze işler."""
+        updated = False
+        grid_changed = False
+        try:
+            for _ in range(THUMB_BATCH_SIZE):
+                msg = self.thumb_loader.results.get_nowait()
+                kind, job_id = msg[0], msg[1]
+                job = self.load_jobs.get(job_id)
+                if job is None:
+                    continue  # Temizlenmiş/iptal edilmiş işten gelen eski sonuç
+                if kind == "open":
+                    _, _, file_path, page_count, size, file_key = msg
+                    file_id = len(self.files)
+                    self.files.append(file_path)
+                    self.file_keys[file_id] = file_key
+                    job["file_id"] = file_id
+                    # Görsel gelene kadar yer tutucu gösterilir
+                    self.images.set_placeholder_size(file_id, size)
+                    color_index = job["color_index"]
+                    self.pdf_pages.extend(PageRecord(file_id, i, color_index) for i in range(page_count))
+                    grid_changed = True
+                elif kind == "thumb":
+                    _, _, page_index, data = msg
+                    self.images.set_data(job["file_id"], page_index, data)
+                    updated = True
+                elif kind == "error":
+                    _, _, file_path, error = msg
+                    messagebox.showerror("Error", f"Failed to load {file_path}:\n{error}")
+                elif kind == "done":
+                    del self.load_jobs[job_id]
+        except queue.Empty:
+            pass
+
+        with span("gui.grid_update", grow=grid_changed):
+            if grid_changed:
+                self.grid.grow(len(self.pdf_pages))
+                self.schedule_preview(result_only=True)  # Sayfa sayısı kitapçık dizilişini değiştirir
+            elif updated:
+                # Sadece ekrandaki hücreler yeniden çizilir
+                self.grid.redraw_visible()
+
+        if self.load_jobs:
+            self.lbl_status.config(text=f"Loading pages... ({len(self.pdf_pages)} pages)", foreground="blue")
+            self.root.after(THUMB_POLL_MS, self.poll_thumbnails)
+        else:
+            self.load_polling = False
+            self.btn_cancel_load.state(["disabled"])
+            if self.lbl_status.cget("text").startswith("Loading pages"):
+                self.lbl_status.config(text=f"Total pages: {len(self.pdf_pages)}", foreground="green")
+
+    def reload_thumbnail(self, file_id, page_index):
+        """Bellekten bırakılan küçük resmi disk önbelleğinden (yoksa yeniden render ederek) alır."""
+        try:
+            return self.thumb_loader.page_data(self.files[file_id], self.file_keys[file_id], page_index)
+        except Exception:
+            return None  # Dosya silinmiş/değişmiş olabilir: yer tutucu gösterilir
 
-        return ImageTk.PhotoImage(pil_img)
+    def get_display_image(self, page):
+        """Silinme durumuna göre görseli (Normal veya Karanlık+X) döndürür."""
+        return self.images.photo(page)
 
     def update_page_visual(self, index):
         """Sayfanın görsel durumunu günceller (Silindi/Normal)."""
+        self.grid.update_index(index)
+
+    def describe_page(self, index):
+        """Grid hücresi için (görsel, etiket, renk) döndürür."""
         page = self.pdf_pages[index]
-        new_tk_img = self.get_display_image(page)
-        page["tk_image"] = new_tk_img
-        
-        widgets = self.scrollable_frame.winfo_children()
-        if index < len(widgets):
-            target_frame = widgets[index]
-            btn = target_frame.winfo_children()[0]
-            btn.configure(image=new_tk_img)
-            
-            status_text = "DELETED" if page["is_deleted"] else f"Pg {page['page_num']+1}"
-            lbl = target_frame.winfo_children()[1]
-            txt_color = "red" if page["is_deleted"] else page.get("text_color", "black")
-            lbl.configure(text=status_text, fg=txt_color)
+        txt = "DELETED" if page.deleted else f"Pg {page.page_index+1}"
+        color = "red" if page.deleted else self.file_colors[page.color_index]
+        return self.get_display_image(page), txt, color
 
     def toggle_delete(self, index):
         """Bir sayfayı silindi/silinmedi olarak işaretler."""
-        self.pdf_pages[index]["is_deleted"] = not self.pdf_pages[index]["is_deleted"]
+        self.pdf_pages[index].deleted = not self.pdf_pages[index].deleted
         self.update_page_visual(index)
+        self.schedule_preview(result_only=True)
+
+    def set_deleted_range(self, start, end, state=None):
+        """
+        [start, end] aralığını tek seferde işaretler (state=None ise tersine çevirir).
+        Önce veriler güncellenir, sonra sadece ekrandaki hücreler bir kez yeniden çizilir.
+        """
+        pages = self.pdf_pages
+        if state is None:
+            for i in range(start, end + 1):
+                pages[i].deleted = not pages[i].deleted
+        else:
+            for i in range(start, end + 1):
+                pages[i].deleted = state
+        self.grid.redraw_range(start, end)
+        self.schedule_preview(result_only=True)
+
+    def delete_all(self):
+        if self.pdf_pages:
+            self.set_deleted_range(0, len(self.pdf_pages) - 1, True)
+
+    def restore_all(self):
+        if self.pdf_pages:
+            self.set_deleted_range(0, len(self.pdf_pages) - 1, False)
+
+    def invert_deleted(self):
+        if self.pdf_pages:
+            self.set_deleted_range(0, len(self.pdf_pages) - 1)
 
     # --- SÜRÜKLE BIRAK (DRAG & DROP) VE ARAYÜZ ---
 
     def refresh_grid(self):
-        """Tüm grid'i self.pdf_pages listesine göre yeniden çizer."""
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
-        cols = 5
-        for i, page in enumerate(self.pdf_pages):
-            # Container Frame
-            frame = tk.Frame(self.scrollable_frame, bg="#e0e0e0", bd=2)
-            frame.grid(row=i//cols, column=i%cols, padx=5, pady=5)
-            
-            # Resim (Buton olarak, tıklayınca silme toggler)
-            # Not: Sürükleme için bind olaylarını butona ekleyeceğiz
-            img = page["tk_image"]
-            btn = tk.Label(frame, image=img, cursor="hand2")
-            btn.pack()
-            
-            # Olayları Bağla
-            btn.bind("<Button-1>", lambda e, idx=i: self.on_click(e, idx))
-            btn.bind("<B1-Motion>", lambda e, idx=i: self.on_drag(e, idx))
-            btn.bind("<ButtonRelease-1>", lambda e, idx=i: self.on_drop(e, idx))
-            
-            # Etiket
-            txt = "DELETED" if page["is_deleted"] else f"Pg {page['page_num']+1}"
-            color = "red" if page["is_deleted"] else page.get("text_color", "black")
-            lbl = tk.Label(frame, text=txt, bg="#e0e0e0", fg=color, font=("Arial", 8))
-            lbl.pack()
+        """Grid'i self.pdf_pages listesine göre yeniden çizer (sadece görünen hücreler)."""
+        self.grid.set_count(len(self.pdf_pages))
 
     # --- DRAG & DROP LOGIC ---
     def on_click(self, event, index):
@@ -291,71 +554,74 @@ class PDFToolApp:
         self.drag_data["is_dragging"] = False
 
     def on_drag(self, event, index):
+        # Hücreler kaydırma sırasında yeniden kullanıldığı için basılan index'i esas al
+        index = self.drag_data["index"]
         # Küçük titremelerde sürükleme başlamasın
-        if abs(event.x - self.drag_data["start_x"]) > 5 or abs(event.y - self.drag_data["start_y"]) > 5:
+        if not self.drag_data["is_dragging"]:
+            if abs(event.x - self.drag_data["start_x"]) <= 5 and abs(event.y - self.drag_data["start_y"]) <= 5:
+                return
             self.drag_data["is_dragging"] = True
             self.root.config(cursor="fleur") # İmleci değiştir
             
             # --- SÜRÜKLEME ANİMASYONU (GHOST IMAGE) ---
-            if self.drag_window is None:
-                # Sürüklenen görseli içeren çerçevesiz, yarı saydam pencere oluştur
-                self.drag_window = tk.Toplevel(self.root)
-                self.drag_window.overrideredirect(True) # Pencere kenarlıklarını kaldır
-                self.drag_window.attributes('-topmost', True) # En üstte tut
-                self.drag_window.attributes('-alpha', 0.7) # Şeffaflık (%70 görünür)
-                
-                # Görseli pencereye ekle
-                page = self.pdf_pages[index]
-                img = page["tk_image"]
-                lbl = tk.Label(self.drag_window, image=img, bg="#cccccc", bd=2, relief="solid")
-                lbl.pack()
-            
-            # Pencereyi fareyi takip edecek şekilde konumlandır
-            # x_root ve y_root ekran koordinatlarını verir
-            img = self.pdf_pages[index]["tk_image"]
-            x = event.x_root - (img.width() // 2)
-            y = event.y_root - (img.height() // 2)
-            self.drag_window.geometry(f"+{x}+{y}")
-            
-            # --- DROP INDICATOR (Araya girme çizgisi) ---
-            if not hasattr(self, 'drop_indicator') or self.drop_indicator is None or not self.drop_indicator.winfo_exists():
-                self.drop_indicator = tk.Frame(self.scrollable_frame, bg="#0038A8", width=4)
-            
-            # Hedef konumu bul
-            x_root, y_root = event.x_root, event.y_root
-            found_target = False
-            
-            # Gösterge hariç diğer widgetları al
-            widgets = [w for w in self.scrollable_frame.winfo_children() if w != self.drop_indicator]
-            
-            for i, widget in enumerate(widgets):
-                wx, wy = widget.winfo_rootx(), widget.winfo_rooty()
-                ww, wh = widget.winfo_width(), widget.winfo_height()
-                
-                # Fare bu hücrenin sınırları içinde mi?
-                if wx <= x_root <= wx + ww and wy <= y_root <= wy + wh:
-                    # Sol yarı mı sağ yarı mı?
-                    if x_root < wx + (ww // 2):
-                        self.drag_data["target_index_visual"] = i
-                        ix = widget.winfo_x() - 2 # Sol kenar
-                    else:
-                        self.drag_data["target_index_visual"] = i + 1
-                        ix = widget.winfo_x() + ww + 2 # Sağ kenar
-                    
-                    iy = widget.winfo_y()
-                    ih = wh
-                    
-                    self.drop_indicator.place(x=ix, y=iy, height=ih)
-                    self.drop_indicator.lift()
-                    found_target = True
-                    break
-            
-            if not found_target:
-                self.drop_indicator.place_forget()
-                self.drag_data["target_index_visual"] = None
+            # Sürüklenen görseli içeren çerçevesiz, yarı saydam pencere oluştur
+            self.drag_window = tk.Toplevel(self.root)
+            self.drag_window.overrideredirect(True) # Pencere kenarlıklarını kaldır
+            self.drag_window.attributes('-topmost', True) # En üstte tut
+            self.drag_window.attributes('-alpha', 0.7) # Şeffaflık (%70 görünür)
+            
+            # Görseli pencereye ekle
+            img = self.get_display_image(self.pdf_pages[index])
+            lbl = tk.Label(self.drag_window, image=img, bg="#cccccc", bd=2, relief="solid")
+            lbl.image = img  # Görsel önbellekten düşse de sürükleme boyunca kalsın
+            lbl.pack()
+            self.drag_data["ghost_offset"] = (img.width() // 2, img.height() // 2)
+
+        # Fare olayları çok sık gelir; sadece son konumu sakla, ekranı kare hızında güncelle
+        self.drag_data["pointer"] = (event.x_root, event.y_root)
+        if self.drag_data.get("frame_job") is None:
+            self.drag_data["frame_job"] = self.root.after(DRAG_FRAME_MS, self.drag_frame)
+
+    def drag_frame(self):
+        """Sürükleme sırasında kare başına bir kez: hayalet görsel, hedef çizgisi ve otomatik kaydırma."""
+        self.drag_data["frame_job"] = None
+        if not self.drag_data["is_dragging"] or self.drag_window is None:
+            return
+        x_root, y_root = self.drag_data["pointer"]
+
+        # Pencereyi fareyi takip edecek şekilde konumlandır
+        # x_root ve y_root ekran koordinatlarını verir
+        off_x, off_y = self.drag_data["ghost_offset"]
+        self.drag_window.geometry(f"+{x_root - off_x}+{y_root - off_y}")
+
+        # Kenarlara yaklaşınca grid'i kaydır (fare durduğunda da devam eder)
+        scrolled = self.grid.autoscroll(y_root)
+
+        # --- DROP INDICATOR (Araya girme çizgisi) ---
+        # Hedef konum grid geometrisinden (sütun, hücre boyu, kaydırma) hesaplanır
+        target = self.grid.drop_target_at(x_root, y_root)
+        if target is not None:
+            self.drag_data["target_index_visual"], ix, iy = target
+            self.grid.show_drop_indicator(ix, iy)
+        else:
+            self.grid.hide_drop_indicator()
+            self.drag_data["target_index_visual"] = None
+
+        if scrolled:
+            self.drag_data["frame_job"] = self.root.after(DRAG_FRAME_MS, self.drag_frame)
 
     def on_drop(self, event, index):
+        index = self.drag_data["index"]
         self.root.config(cursor="") # İmleci düzelt
+
+        # Bekleyen kareyi iptal et, hedefi son konuma göre hemen hesapla
+        if self.drag_data.get("frame_job") is not None:
+            self.root.after_cancel(self.drag_data["frame_job"])
+            self.drag_data["frame_job"] = None
+            self.drag_frame()
+            if self.drag_data["frame_job"] is not None:  # Otomatik kaydırma devam etmesin
+                self.root.after_cancel(self.drag_data["frame_job"])
+                self.drag_data["frame_job"] = None
         
         # Animasyon penceresini temizle
         if self.drag_window:
@@ -363,8 +629,7 @@ class PDFToolApp:
             self.drag_window = None
             
         # Göstergeyi gizle
-        if self.drop_indicator:
-            self.drop_indicator.place_forget()
+        self.grid.hide_drop_indicator()
         
         if not self.drag_data["is_dragging"]:
             # Sürükleme değilse, sadece tıklamadır -> SİLME İŞLEMİ
@@ -373,12 +638,8 @@ class PDFToolApp:
                 start = min(self.last_clicked_index, index)
                 end = max(self.last_clicked_index, index)
                 # Hedef durumu, son tıklanan (anchor) sayfanın durumuna göre belirle
-                target_state = self.pdf_pages[self.last_clicked_index]["is_deleted"]
-                
-                for i in range(start, end + 1):
-                    if self.pdf_pages[i]["is_deleted"] != target_state:
-                        self.pdf_pages[i]["is_deleted"] = target_state
-                        self.update_page_visual(i)
+                target_state = self.pdf_pages[self.last_clicked_index].deleted
+                self.set_deleted_range(start, end, target_state)
             else:
                 self.toggle_delete(index)
                 self.last_clicked_index = index
@@ -393,12 +654,77 @@ class PDFToolApp:
             if target_index > index:
                 target_index -= 1
             self.pdf_pages.insert(target_index, item)
-            self.refresh_grid()
+            # Sadece etkilenen (ve görünen) hücreler güncellenir
+            self.grid.moved(index, target_index)
             self.last_clicked_index = None # Sıralama değişince seçimi sıfırla
+            self.schedule_preview(result_only=True)
 
         self.drag_data["is_dragging"] = False
         self.drag_data["target_index_visual"] = None
 
+    # --- BÜYÜK ÖNİZLEME ---
+
+    def on_select(self, event, index):
+        """Sağ tık: sayfayı büyük görünümde açar."""
+        if index is None:
+            return
+        self.preview_record = self.pdf_pages[index]
+        self.update_preview()
+
+    def schedule_preview(self, result_only=False):
+        """Önizlemeyi kısa bir sessizlikten sonra yeniler (ayar yazılırken her tuşta değil)."""
+        if self.preview_record is None or (result_only and not self.preview_result.get()):
+            return
+        if self.preview_job is not None:
+            self.root.after_cancel(self.preview_job)
+        self.preview_job = self.root.after(PREVIEW_DELAY_MS, self.update_preview)
+
+    def update_preview(self):
+        self.preview_job = None
+        record = self.preview_record
+        if record is None:
+            self.page_view.clear()
+            return
+        if not self.preview_result.get():
+            try:
+                self.page_view.show(SourcePage(self.doc_pool, self.files[record.file_id], record.page_index))
+            except OSError as e:
+                self.page_view.clear(str(e))
+            return
+        if record.deleted:
+            self.page_view.clear("Deleted pages are not part of the output")
+            return
+        try:
+            stages = self.output_stages()
+        except (tk.TclError, ValueError):
+            return  # Ayar yazılırken geçersiz değer; geçerli olunca yeniden denenir
+
+        # Çıktıya girecek sayfalar ve seçili sayfanın bunlar arasındaki sırası
+        sources = []
+        index = None
+        for p in self.pdf_pages:
+            if p.deleted:
+                continue
+            if p is record:
+                index = len(sources)
+            sources.append((self.files[p.file_id], p.page_index))
+        if index is None:
+            self.page_view.clear()
+            return
+        self.page_view.show(ResultPage(self.doc_pool, sources, stages, index))
+
+    def output_stages(self):
+        """Seçili modun pdf_pipeline aşamaları (birleşik modlar ve canlı önizleme için)."""
+        mode = self.operation_mode.get()
+        sheet = self.sheet_size.get()
+        if mode == "margin":
+            return [Margin(self.margin_value.get())]
+        if mode == "booklet":
+            return [Booklet(sheet, max(0, self.signature_sheets.get()))]
+        if mode == "margin_booklet":
+            return [Margin(self.margin_value.get()), Booklet(sheet, max(0, self.signature_sheets.get()))]
+        return [NUp(self.nup_count.get(), sheet, self.nup_order.get())]
+
     # --- PROCESS ---
 
     def start_processing(self):
@@ -410,99 +736,140 @@ class PDFToolApp:
              messagebox.showwarning("Warning", "Please select an output folder.")
              return
 
+        try:
+            margin = self.margin_value.get()
+        except tk.TclError:
+            messagebox.showerror("Error", "Please enter a valid margin value.")
+            return
+        try:
+            signature_sheets = max(0, self.signature_sheets.get())
+        except tk.TclError:
+            messagebox.showerror("Error", "Please enter a valid signature size.")
+            return
+
+        # 1. Seçili sayfaların sırası (dosya, sayfa). Okuma ve yazma arka planda yapılır
+        sources = [(self.files[p.file_id], p.page_index) for p in self.pdf_pages if not p.deleted]
+        if not sources:
+            messagebox.showerror("Error", "All pages are deleted!")
+            return
+
+        # --- DOSYA ADI OLUŞTURMA ---
+        active_pages = [p for p in self.pdf_pages if not p.deleted]
+        unique_files = []
+        seen = set()
+        for p in active_pages:
+            if p.file_id not in seen:
+                unique_files.append(self.files[p.file_id])
+                seen.add(p.file_id)
+        
+        base_names = [os.path.splitext(os.path.basename(f))[0] for f in unique_files]
+        joined_name = "_".join(base_names)
+        
+        # Durum Analizi
+        has_deleted = any(p.deleted for p in self.pdf_pages)
+        is_merged = len(unique_files) > 1
+        
+        # Reorder Kontrolü
+        is_reordered = False
+        current_file = None
+        last_pg = -1
+        file_set = set()
+        for p in active_pages:
+            if p.file_id != current_file:
+                if p.file_id in file_set: is_reordered = True
+                file_set.add(p.file_id)
+                current_file = p.file_id
+                last_pg = -1
+            if p.page_index < last_pg: is_reordered = True
+            last_pg = p.page_index
+        
+        is_organised = has_deleted or is_reordered
+        
+        mode = self.operation_mode.get()
+        parts = []
+        if is_organised: parts.append("organised")
+        if is_merged: parts.append("merged")
+        if mode in ("margin", "margin_booklet") and margin > 0: parts.append("margined")
+        if mode in ("booklet", "margin_booklet"): parts.append("booklet")
+        if mode == "nup": parts.append(f"{self.nup_count.get()}up")
+        
+        suffix = "_".join(parts) if parts else "processed"
+        final_filename = f"{joined_name}_{suffix}.pdf"
+        final_path = self.get_unique_filename(self.output_folder.get(), final_filename)
+
+        # Birleşik işlemler tek geçişte: sayfa seçimi/sırası zaten sources'ta
+        stages = None
+        if mode in ("margin_booklet", "nup"):
+            mode = "pipeline"
+            stages = self.output_stages()
+
+        # 2. İşlemi worker thread'de başlat; arayüz ilerlemeyi kuyruktan okur
+        self.job = ProcessingJob(sources, final_path, mode, margin,
+                                 fast=self.fast_margin.get(), streaming=self.low_memory.get(),
+                                 booklet_options={"sheet": self.sheet_size.get(),
+                                                  "signature_sheets": signature_sheets},
+                                 optimize=self.optimize_output.get(), backend=self.backend.get(),
+                                 stages=stages, pool=self.doc_pool,
+                                 cache=self.output_cache if self.reuse_output.get() else None)
         self.btn_process.config(state="disabled")
+        self.btn_cancel_job.state(["!disabled"])
+        self.progress["value"] = 0
         self.lbl_status.config(text="Processing...", foreground="blue")
-        self.root.update()
-
+        self.job.start()
+        self.root.after(PROCESS_POLL_MS, self.poll_processing)
+
+    def cancel_processing(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.lbl_status.config(text="Cancelling...", foreground="orange")
+
+    def poll_processing(self):
+        """Worker'dan gelen ilerleme/sonuç mesajlarını işler."""
+        job = self.job
+        last_progress = None
+        result = None
         try:
-            # 1. Önce "Merge" edilmiş ve "Sort" edilmiş temiz bir geçici PDF oluştur
-            temp_writer = PdfWriter()
-            
-            # Performans için dosyaları bir kere açıp tutalım
-            open_files = {} 
-            
-            count = 0
-            for page_data in self.pdf_pages:
-                if page_data["is_deleted"]:
-                    continue
-                
-                f_path = page_data["file_path"]
-                p_num = page_data["page_num"]
-                
-                if f_path not in open_files:
-                    open_files[f_path] = PdfReader(f_path)
-                
-                reader = open_files[f_path]
-                temp_writer.add_page(reader.pages[p_num])
-                count += 1
-            
-            if count == 0:
-                raise Exception("All pages are deleted!")
-
-            # Geçici dosyaya kaydet
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                temp_writer.write(tmp)
-                temp_pdf_path = tmp.name
-
-            # 2. Şimdi bu temiz dosyaya Margin veya Booklet uygula
-            # --- DOSYA ADI OLUŞTURMA ---
-            active_pages = [p for p in self.pdf_pages if not p["is_deleted"]]
-            unique_files = []
-            seen = set()
-            for p in active_pages:
-                if p["file_path"] not in seen:
-                    unique_files.append(p["file_path"])
-                    seen.add(p["file_path"])
-            
-            base_names = [os.path.splitext(os.path.basename(f))[0] for f in unique_files]
-            joined_name = "_".join(base_names)
-            
-            # Durum Analizi
-            has_deleted = any(p["is_deleted"] for p in self.pdf_pages)
-            is_merged = len(unique_files) > 1
-            
-            # Reorder Kontrolü
-            is_reordered = False
-            current_file = None
-            last_pg = -1
-            file_set = set()
-            for p in active_pages:
-                if p["file_path"] != current_file:
-                    if p["file_path"] in file_set: is_reordered = True
-                    file_set.add(p["file_path"])
-                    current_file = p["file_path"]
-                    last_pg = -1
-                if p["page_num"] < last_pg: is_reordered = True
-                last_pg = p["page_num"]
-            
-            is_organised = has_deleted or is_reordered
-            
-            parts = []
-            if is_organised: parts.append("organised")
-            if is_merged: parts.append("merged")
-            if self.operation_mode.get() == "margin" and self.margin_value.get() > 0: parts.append("margined")
-            elif self.operation_mode.get() == "booklet": parts.append("booklet")
-            
-            suffix = "_".join(parts) if parts else "processed"
-            final_filename = f"{joined_name}_{suffix}.pdf"
-            final_path = self.get_unique_filename(self.output_folder.get(), final_filename)
-            
-            if self.operation_mode.get() == "margin":
-                self.process_margin(temp_pdf_path, final_path, self.margin_value.get())
-            else:
-                self.process_booklet(temp_pdf_path, final_path)
+            while True:
+                msg = job.messages.get_nowait()
+                if msg[0] == "progress":
+                    last_progress = msg
+                else:
+                    result = msg
+        except queue.Empty:
+            pass
+
+        if last_progress is not None and result is None:
+            _, stage, done, total = last_progress
+            start, end = PROCESS_STAGE_RANGES[stage]
+            fraction = done / total if total else 0
+            self.progress["value"] = start + (end - start) * fraction
+            label = PROCESS_STAGE_LABELS[stage]
+            text = f"{label} {done}/{total}" if total and stage not in ("write", "optimize") else f"{label}..."
+            self.lbl_status.config(text=text, foreground="blue")
+
+        if result is None:
+            self.root.after(PROCESS_POLL_MS, self.poll_processing)
+            return
 
-            os.remove(temp_pdf_path) # Temizle
-            
-            self.lbl_status.config(text="Done!", foreground="green")
+        self.job = None
+        self.btn_process.config(state="normal")
+        self.btn_cancel_job.state(["disabled"])
+        if result[0] == "done":
+            final_path, stats = result[1], result[3]
+            self.progress["value"] = 100
+            text = "Done! (unchanged, reused)" if stats.get("cached") else "Done!"
+            if "size_before" in stats:
+                text += f" Size: {format_size(stats['size_before'])} -> {format_size(stats['size_after'])}"
+            self.lbl_status.config(text=text, foreground="green")
             if messagebox.askyesno("Success", f"File Saved:\n{final_path}\n\nOpen output folder?"):
                 os.startfile(self.output_folder.get())
-
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        elif result[0] == "cancelled":
+            self.progress["value"] = 0
+            self.lbl_status.config(text="Processing cancelled.", foreground="orange")
+        else:
+            self.progress["value"] = 0
+            messagebox.showerror("Error", result[1])
             self.lbl_status.config(text="Error occurred", foreground="red")
-        finally:
-            self.btn_process.config(state="normal")
 
     def get_unique_filename(self, folder, filename):
         counter = 1
@@ -514,103 +881,22 @@ class PDFToolApp:
             counter += 1
         return full_path
 
-    def process_margin(self, input_path, output_path, margin):
-        reader = PdfReader(input_path)
-        writer = PdfWriter()
-
-        for i, page in enumerate(reader.pages):
-            width = float(page.mediabox.width)
-            height = float(page.mediabox.height)
-            page_num = i + 1
-
-            if page_num % 2 == 1:
-                tx = margin
-            else:
-                tx = 0
-
-            op = Transformation().translate(tx=tx, ty=0)
-            new_page = writer.add_blank_page(width=width + margin, height=height)
-            new_page.merge_transformed_page(page, op)
-
-        with open(output_path, "wb") as f:
-            writer.write(f)
-
-    def get_fit_transform(self, page, target_w, target_h, x_offset, y_offset):
-        """Sayfayı hedef alana orantılı sığdırır (Kırpma yapmaz, ortalar)."""
-        mb = page.mediabox
-        src_w = float(mb.width)
-        src_h = float(mb.height)
-        
-        if src_w == 0 or src_h == 0:
-            return Transformation().translate(x_offset, y_offset)
-
-        scale = min(target_w / src_w, target_h / src_h)
-        new_w = src_w * scale
-        new_h = src_h * scale
-        
-        dx = x_offset + (target_w - new_w) / 2
-        dy = y_offset + (target_h - new_h) / 2
-        
-        return Transformation().scale(scale, scale).translate(dx, dy)
-
-    def process_booklet(self, input_path, output_path):
-        reader = PdfReader(input_path)
-        writer = PdfWriter()
-        
-        pages = list(reader.pages)
-        total_pages = len(pages)
-        
-        remainder = total_pages % 4
-        if remainder != 0:
-            pages_needed = 4 - remainder
-            ref_width = pages[0].mediabox.width
-            ref_height = pages[0].mediabox.height
-            for _ in range(pages_needed):
-                pages.append(PageObject.create_blank_page(width=ref_width, height=ref_height))
-        
-        total_pages = len(pages)
-        num_sheets = total_pages // 4
-        
-        A4_WIDTH_PT = 595.276
-        A4_HEIGHT_PT = 841.89
-        out_width = A4_HEIGHT_PT
-        out_height = A4_WIDTH_PT
-        
-        for i in range(num_sheets):
-            idx_front_left = total_pages - 1 - (2 * i)
-            idx_front_right = 2 * i
-            
-            sheet_front = PageObject.create_blank_page(width=out_width, height=out_height)
-            
-            page_fl = pages[idx_front_left]
-            tf_fl = self.get_fit_transform(page_fl, out_width/2, out_height, 0, 0)
-            sheet_front.merge_transformed_page(page_fl, tf_fl)
-            
-            page_fr = pages[idx_front_right]
-            tf_fr = self.get_fit_transform(page_fr, out_width/2, out_height, out_width/2, 0)
-            sheet_front.merge_transformed_page(page_fr, tf_fr)
-            
-            writer.add_page(sheet_front)
-            
-            idx_back_left = 2 * i + 1
-            idx_back_right = total_pages - 1 - (2 * i + 1)
-            
-            sheet_back = PageObject.create_blank_page(width=out_width, height=out_height)
-            
-            page_bl = pages[idx_back_left]
-            tf_bl = self.get_fit_transform(page_bl, out_width/2, out_height, 0, 0)
-            sheet_back.merge_transformed_page(page_bl, tf_bl)
-            
-            page_br = pages[idx_back_right]
-            tf_br = self.get_fit_transform(page_br, out_width/2, out_height, out_width/2, 0)
-            sheet_back.merge_transformed_page(page_br, tf_br)
-            
-            writer.add_page(sheet_back)
-
-        with open(output_path, "wb") as f:
-            writer.write(f)
-
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="PDF Master Tool")
+    parser.add_argument("--trace", metavar="FILE", help="Write a JSON timing trace on exit")
+    parser.add_argument("--profile", metavar="FILE", help="Write cProfile stats (pstats) on exit")
+    parser.add_argument("--startup-benchmark", metavar="FILE",
+                        help="Write startup timings (JSON) once the first frame is drawn, then exit")
+    args, _ = parser.parse_known_args()
+    TRACER.configure(trace_path=args.trace, profile_path=args.profile)
+
     root = tk.Tk()
     app = PDFToolApp(root)
-    root.mainloop()
\ No newline at end of file
+    if args.startup_benchmark:
+        root.update()  # Pencereyi eşle ve çiz (ilk kare)
+        write_startup_report(args.startup_benchmark)
+        root.destroy()
+        sys.exit()
+    with profile():
+        root.mainloop()
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""Diskte kalıcı çıktı önbelleği (içerik adresli, LRU, boyut sınırlı).
+
+İki seviye:
+- İş: anahtar kaynak dosyaların içerik hash'leri + sayfa seçimi/sırası + mod +
+  ayarlar (margin, booklet, aşamalar, backend...). Aynı iş tekrar başlatılırsa
+  hiçbir şey işlenmez: önceki çıktı dosyası hâlâ aynı klasörde ve değişmemişse
+  o döndürülür (yeni '_1' dosyası yazılmaz), değilse önbellekteki kopya yazılır.
+- Parça: margin sayfa başına bir dönüşümdür; her kaynağın çıktıda art arda gelen
+  sayfaları (parça) margin uygulanmış ayrı bir PDF olarak saklanır. Birleştirilen
+  dosyalardan biri değiştiğinde sadece onun parçası yeniden üretilir, iş
+  parçalardan kopyalanarak (veya booklet / N-up gibi kalan aşamalarla) kurulur.
+  Margin tek/çift sayfaya göre değiştiği için parçanın çıktıdaki başlangıç
+  sırasının tek/çift oluşu da anahtardadır.
+
+Dosyalar en uzun süre kullanılmayandan başlayarak (mtime) boyut sınırı aşılınca
+silinir. Akış (low-memory) seçeneği çıktının içeriğini değiştirmediği için
+anahtarda yoktur.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+from pdf_engine import process_sources
+from pdf_pipeline import Margin
+from pdf_pool import DocumentPool
+from pdf_trace import count, span
+from thumb_cache import DiskCache, default_cache_dir, file_signature
+
+DEFAULT_MAX_MB = 1024
+CACHE_VERSION = 1  # Çıktı üretimi değişirse artırılır; eski kayıtlar kullanılmaz
+
+
+def _stage_key(stage):
+    return [type(stage).__name__, sorted((k, repr(v)) for k, v in vars(stage).items())]
+
+
+def _copy(src, dst):
+    """'.part' üzerinden kopyalar; yarım dosya kalmaz."""
+    part_path = dst + ".part"
+    try:
+        shutil.copyfile(src, part_path)
+        os.replace(part_path, dst)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+
+class OutputCache(DiskCache):
+    suffix = ".pdf"
+
+    def __init__(self, directory=None, max_bytes=None):
+        if directory is None:
+            directory = os.path.join(default_cache_dir(), "outputs")
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("PDF_MARGIN_OUTPUT_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        super().__init__(directory, max_bytes)
+
+    def _key(self, kind, sources, **settings):
+        """sources: (dosya yolu, sayfa numarası) listesi; dosyalar içerik hash'iyle temsil edilir."""
+        digests = {}
+        pages = []
+        for path, page_index in sources:
+            if path not in digests:
+                digests[path] = self.file_key(path)
+            pages.append((digests[path], page_index))
+        text = json.dumps([CACHE_VERSION, kind, pages, sorted(settings.items())], default=repr)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _path(self, kind, key, ext=".pdf"):
+        return os.path.join(self.directory, kind, key[:2], key + ext)
+
+    # --- İş ---
+
+    def process(self, sources, output_path, mode, backend="pypdf", progress=None, cancel=None, pool=None,
+                stats=None, **options):
+        """
+        pdf_engine.process_sources'ın önbellekli karşılığı. (çıktı yolu, sayfa sayısı)
+        döndürür; önbellekten gelindiyse çıktı yolu önceki çıktı olabilir ve stats
+        verilmişse stats["cached"] True olur.
+        """
+        sources = list(sources)
+        settings = dict(options)
+        settings.pop("streaming", None)
+        settings.pop("memory_limit", None)
+        if settings.get("stages"):
+            settings["stages"] = [_stage_key(s) for s in settings["stages"]]
+        with span("output_cache.lookup"):
+            key = self._key("job", sources, mode=mode, backend=backend, **settings)
+            hit = self._reuse(key, output_path)
+        if hit is not None:
+            count("output_cache_hits")
+            if stats is not None:
+                stats["cached"] = True
+            return hit
+        count("output_cache_misses")
+
+        split = self._split(mode, options)
+        if split is None:
+            pages = process_sources(sources, output_path, mode, backend=backend, progress=progress,
+                                    cancel=cancel, pool=pool, stats=stats, **options)
+        else:
+            margin_options, rest_mode, rest_options = split
+            options.update(rest_options)
+            # Parçalar çağıranın havuzunu (kullanıcının açık belgeleri) doldurmasın: ayrı havuz,
+            # tüm parçalar birlikte açık kalabilecek büyüklükte (parça sayısı <= sayfa sayısı)
+            part_pool = DocumentPool(max_open=len(sources))
+            try:
+                for attempt in range(2):
+                    with self.pinned() as pin:
+                        parts = self._parts(sources, backend, pool, part_pool, pin, progress, cancel,
+                                            margin_options)
+                        try:
+                            pages = process_sources(parts, output_path, rest_mode, backend=backend,
+                                                    progress=progress, cancel=cancel, pool=part_pool, stats=stats,
+                                                    **options)
+                            break
+                        except FileNotFoundError:
+                            # Pin sadece bu process'i durdurur: başka bir process'in evict'i parçayı
+                            # silmiş olabilir; parçalar yeniden kontrol edilip bir kez daha denenir
+                            if attempt:
+                                raise
+                            count("output_cache_part_lost")
+            finally:
+                part_pool.close()
+        self._store(key, output_path, pages)
+        self.evict()
+        return output_path, pages
+
+    def _reuse(self, key, output_path):
+        """Önceki çıktıyı (veya önbellekteki kopyasını) döndürür, yoksa None."""
+        meta_path = self._path("job", key, ".json")
+        pdf_path = self._path("job", key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        previous = meta.get("output")
+        try:
+            # Önceki çıktı aynı klasörde ve kullanıcı tarafından değiştirilmemişse olduğu gibi kullanılır
+            if (previous and os.path.dirname(os.path.abspath(previous)) == os.path.dirname(os.path.abspath(output_path))
+                    and list(file_signature(previous)) == meta.get("signature")):
+                os.utime(pdf_path)  # LRU için son kullanım zamanını güncelle
+                return previous, meta["pages"]
+        except OSError:
+            pass
+        try:
+            _copy(pdf_path, output_path)
+            os.utime(pdf_path)
+        except OSError:
+            return None
+        self._write_meta(meta_path, output_path, meta["pages"])
+        return output_path, meta["pages"]
+
+    def _store(self, key, output_path, pages):
+        pdf_path = self._path("job", key)
+        try:
+            os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+            _copy(output_path, pdf_path)
+        except OSError:
+            return
+        self._write_meta(self._path("job", key, ".json"), output_path, pages)
+
+    def _write_meta(self, meta_path, output_path, pages):
+        tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"output": os.path.abspath(output_path), "signature": list(file_signature(output_path)),
+                           "pages": pages}, f)
+            os.replace(tmp_path, meta_path)
+        except OSError:
+            pass
+
+    # --- Parçalar ---
+
+    @staticmethod
+    def _split(mode, options):
+        """
+        İş margin + kalan işlem olarak bölünebiliyorsa (parça seçenekleri, kalan mod,
+        kalan seçenekler), değilse None. Kalan işlem yoksa parçalar olduğu gibi kopyalanır.
+        """
+        copy = ("margin", {"margin": 0, "fast": True})
+        if mode == "margin" and options.get("margin"):
+            return {"mode": "margin", "margin": options["margin"], "fast": options.get("fast", False)}, *copy
+        stages = options.get("stages") or []
+        if mode == "pipeline" and stages and type(stages[0]) is Margin and stages[0].margin and not stages[0].start:
+            rest = stages[1:]
+            margin_options = {"mode": "pipeline", "margin": stages[0].margin}
+            if not rest:
+                return margin_options, *copy
+            return margin_options, "pipeline", {"stages": rest}
+        return None
+
+    def _parts(self, sources, backend, pool, part_pool, pin, progress, cancel, margin_options):
+        """
+        Kaynakları aynı dosyadan art arda gelen sayfa gruplarına böler; her grubun
+        margin uygulanmış parçasını önbellekten alır veya üretir. Parça sayfalarının
+        (dosya yolu, sayfa numarası) listesini döndürür. Parçalar pin ile evict'ten
+        korunur; önbellekteki parça part_pool'da açılamıyorsa (yarım, bozuk, silinmiş)
+        yeniden üretilir. Kaynaklar pool'dan, parçalar part_pool'dan okunur.
+        """
+        runs = []
+        for position, (path, page_index) in enumerate(sources):
+            if runs and runs[-1][1] == path:
+                runs[-1][2].append(page_index)
+            else:
+                runs.append((position, path, [page_index]))
+
+        parts = []
+        for start, path, page_indexes in runs:
+            run = [(path, i) for i in page_indexes]
+            key = self._key("part", run, backend=backend, odd=start % 2, **margin_options)
+            part_path = self._path("part", key)
+            pin(part_path)
+            if self._readable(part_pool, part_path, len(run)):
+                count("output_cache_part_hits")
+                try:
+                    os.utime(part_path)
+                except OSError:
+                    pass
+            else:
+                count("output_cache_part_misses")
+                os.makedirs(os.path.dirname(part_path), exist_ok=True)
+                with span("output_cache.part", path=path, pages=len(run)):
+                    if margin_options["mode"] == "margin":
+                        process_sources(run, part_path, "margin", backend=backend, progress=progress, cancel=cancel,
+                                        pool=pool, margin=margin_options["margin"], fast=margin_options["fast"],
+                                        margin_start=start)
+                    else:
+                        process_sources(run, part_path, "pipeline", backend=backend, progress=progress,
+                                        cancel=cancel, pool=pool,
+                                        stages=[Margin(margin_options["margin"], start=start)])
+            parts.extend((part_path, i) for i in range(len(run)))
+        return parts
+
+    @staticmethod
+    def _readable(part_pool, path, pages):
+        """Parça açılıyor ve beklenen sayfa sayısına sahip mi."""
+        if not os.path.exists(path):
+            return False
+        try:
+            return len(part_pool.reader(path).pages) == pages
+        except Exception:  # Bozuk dosyada pypdf'in hatası dosyaya göre değişir
+            return False
+
+    # --- Boyut sınırı ---
+
+    def _roots(self):
+        return [os.path.join(self.directory, kind) for kind in ("job", "part")]
+
+    def _removed(self, path):
+        count("output_cache_evictions")
+        meta_path = os.path.splitext(path)[0] + ".json"
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
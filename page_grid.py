@@ -0,0 +1,232 @@
+"""Sanallaştırılmış sayfa grid'i.
+
+Binlerce sayfa için binlerce widget oluşturmak yerine, canvas üzerinde sadece
+görünen satırlar (+ tampon) kadar hücre tutulur. Kaydırma ve yeniden boyutlandırmada
+bu hücreler yeni index'lere atanarak tekrar kullanılır; bellek ve çizim maliyeti
+belge boyutundan bağımsızdır.
+"""
+import tkinter as tk
+
+CELL_W = 180        # Bir hücrenin grid'de kapladığı genişlik (boşluk dahil)
+CELL_H = 210        # Bir hücrenin grid'de kapladığı yükseklik (boşluk dahil)
+CELL_PAD = 5
+BUFFER_ROWS = 2     # Görünen alanın üstünde/altında hazır tutulan satır sayısı
+AUTOSCROLL_EDGE = 40  # Sürüklerken kenara bu kadar piksel yaklaşınca kaydır
+GRID_BG = "#e0e0e0"
+
+
+class _Cell:
+    """Havuzdaki tek bir hücre (çerçeve + resim + etiket)."""
+    __slots__ = ("frame", "image_label", "text_label", "window_id", "index")
+
+    def __init__(self, canvas):
+        self.index = None
+        self.frame = tk.Frame(canvas, bg=GRID_BG, bd=2,
+                              width=CELL_W - 2 * CELL_PAD, height=CELL_H - 2 * CELL_PAD)
+        self.frame.pack_propagate(False)
+        self.image_label = tk.Label(self.frame, cursor="hand2", bg=GRID_BG)
+        self.image_label.pack(expand=True)
+        self.text_label = tk.Label(self.frame, bg=GRID_BG, font=("Arial", 8))
+        self.text_label.pack(side=tk.BOTTOM)
+        self.window_id = canvas.create_window(0, 0, window=self.frame, anchor="nw", state="hidden")
+
+
+class PageGrid:
+    """
+    describe(index) -> (tk_image, text, color) ile hücre içeriğini app'ten alır.
+    on_press / on_motion / on_release(event, index) fare olaylarını app'e iletir.
+    on_select(event, index) sağ tıkta çağrılır (sayfayı önizlemede açmak için).
+    """
+
+    def __init__(self, canvas, scrollbar, describe, on_press, on_motion, on_release, on_select=None):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.describe = describe
+        self.on_press = on_press
+        self.on_motion = on_motion
+        self.on_release = on_release
+        self.on_select = on_select
+
+        self.count = 0
+        self.cols = 1
+        self.pool = []             # Tüm hücreler (tekrar kullanılır)
+        self.visible = {}          # index -> _Cell
+        self._update_pending = False
+        self.drop_indicator = None
+
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.bind("<Configure>", self._on_configure)
+
+    # --- Yerleşim ---
+
+    def set_count(self, count):
+        """Sayfa sayısı değiştiğinde (ekleme/temizleme/sıralama) çağrılır."""
+        self.count = count
+        self._update_scrollregion()
+        self.refresh()
+
+    def grow(self, count):
+        """Sona sayfa eklendiğinde: mevcut hücrelere dokunmadan sadece yenilerini yerleştirir."""
+        self.count = count
+        self._update_scrollregion()
+        self._update_visible()
+
+    def moved(self, src, dst):
+        """
+        Bir sayfa src'den dst'ye taşındıktan sonra çağrılır. Sadece aradaki
+        index'lerden ekranda görünenler yeniden çizilir (hücreler yerinde kalır).
+        """
+        self.redraw_range(min(src, dst), max(src, dst))
+
+    def refresh(self):
+        """Görünen tüm hücreleri yeniden çizer (sayfa listesi değiştiğinde)."""
+        for cell in self.visible.values():
+            cell.index = None
+        self.visible = {}
+        self._update_visible()
+
+    def redraw_visible(self):
+        """Görünen hücrelerin içeriğini yerlerini değiştirmeden tazeler."""
+        for index, cell in self.visible.items():
+            self._render(cell, index)
+
+    def redraw_range(self, start, end):
+        """[start, end] aralığındaki görünen hücreleri tek seferde tazeler."""
+        for index, cell in self.visible.items():
+            if start <= index <= end:
+                self._render(cell, index)
+
+    def update_index(self, index):
+        """Tek bir sayfanın görselini günceller (görünmüyorsa hiçbir şey yapmaz)."""
+        cell = self.visible.get(index)
+        if cell is not None:
+            self._render(cell, index)
+
+    def cell_origin(self, index):
+        """Hücrenin canvas koordinatlarındaki sol üst köşesi."""
+        row, col = divmod(index, self.cols)
+        return col * CELL_W, row * CELL_H
+
+    def _on_configure(self, event):
+        cols = max(1, event.width // CELL_W)
+        if cols != self.cols:
+            self.cols = cols
+            self._update_scrollregion()
+            self.refresh()
+        else:
+            self._schedule_update()
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_update()
+
+    def _schedule_update(self):
+        if not self._update_pending:
+            self._update_pending = True
+            self.canvas.after_idle(self._update_visible)
+
+    def _update_scrollregion(self):
+        rows = (self.count + self.cols - 1) // self.cols
+        self.canvas.configure(scrollregion=(0, 0, self.cols * CELL_W, rows * CELL_H))
+
+    def _visible_range(self):
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first_row = max(0, int(top // CELL_H) - BUFFER_ROWS)
+        last_row = int(bottom // CELL_H) + BUFFER_ROWS
+        start = first_row * self.cols
+        end = min(self.count, (last_row + 1) * self.cols)
+        return start, end
+
+    def _update_visible(self):
+        self._update_pending = False
+        start, end = self._visible_range()
+
+        # Artık görünmeyen hücreleri serbest bırak
+        free = []
+        for index in list(self.visible):
+            if not start <= index < end:
+                free.append(self.visible.pop(index))
+        free.extend(c for c in self.pool if c.index is None and c not in free)
+
+        for index in range(start, end):
+            if index in self.visible:
+                continue
+            cell = free.pop() if free else self._new_cell()
+            self._place(cell, index)
+
+        for cell in free:
+            cell.index = None
+            self.canvas.itemconfigure(cell.window_id, state="hidden")
+
+    def _new_cell(self):
+        cell = _Cell(self.canvas)
+        cell.image_label.bind("<Button-1>", lambda e, c=cell: self.on_press(e, c.index))
+        cell.image_label.bind("<B1-Motion>", lambda e, c=cell: self.on_motion(e, c.index))
+        cell.image_label.bind("<ButtonRelease-1>", lambda e, c=cell: self.on_release(e, c.index))
+        if self.on_select is not None:
+            cell.image_label.bind("<Button-3>", lambda e, c=cell: self.on_select(e, c.index))
+        self.pool.append(cell)
+        return cell
+
+    def _place(self, cell, index):
+        cell.index = index
+        self.visible[index] = cell
+        x, y = self.cell_origin(index)
+        self.canvas.coords(cell.window_id, x + CELL_PAD, y + CELL_PAD)
+        self.canvas.itemconfigure(cell.window_id, state="normal")
+        self._render(cell, index)
+
+    def _render(self, cell, index):
+        image, text, color = self.describe(index)
+        cell.image_label.configure(image=image)
+        cell.text_label.configure(text=text, fg=color)
+
+    # --- Sürükle-bırak yardımcıları ---
+
+    def drop_target_at(self, x_root, y_root):
+        """
+        Ekran koordinatının altındaki hücreye göre ekleme index'ini hesaplar.
+        (insert_index, line_x, line_y) veya hücre yoksa None döndürür.
+        """
+        cx = self.canvas.canvasx(x_root - self.canvas.winfo_rootx())
+        cy = self.canvas.canvasy(y_root - self.canvas.winfo_rooty())
+        if cx < 0 or cy < 0:
+            return None
+        col = int(cx // CELL_W)
+        row = int(cy // CELL_H)
+        if col >= self.cols:
+            return None
+        index = row * self.cols + col
+        if index >= self.count:
+            return None
+
+        x, y = self.cell_origin(index)
+        if cx < x + CELL_W / 2:
+            return index, x, y
+        return index + 1, x + CELL_W, y
+
+    def autoscroll(self, y_root):
+        """İmleç canvas'ın üst/alt kenarına yakınsa bir adım kaydırır. Kaydırdıysa True."""
+        y = y_root - self.canvas.winfo_rooty()
+        height = self.canvas.winfo_height()
+        if y < AUTOSCROLL_EDGE:
+            step = -1
+        elif y > height - AUTOSCROLL_EDGE:
+            step = 1
+        else:
+            return False
+        before = self.canvas.yview()
+        self.canvas.yview_scroll(step, "units")
+        return self.canvas.yview() != before
+
+    def show_drop_indicator(self, x, y):
+        # Çizgi hücreler arasındaki boşluğa düşer (pencere öğeleri çizgilerin üstünde kalır)
+        if self.drop_indicator is None:
+            self.drop_indicator = self.canvas.create_line(0, 0, 0, 0, fill="#0038A8", width=4)
+        self.canvas.coords(self.drop_indicator, x, y + CELL_PAD, x, y + CELL_H - CELL_PAD)
+        self.canvas.itemconfigure(self.drop_indicator, state="normal")
+
+    def hide_drop_indicator(self):
+        if self.drop_indicator is not None:
+            self.canvas.itemconfigure(self.drop_indicator, state="hidden")
@@ -0,0 +1,164 @@
+"""Kompakt sayfa modeli ve ihtiyaç anında açılan küçük resimler.
+
+Her sayfa sadece dosya numarası, sayfa numarası, silindi bayrağı ve renk
+numarasını tutar. Küçük resimler JPEG olarak saklanır; PhotoImage'lar yalnızca
+ekranda gösterilen hücreler için üretilir. İkisi birlikte bellek bütçesi dahilinde
+(LRU) tutulur; bırakılan JPEG'ler disk önbelleğinden geri okunur.
+Pillow ilk küçük resim gösterilirken yüklenir.
+"""
+import io
+import os
+from collections import OrderedDict
+
+DEFAULT_IMAGE_BUDGET_MB = 64
+MIN_CACHED_IMAGES = 128  # Görünen hücreler asla bütçe yüzünden boş kalmasın
+PLACEHOLDER_SIZE = (119, 168)  # A4 @ 0.2
+
+
+class PageRecord:
+    __slots__ = ("file_id", "page_index", "deleted", "color_index")
+
+    def __init__(self, file_id, page_index, color_index, deleted=False):
+        self.file_id = file_id
+        self.page_index = page_index
+        self.color_index = color_index
+        self.deleted = deleted
+
+
+class PageImageStore:
+    """
+    (file_id, page_index) -> JPEG byte'ları. PhotoImage'lar talep edildiğinde
+    açılır. JPEG'ler ve PhotoImage'lar aynı bütçeyi paylaşır; toplam bütçeyi aşınca
+    önce en eski kullanılan PhotoImage'lar, sonra en eski JPEG'ler bırakılır. Bırakılan
+    JPEG tekrar gerekince reload(file_id, page_index) ile geri alınır (reload verilmezse
+    JPEG'ler bırakılmaz).
+    """
+
+    def __init__(self, budget_bytes=None, reload=None):
+        if budget_bytes is None:
+            budget_bytes = int(os.environ.get("PDF_MARGIN_IMAGE_BUDGET_MB", DEFAULT_IMAGE_BUDGET_MB)) * 1024 * 1024
+        self.budget_bytes = budget_bytes
+        self.reload = reload
+        self._data = OrderedDict()      # (file_id, page_index) -> bytes (LRU)
+        self._data_bytes = 0
+        self._released = set()          # Bütçe yüzünden bırakılan (file_id, page_index)
+        self._sizes = {}                # file_id -> (w, h) yer tutucu boyutu
+        # (file_id, page_index, deleted) -> (PhotoImage, byte)
+        # Silinmiş görünüm de ayrı anahtarla saklanır; aynı sayfa için bir kez üretilir
+        self._photos = OrderedDict()
+        self._photo_bytes = 0
+        self._placeholders = {}         # (w, h) -> PhotoImage
+
+    def clear(self):
+        self._data.clear()
+        self._data_bytes = 0
+        self._released.clear()
+        self._sizes.clear()
+        self._photos.clear()
+        self._photo_bytes = 0
+
+    def set_placeholder_size(self, file_id, size):
+        self._sizes[file_id] = size
+
+    def set_data(self, file_id, page_index, data):
+        self._store((file_id, page_index), data)
+        # Eski (yer tutucu) görselleri geçersiz kıl
+        for deleted in (False, True):
+            self._drop((file_id, page_index, deleted))
+        self._evict()
+
+    def has_data(self, file_id, page_index):
+        key = (file_id, page_index)
+        return key in self._data or key in self._released
+
+    def data(self, file_id, page_index):
+        """Sayfanın JPEG byte'ları; henüz yüklenmediyse (veya geri alınamadıysa) None."""
+        key = (file_id, page_index)
+        data = self._data.get(key)
+        if data is not None:
+            self._data.move_to_end(key)
+            return data
+        if key not in self._released or self.reload is None:
+            return None
+        data = self.reload(file_id, page_index)
+        if data is not None:
+            self._store(key, data)
+            self._evict()
+        return data
+
+    def photo(self, record):
+        """Kayıt için gösterilecek PhotoImage (gerekirse açılır)."""
+        key = (record.file_id, record.page_index, record.deleted)
+        entry = self._photos.get(key)
+        if entry is not None:
+            self._photos.move_to_end(key)
+            return entry[0]
+
+        data = self.data(record.file_id, record.page_index)
+        if data is None:
+            return self._placeholder(self._sizes.get(record.file_id, PLACEHOLDER_SIZE))
+
+        from PIL import Image, ImageTk
+
+        img = Image.open(io.BytesIO(data)).convert("RGB")
+        if record.deleted:
+            img = self.deleted_variant(img)
+        photo = ImageTk.PhotoImage(img)
+        cost = img.width * img.height * 4
+        self._photos[key] = (photo, cost)
+        self._photo_bytes += cost
+        self._evict()
+        return photo
+
+    def _placeholder(self, size):
+        w, h = size
+        if w <= 0 or h <= 0:
+            w, h = PLACEHOLDER_SIZE
+        photo = self._placeholders.get((w, h))
+        if photo is None:
+            from PIL import Image, ImageTk
+
+            photo = ImageTk.PhotoImage(Image.new("RGB", (w, h), "#f4f4f4"))
+            self._placeholders[(w, h)] = photo
+        return photo
+
+    def _drop(self, key):
+        entry = self._photos.pop(key, None)
+        if entry is not None:
+            self._photo_bytes -= entry[1]
+
+    def _store(self, key, data):
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._data_bytes -= len(old)
+        self._data[key] = data
+        self._data_bytes += len(data)
+        self._released.discard(key)
+
+    def _evict(self):
+        while self._photo_bytes + self._data_bytes > self.budget_bytes and len(self._photos) > MIN_CACHED_IMAGES:
+            _, (_, cost) = self._photos.popitem(last=False)
+            self._photo_bytes -= cost
+        if self.reload is None:
+            return
+        while self._photo_bytes + self._data_bytes > self.budget_bytes and len(self._data) > MIN_CACHED_IMAGES:
+            key, data = self._data.popitem(last=False)
+            self._data_bytes -= len(data)
+            self._released.add(key)
+
+    @staticmethod
+    def deleted_variant(img):
+        """Silinen sayfa görünümü: Karartılmış + kırmızı X."""
+        from PIL import ImageDraw, ImageEnhance
+
+        # 1. Karart (Darken)
+        enhancer = ImageEnhance.Brightness(img)
+        img = enhancer.enhance(0.4) # %40 parlaklık
+
+        # 2. Kırmızı X Çiz
+        draw = ImageDraw.Draw(img)
+        w, h = img.size
+        line_width = 5
+        draw.line((0, 0, w, h), fill="red", width=line_width)
+        draw.line((0, h, w, 0), fill="red", width=line_width)
+        return img
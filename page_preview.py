@@ -0,0 +1,510 @@
+"""Seçili sayfanın yakınlaştırılabilir, döşemeli (tile) önizlemesi.
+
+Sayfa hiçbir zaman tam çözünürlükte tek seferde render edilmez: görünen alan
+TILE_SIZE'lık karelere bölünür, eksik kareler arka plandaki tek bir worker
+thread'de PyMuPDF ile (clip) render edilir ve piksel bütçesiyle sınırlı bir
+önbellekte (LRU) tutulur. Kareler gelene kadar sayfanın küçük bir kopyası
+büyütülerek gösterilir; yakınlaştırma ve kaydırma render'ı beklemez.
+
+Önizlenebilen kaynaklar (worker'da açılır):
+    SourcePage   Havuzdaki (pdf_pool) bir dosyanın sayfası
+    ResultPage   Seçili işlemin (margin / booklet / N-up) o sayfayı içeren çıktı sayfası
+
+Worker'ın kuyruğa koyduğu mesajlar:
+    ("open",  source_key, width, height, (w, h, rgb))   Sayfa boyutu (pt) ve küçük kopya
+    ("tile",  source_key, (zoom, tx, ty), (w, h, rgb))
+    ("error", source_key, message)
+"""
+import itertools
+import math
+import os
+import queue
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from contextlib import contextmanager
+from tkinter import ttk
+
+from pdf_trace import count, profile, span
+
+TILE_SIZE = 256          # px
+BASE_MAX_PX = 1024       # Küçük kopyanın uzun kenarı
+DEFAULT_TILE_BUDGET_MB = 48
+MIN_ZOOM = 0.1           # 1.0 = 72 dpi
+MAX_ZOOM = 10.0
+ZOOM_STEP = 1.25
+TILE_POLL_MS = 30
+PREVIEW_BG = "#808080"
+EMPTY_TEXT = "Right-click a page to preview it"
+
+
+class SourcePage:
+    """Havuzdaki bir dosyanın sayfası."""
+
+    def __init__(self, pool, path, page_index):
+        self.pool = pool
+        self.path = path
+        self.page_index = page_index
+        # Dosya diskte değişirse eski kareler kullanılmasın
+        st = os.stat(path)
+        self.key = ("page", path, page_index, st.st_size, st.st_mtime_ns)
+
+    @contextmanager
+    def page(self):
+        with self.pool.document(self.path) as doc:
+            yield doc[self.page_index]
+
+    def close(self):
+        pass
+
+
+class ResultPage:
+    """
+    sources[index] sayfasının yer aldığı çıktı sayfası (pdf_pipeline aşamalarıyla).
+    Tek sayfalık belge worker'da ilk kullanımda üretilir; anahtar her nesnede yenidir.
+    """
+    _serial = itertools.count()
+
+    def __init__(self, pool, sources, stages, index):
+        self.pool = pool
+        self.sources = sources
+        self.stages = stages
+        self.index = index
+        self.key = ("result", next(ResultPage._serial))
+        self._doc = None
+
+    @contextmanager
+    def page(self):
+        if self._doc is None:
+            from pdf_fitz_engine import preview_page
+
+            with span("preview.result", index=self.index):
+                self._doc = preview_page(self.sources, self.stages, self.index, self.pool)
+            if self._doc is None:
+                raise ValueError("This page is not part of the output")
+        yield self._doc[0]
+
+    def close(self):
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+
+class TileRenderer:
+    """
+    Tek worker thread: kaynak açma ve kare render istekleri. cancel() bekleyen
+    tüm istekleri düşürür (görünüm değiştiğinde sadece son istek geçerlidir).
+    """
+
+    def __init__(self):
+        self.results = queue.Queue()
+        self._requests = queue.Queue()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._source = None  # Worker'da en son kullanılan kaynak
+        self._thread = threading.Thread(target=self._run, name="TileRenderer", daemon=True)
+        self._thread.start()
+
+    def submit(self, source, tiles=None):
+        """tiles None ise kaynağı açar (boyut + küçük kopya), değilse (zoom, tx, ty) listesini render eder."""
+        with self._lock:
+            generation = self._generation
+        self._requests.put((generation, source, tiles))
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+
+    def _is_cancelled(self, generation):
+        return generation != self._generation
+
+    def _run(self):
+        while True:
+            generation, source, tiles = self._requests.get()
+            if self._is_cancelled(generation):
+                continue
+            try:
+                if source is not self._source:
+                    if self._source is not None:
+                        self._source.close()
+                    self._source = source
+                with profile(), span("preview.request", tiles=len(tiles) if tiles else 0):
+                    if tiles is None:
+                        self._open(source)
+                    else:
+                        for tile in tiles:
+                            if self._is_cancelled(generation):
+                                break
+                            self._render(source, tile)
+            except Exception as e:
+                self.results.put(("error", source.key, str(e)))
+
+    def _open(self, source):
+        import fitz  # PyMuPDF
+
+        with source.page() as page:
+            rect = page.rect
+            zoom = BASE_MAX_PX / max(rect.width, rect.height, 1)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        self.results.put(("open", source.key, rect.width, rect.height, (pix.width, pix.height, pix.samples)))
+
+    def _render(self, source, tile):
+        import fitz  # PyMuPDF
+
+        zoom, tx, ty = tile
+        step = TILE_SIZE / zoom
+        with span("preview.tile", zoom=zoom), source.page() as page:
+            rect = page.rect
+            clip = fitz.Rect(rect.x0 + tx * step, rect.y0 + ty * step,
+                             rect.x0 + (tx + 1) * step, rect.y0 + (ty + 1) * step) & rect
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
+        count("preview_tiles_rendered")
+        self.results.put(("tile", source.key, tile, (pix.width, pix.height, pix.samples)))
+
+
+class TileCache:
+    """
+    (kaynak, zoom, tx, ty) -> PhotoImage. Toplam piksel boyutu bütçeyi aşınca en eski
+    kullanılanlar bırakılır; ekranda gösterilen kareler asla bırakılmaz.
+    """
+
+    def __init__(self, budget_bytes=None):
+        if budget_bytes is None:
+            budget_bytes = int(os.environ.get("PDF_MARGIN_TILE_BUDGET_MB", DEFAULT_TILE_BUDGET_MB)) * 1024 * 1024
+        self.budget_bytes = budget_bytes
+        self._tiles = OrderedDict()  # anahtar -> (PhotoImage, byte)
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def get(self, key):
+        entry = self._tiles.get(key)
+        if entry is None:
+            return None
+        self._tiles.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, photo, cost, keep=()):
+        old = self._tiles.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._tiles[key] = (photo, cost)
+        self._bytes += cost
+        for old_key in list(self._tiles):
+            if self._bytes <= self.budget_bytes:
+                break
+            if old_key in keep or old_key == key:
+                continue
+            self._bytes -= self._tiles.pop(old_key)[1]
+
+    def clear(self):
+        self._tiles.clear()
+        self._bytes = 0
+
+
+class PreviewPane:
+    """
+    Tek sayfa görünümü: araç çubuğu (yakınlaştırma) + kaydırılabilir canvas.
+    Ctrl+tekerlek imlecin altındaki noktayı sabit tutarak yakınlaştırır,
+    Shift+tekerlek yatay kaydırır, sürükleme sayfayı kaydırır.
+    """
+
+    def __init__(self, parent, renderer=None, cache=None):
+        self.renderer = renderer if renderer is not None else TileRenderer()
+        self.cache = cache if cache is not None else TileCache()
+
+        self.frame = ttk.Frame(parent)
+        self.toolbar = ttk.Frame(self.frame)
+        self.toolbar.pack(fill=tk.X, pady=(0, 4))
+        ttk.Button(self.toolbar, text="−", width=3, command=self.zoom_out).pack(side=tk.LEFT)
+        ttk.Button(self.toolbar, text="+", width=3, command=self.zoom_in).pack(side=tk.LEFT, padx=2)
+        ttk.Button(self.toolbar, text="Fit", width=4, command=self.zoom_fit).pack(side=tk.LEFT)
+        self.lbl_zoom = ttk.Label(self.toolbar, width=6)
+        self.lbl_zoom.pack(side=tk.LEFT, padx=5)
+
+        body = ttk.Frame(self.frame)
+        body.pack(fill=tk.BOTH, expand=True)
+        body.rowconfigure(0, weight=1)
+        body.columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(body, bg=PREVIEW_BG, highlightthickness=0)
+        xbar = ttk.Scrollbar(body, orient="horizontal", command=self.canvas.xview)
+        ybar = ttk.Scrollbar(body, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(xscrollcommand=lambda *a: self._on_scroll(xbar, *a),
+                              yscrollcommand=lambda *a: self._on_scroll(ybar, *a))
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        ybar.grid(row=0, column=1, sticky="ns")
+        xbar.grid(row=1, column=0, sticky="we")
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<ButtonPress-1>", lambda e: self.canvas.scan_mark(e.x, e.y))
+        self.canvas.bind("<B1-Motion>", self._on_pan)
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+
+        self.source = None
+        self.page_size = None      # (genişlik, yükseklik) pt
+        self.base = None           # Küçük kopya (PIL Image)
+        self.zoom = 1.0
+        self.fit = True            # Kullanıcı yakınlaştırana kadar sayfa alana sığdırılır
+        self._items = {}           # Çizili kare anahtarı -> canvas öğesi
+        self._requested = set()    # Worker'dan beklenen kare anahtarları
+        self._opening = False
+        self._backdrop = None      # (canvas öğesi, PhotoImage)
+        self._update_pending = False
+        self._polling = False
+        self._set_message(EMPTY_TEXT)
+
+    # --- Kaynak ---
+
+    def show(self, source):
+        """Kaynağı (SourcePage / ResultPage) gösterir; yakınlaştırma ayarı korunur."""
+        self.renderer.cancel()
+        self.source = source
+        self.page_size = None
+        self.base = None
+        self._requested.clear()
+        self._clear_canvas()
+        self._set_message("Loading...")
+        self._opening = True
+        self.renderer.submit(source)
+        self._start_polling()
+
+    def clear(self, text=EMPTY_TEXT):
+        self.renderer.cancel()
+        self.source = None
+        self.page_size = None
+        self.base = None
+        self._requested.clear()
+        self._opening = False
+        self._clear_canvas()
+        self._set_message(text)
+        self.lbl_zoom.configure(text="")
+
+    # --- Yakınlaştırma ---
+
+    def zoom_in(self):
+        self.set_zoom(self.zoom * ZOOM_STEP)
+
+    def zoom_out(self):
+        self.set_zoom(self.zoom / ZOOM_STEP)
+
+    def zoom_fit(self):
+        self.fit = True
+        if self.page_size is not None:
+            self._apply_zoom(self._fit_zoom())
+
+    def set_zoom(self, zoom, anchor=None):
+        """anchor: canvas penceresindeki (x, y) nokta; yakınlaştırmada yerinde kalır."""
+        self.fit = False
+        if self.page_size is not None:
+            self._apply_zoom(zoom, anchor)
+
+    def _fit_zoom(self):
+        width, height = self.page_size
+        cw, ch = max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+        return min(cw / width, ch / height)
+
+    def _apply_zoom(self, zoom, anchor=None):
+        zoom = round(min(MAX_ZOOM, max(MIN_ZOOM, zoom)), 4)
+        if zoom == self.zoom and self._items:
+            return
+        cw, ch = self.canvas.winfo_width(), self.canvas.winfo_height()
+        ax, ay = anchor if anchor is not None else (cw / 2, ch / 2)
+        # Noktanın sayfa üzerindeki (pt) konumu
+        px = self.canvas.canvasx(ax) / self.zoom
+        py = self.canvas.canvasy(ay) / self.zoom
+        self.zoom = zoom
+        self._clear_tiles()
+        self._layout()
+        x0, y0, x1, y1 = self._scrollregion()
+        if x1 - x0 > cw:
+            self.canvas.xview_moveto((px * zoom - ax - x0) / (x1 - x0))
+        if y1 - y0 > ch:
+            self.canvas.yview_moveto((py * zoom - ay - y0) / (y1 - y0))
+        self._schedule_update()
+
+    # --- Yerleşim ---
+
+    def _scrollregion(self):
+        """Sayfa alandan küçükse ortalanır (scrollregion negatif başlar)."""
+        width, height = self.page_size
+        w, h = width * self.zoom, height * self.zoom
+        cw, ch = self.canvas.winfo_width(), self.canvas.winfo_height()
+        x0 = min(0, (w - cw) / 2)
+        y0 = min(0, (h - ch) / 2)
+        return x0, y0, max(w, x0 + cw), max(h, y0 + ch)
+
+    def _layout(self):
+        self.canvas.configure(scrollregion=self._scrollregion())
+        self.lbl_zoom.configure(text=f"{self.zoom * 100:.0f}%")
+
+    def _on_configure(self, event):
+        if self.page_size is None:
+            self.canvas.coords("message", event.width / 2, event.height / 2)
+            return
+        if self.fit:
+            self._apply_zoom(self._fit_zoom())
+        else:
+            self._layout()
+            self._schedule_update()
+
+    def _on_scroll(self, bar, first, last):
+        bar.set(first, last)
+        self._schedule_update()
+
+    def _on_pan(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self._schedule_update()
+
+    def _on_mousewheel(self, event):
+        if event.state & 0x0004:  # Ctrl
+            factor = ZOOM_STEP if event.delta > 0 else 1 / ZOOM_STEP
+            self.set_zoom(self.zoom * factor, anchor=(event.x, event.y))
+        elif event.state & 0x0001:  # Shift
+            self.canvas.xview_scroll(int(-1 * (event.delta / 120)), "units")
+        else:
+            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        return "break"  # Sayfa grid'inin bind_all tekerleği çalışmasın
+
+    # --- Çizim ---
+
+    def _set_message(self, text):
+        self.canvas.delete("message")
+        self.canvas.configure(scrollregion=(0, 0, 0, 0))
+        self.canvas.create_text(self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2,
+                                text=text, fill="white", tags="message")
+
+    def _clear_tiles(self):
+        self.canvas.delete("tile")
+        self._items.clear()
+
+    def _clear_canvas(self):
+        self.canvas.delete("all")
+        self._items.clear()
+        self._backdrop = None
+
+    def _schedule_update(self):
+        # Kaydırma olayları çok sık gelir; görünüm boşta bir kez güncellenir
+        if not self._update_pending and self.page_size is not None:
+            self._update_pending = True
+            self.canvas.after_idle(self._update_view)
+
+    def _visible_tiles(self):
+        width, height = self.page_size
+        w, h = width * self.zoom, height * self.zoom
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        x0, y0 = max(0, left), max(0, top)
+        x1 = min(w, left + self.canvas.winfo_width())
+        y1 = min(h, top + self.canvas.winfo_height())
+        if x1 <= x0 or y1 <= y0:
+            return (x0, y0, x0, y0), []
+        tiles = [(tx, ty) for ty in range(int(y0 // TILE_SIZE), math.ceil(y1 / TILE_SIZE))
+                 for tx in range(int(x0 // TILE_SIZE), math.ceil(x1 / TILE_SIZE))]
+        # Ortadaki kareler önce render edilsin
+        cx, cy = (x0 + x1) / 2 / TILE_SIZE, (y0 + y1) / 2 / TILE_SIZE
+        tiles.sort(key=lambda t: (t[0] + 0.5 - cx) ** 2 + (t[1] + 0.5 - cy) ** 2)
+        return (x0, y0, x1, y1), tiles
+
+    def _tile_key(self, tx, ty):
+        return self.source.key, self.zoom, tx, ty
+
+    def _update_view(self):
+        self._update_pending = False
+        if self.page_size is None:
+            return
+        region, tiles = self._visible_tiles()
+        wanted = set()
+        missing = []
+        for tx, ty in tiles:
+            key = self._tile_key(tx, ty)
+            wanted.add(key)
+            if key in self._items:
+                continue
+            photo = self.cache.get(key)
+            if photo is not None:
+                self._draw_tile(key, photo)
+            else:
+                missing.append((self.zoom, tx, ty))
+        for key in [k for k in self._items if k not in wanted]:
+            self.canvas.delete(self._items.pop(key))
+
+        self._draw_backdrop(region if missing else None)
+        missing_keys = {(self.source.key,) + tile for tile in missing}
+        if missing_keys != self._requested:
+            # Eski istekler düşer; sadece şu an görünen eksik kareler istenir
+            self.renderer.cancel()
+            self._requested = missing_keys
+            if missing:
+                self.renderer.submit(self.source, missing)
+                self._start_polling()
+
+    def _draw_tile(self, key, photo):
+        _, _, tx, ty = key
+        self._items[key] = self.canvas.create_image(tx * TILE_SIZE, ty * TILE_SIZE, image=photo,
+                                                    anchor="nw", tags="tile")
+
+    def _draw_backdrop(self, region):
+        """Eksik kareler gelene kadar görünen alana küçük kopyanın büyütülmüş halini koyar."""
+        if self._backdrop is not None:
+            self.canvas.delete(self._backdrop[0])
+            self._backdrop = None
+        if region is None or self.base is None:
+            return
+        x0, y0, x1, y1 = region
+        if x1 - x0 < 1 or y1 - y0 < 1:
+            return
+        from PIL import Image, ImageTk
+
+        scale = self.base.width / (self.page_size[0] * self.zoom)
+        crop = self.base.crop((int(x0 * scale), int(y0 * scale),
+                               max(int(x0 * scale) + 1, math.ceil(x1 * scale)),
+                               max(int(y0 * scale) + 1, math.ceil(y1 * scale))))
+        photo = ImageTk.PhotoImage(crop.resize((int(x1 - x0), int(y1 - y0)), Image.BILINEAR))
+        item = self.canvas.create_image(x0, y0, image=photo, anchor="nw", tags="backdrop")
+        self.canvas.tag_lower(item)
+        self._backdrop = (item, photo)
+
+    # --- Worker sonuçları ---
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.canvas.after(TILE_POLL_MS, self._poll)
+
+    def _poll(self):
+        from PIL import Image, ImageTk
+
+        try:
+            while True:
+                msg = self.renderer.results.get_nowait()
+                kind, key = msg[0], msg[1]
+                if kind == "open":
+                    if self.source is None or key != self.source.key:
+                        continue
+                    _, _, width, height, (w, h, samples) = msg
+                    self._opening = False
+                    self.page_size = (width, height)
+                    self.base = Image.frombytes("RGB", (w, h), samples)
+                    self.canvas.delete("message")
+                    if self.fit:
+                        self.zoom = round(min(MAX_ZOOM, max(MIN_ZOOM, self._fit_zoom())), 4)
+                    self._layout()
+                    self._schedule_update()
+                elif kind == "tile":
+                    _, source_key, tile, (w, h, samples) = msg
+                    tile_key = (source_key,) + tile
+                    self._requested.discard(tile_key)
+                    photo = ImageTk.PhotoImage(Image.frombytes("RGB", (w, h), samples))
+                    self.cache.put(tile_key, photo, w * h * 4, keep=self._items)
+                    if self.source is not None and tile_key[0] == self.source.key and tile[0] == self.zoom:
+                        self._schedule_update()
+                elif kind == "error":
+                    if self.source is not None and key == self.source.key:
+                        self.clear(msg[2])
+        except queue.Empty:
+            pass
+
+        if self._opening or self._requested:
+            self.canvas.after(TILE_POLL_MS, self._poll)
+        else:
+            self._polling = False
@@ -0,0 +1,213 @@
+"""Komut satırından toplu Margin / Booklet işleme.
+
+Örnek:
+    python pdf_batch.py --mode margin --margin 30 -o out/ kitaplar/ "ekler/*.pdf"
+    python pdf_batch.py --mode margin --fast -o out/ kitaplar/
+    python pdf_batch.py --mode booklet --workers 8 -o out/ ders.pdf
+    python pdf_batch.py --mode booklet --sheet A3 --signature 4 --creep 0.5 -o out/ kitap.pdf
+    python pdf_batch.py --mode margin --streaming --memory-limit 128 -o out/ arsiv/
+    python pdf_batch.py --mode margin --optimize -o out/ "dersler/*.pdf"
+    python pdf_batch.py --backend pymupdf --mode booklet -o out/ kitaplar/
+    python pdf_batch.py --pipeline "select:3-,margin:30,booklet:A3" -o out/ kitap.pdf
+    python pdf_batch.py --pipeline "nup:16:A3:cut_stack" -o out/ slaytlar.pdf
+    python pdf_batch.py --trace trace.json --profile run.prof -o out/ kitap.pdf
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pdf_engine import BACKENDS, process_sources
+from pdf_imposition import SHEET_SIZES
+from pdf_optimize import format_size
+from pdf_pipeline import parse_pipeline
+from pdf_pool import DocumentPool
+from pdf_trace import TRACER, profile, span
+
+MODE_SUFFIX = {"margin": "margined", "booklet": "booklet", "pipeline": "processed"}
+
+
+def collect_inputs(specs, recursive=False):
+    """Dosya, glob ve klasör argümanlarını tekil PDF yolları listesine çevirir (sıra korunur)."""
+    found = []
+    seen = set()
+
+    def add(path):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen:
+            seen.add(key)
+            found.append(path)
+
+    for spec in specs:
+        if os.path.isdir(spec):
+            pattern = os.path.join(spec, "**", "*.pdf") if recursive else os.path.join(spec, "*.pdf")
+            matches = sorted(glob.glob(pattern, recursive=recursive))
+        elif glob.has_magic(spec):
+            matches = sorted(glob.glob(spec, recursive=recursive))
+        else:
+            matches = [spec]
+        for path in matches:
+            if os.path.isdir(path) or not path.lower().endswith(".pdf"):
+                continue
+            add(path)
+    return found
+
+
+def output_path_for(input_path, output_dir, mode):
+    name, ext = os.path.splitext(os.path.basename(input_path))
+    return os.path.join(output_dir, f"{name}_{MODE_SUFFIX[mode]}{ext}")
+
+
+def output_paths_for(inputs, output_dir, mode):
+    """
+    Her girdi için output_path_for; farklı klasörlerdeki aynı adlı girdiler (örn. -r ile)
+    aynı çıktıya (ve aynı '.part' dosyasına) yazmasın diye tekrar eden adlara _2, _3... eklenir.
+    """
+    used = set()
+    paths = []
+    for path in inputs:
+        out = output_path_for(path, output_dir, mode)
+        name, ext = os.path.splitext(out)
+        counter = 2
+        while os.path.normcase(out) in used:
+            out = f"{name}_{counter}{ext}"
+            counter += 1
+        used.add(os.path.normcase(out))
+        paths.append(out)
+    return paths
+
+
+def process_file(input_path, output_path, mode, margin, fast=False, streaming=False, memory_limit=None,
+                 booklet_options=None, optimize=False, backend="pypdf", pipeline=None):
+    """
+    Tek bir dosyayı işler (worker process içinde çalışır). mode="pipeline" ise
+    pipeline aşama metni dosyanın sayfa sayısıyla (açık aralıklar için) çözülür.
+    (sayfa sayısı, süre, stats, trace) döndürür; stats optimize edildiyse boyutları,
+    trace ölçüm açıksa bu dosyanın kayıtlarını içerir.
+    """
+    start = time.perf_counter()
+    stats = {}
+    # Büyük girdiler mmap ile okunur; sayfa sayısı için açılan belge backend ile paylaşılır
+    pool = DocumentPool()
+    with profile(), span("file", path=input_path):
+        try:
+            reader = pool.reader(input_path)
+            sources = [(input_path, i) for i in range(len(reader.pages))]
+            options = dict(booklet_options or {})
+            if mode == "pipeline":
+                options["stages"] = parse_pipeline(pipeline, len(sources))
+            pages = process_sources(sources, output_path, mode, backend=backend, readers={input_path: reader},
+                                    pool=pool, margin=margin, fast=fast, streaming=streaming,
+                                    memory_limit=memory_limit, optimize=optimize, stats=stats, **options)
+        finally:
+            pool.close()
+    trace = TRACER.drain() if TRACER.enabled else None
+    return pages, time.perf_counter() - start, stats, trace
+
+
+def run_batch(inputs, output_dir, mode, margin, workers=None, fast=False, streaming=False,
+              memory_limit=None, booklet_options=None, optimize=False, backend="pypdf", pipeline=None,
+              log=print):
+    """
+    Girdileri process havuzunda işler. Hatalı dosyalar atlanır, iş devam eder.
+    booklet_options: write_pages'e geçirilir (sheet, signature_sheets, creep).
+    pipeline: mode="pipeline" için aşama metni (bkz. pdf_pipeline).
+    (başarılı, hatalı) sonuç listelerini döndürür.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    ok, failed = [], []
+    started = time.perf_counter()
+    size_before = size_after = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for path, out in zip(inputs, output_paths_for(inputs, output_dir, mode)):
+            future = pool.submit(process_file, path, out, mode, margin, fast, streaming, memory_limit,
+                                 booklet_options, optimize, backend, pipeline)
+            futures[future] = (path, out)
+
+        for future in as_completed(futures):
+            path, out = futures[future]
+            try:
+                pages, elapsed, stats, trace = future.result()
+            except Exception as e:
+                failed.append((path, str(e)))
+                log(f"FAIL  {path}: {e}")
+                continue
+            TRACER.merge(trace)
+            rate = pages / elapsed if elapsed > 0 else float("inf")
+            ok.append((path, out, pages, elapsed))
+            detail = f"{pages} pages, {elapsed:.2f}s, {rate:.1f} pages/s"
+            if stats:
+                size_before += stats["size_before"]
+                size_after += stats["size_after"]
+                detail += f", {format_size(stats['size_before'])} -> {format_size(stats['size_after'])}"
+            log(f"OK    {path} -> {out} ({detail})")
+
+    total = time.perf_counter() - started
+    total_pages = sum(r[2] for r in ok)
+    log(f"Done: {len(ok)} ok, {len(failed)} failed, {total_pages} pages in {total:.2f}s "
+        f"({total_pages / total if total > 0 else 0:.1f} pages/s)")
+    if optimize and ok:
+        log(f"Optimized: {format_size(size_before)} -> {format_size(size_after)}")
+    return ok, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch binding margin / booklet processing for PDF files.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, glob patterns or directories")
+    parser.add_argument("-o", "--output-dir", required=True, help="Folder for processed files")
+    parser.add_argument("--mode", choices=sorted(MODE_SUFFIX), default="margin")
+    parser.add_argument("--margin", type=int, default=30, help="Binding margin in points (margin mode)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Margin by expanding page boxes only (content streams are not rewritten; on cropped "
+                             "pages, content outside the crop box may show in the margin)")
+    parser.add_argument("--sheet", choices=list(SHEET_SIZES), default="A4", help="Sheet size (booklet mode)")
+    parser.add_argument("--signature", type=int, default=0, metavar="SHEETS",
+                        help="Sheets per signature; 0 makes a single booklet (booklet mode)")
+    parser.add_argument("--creep", type=float, default=0.0, metavar="PTS",
+                        help="Shift toward the spine per sheet inside a signature (booklet mode)")
+    parser.add_argument("--pipeline", metavar="STAGES",
+                        help="Chain stages in one pass, e.g. 'select:1-8;10,margin:30,scale:0.9,booklet:A3:4:0.5' "
+                             "(implies --mode pipeline; stages: select, margin, scale, fit, booklet, nup)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Write pages to disk as they are produced (bounded memory for very large files)")
+    parser.add_argument("--memory-limit", type=int, default=None, metavar="MB",
+                        help="Approximate memory budget per worker for --streaming (default: 256)")
+    parser.add_argument("--backend", choices=BACKENDS, default="pypdf",
+                        help="Processing engine (pymupdf places pages without re-encoding content)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Deduplicate identical objects, compress streams and use object streams")
+    parser.add_argument("--trace", metavar="FILE", help="Write a JSON timing trace (per stage and per page)")
+    parser.add_argument("--profile", metavar="FILE", help="Write merged cProfile stats of all workers (pstats)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Search directories recursively")
+    args = parser.parse_args(argv)
+    TRACER.configure(trace_path=args.trace, profile_path=args.profile)
+    if args.pipeline:
+        args.mode = "pipeline"
+        try:
+            parse_pipeline(args.pipeline)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.mode == "pipeline":
+        parser.error("--mode pipeline requires --pipeline")
+
+    inputs = collect_inputs(args.inputs, recursive=args.recursive)
+    if not inputs:
+        print("No PDF files found.", file=sys.stderr)
+        return 2
+
+    memory_limit = args.memory_limit * 1024 * 1024 if args.memory_limit else None
+    _, failed = run_batch(inputs, args.output_dir, args.mode, args.margin, workers=args.workers, fast=args.fast,
+                          streaming=args.streaming, memory_limit=memory_limit,
+                          booklet_options={"sheet": args.sheet, "signature_sheets": args.signature,
+                                           "creep": args.creep},
+                          optimize=args.optimize, backend=args.backend, pipeline=args.pipeline)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
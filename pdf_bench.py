@@ -0,0 +1,609 @@
+"""Performans ölçümü: sentetik PDF korpusu + aşama bazlı benchmark.
+
+Korpuslar yerelde, sabit bir seed ile üretilir (aynı argümanlar her zaman aynı
+dosyayı verir) ve önbellek klasöründe saklanır:
+    text   Sadece metin
+    scan   Her sayfası tam sayfa JPEG olan taranmış belge
+    mixed  Farklı sayfa boyutları, döndürülmüş sayfalar, metin + çizim + resim
+
+Her ölçüm ayrı (temiz) bir process'te yapılır; duvar saati süresi, sayfa/sn ve
+process'in tepe bellek kullanımı (RSS) kaydedilir. Sonuçlar JSON olarak yazılır
+ve iki çalıştırma 'compare' ile karşılaştırılabilir.
+
+Örnek:
+    python pdf_bench.py run --kinds text,scan --pages 10,1000 -o sonuc.json
+    python pdf_bench.py run --stages margin,booklet --repeat 5 -o yeni.json
+    python pdf_bench.py run --backends pypdf,pymupdf --stages margin,booklet,merge -o motorlar.json
+    python pdf_bench.py parity --kinds text,mixed --pages 10,200
+    python pdf_bench.py compare sonuc.json yeni.json --threshold 10
+    python pdf_bench.py startup --exe dist/PDF_Margin_Tool.exe -o acilis.json
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+import pypdf
+from PIL import Image, ImageChops, ImageDraw, ImageFilter
+
+from pdf_pipeline import Booklet, Margin, NUp, Scale
+from thumb_cache import default_cache_dir
+
+CORPUS_KINDS = ("text", "scan", "mixed")
+DEFAULT_SEED = 1234
+MERGE_PARTS = 4  # 'merge' aşamasında korpus bu kadar dosyaya bölünür
+RESULT_VERSION = 1
+
+# (genişlik, yükseklik) pt — 'mixed' korpusunda sırayla kullanılır
+MIXED_PAGE_SIZES = ((595.276, 841.89), (612.0, 792.0), (841.89, 1190.551), (419.528, 595.276), (1008.0, 612.0))
+WORDS = ("delgeç", "kitapçık", "sayfa", "kenar", "boşluk", "margin", "booklet", "print", "paper",
+         "binding", "ders", "not", "özet", "bölüm", "chapter", "the", "and", "of", "lorem", "ipsum")
+
+
+# --- Korpus üretimi ---
+
+def corpus_path(directory, kind, pages, seed=DEFAULT_SEED):
+    return os.path.join(directory, f"{kind}_{pages}_{seed}.pdf")
+
+
+def _text_lines(rng, count):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))) for _ in range(count)]
+
+
+def _scan_image(rng, width=620, height=877):
+    """Taranmış sayfa benzeri gri tonlu JPEG (seed'e göre tekrarlanabilir)."""
+    img = Image.new("L", (width, height), 235)
+    draw = ImageDraw.Draw(img)
+    y = 60
+    while y < height - 60:
+        x = 50
+        while x < width - 50:
+            w = rng.randint(10, 60)
+            draw.rectangle((x, y, min(x + w, width - 50), y + 8), fill=rng.randint(20, 90))
+            x += w + rng.randint(6, 14)
+        y += rng.randint(16, 22)
+    noise = Image.frombytes("L", (width // 4, height // 4), rng.randbytes((width // 4) * (height // 4)))
+    img = Image.blend(img, noise.resize((width, height)).filter(ImageFilter.BLUR), 0.12)
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=75)
+    return buf.getvalue()
+
+
+def generate_corpus(kind, pages, path, seed=DEFAULT_SEED):
+    """Belirtilen türde ve sayfa sayısında sentetik bir PDF üretir."""
+    if kind not in CORPUS_KINDS:
+        raise ValueError(f"Unknown corpus kind: {kind}")
+    rng = random.Random(f"{kind}:{pages}:{seed}")
+    doc = fitz.open()
+    shared_images = [_scan_image(rng, 300, 200) for _ in range(4)] if kind == "mixed" else []
+
+    for i in range(pages):
+        if kind == "mixed":
+            width, height = MIXED_PAGE_SIZES[i % len(MIXED_PAGE_SIZES)]
+        else:
+            width, height = MIXED_PAGE_SIZES[0]
+        page = doc.new_page(width=width, height=height)
+
+        if kind == "scan":
+            page.insert_image(page.rect, stream=_scan_image(rng))
+            continue
+
+        line_count = int((height - 120) // 14)
+        page.insert_text((50, 60), "\n".join(_text_lines(rng, line_count)), fontsize=10, lineheight=1.2)
+        if kind == "mixed":
+            for _ in range(3):
+                x, y = rng.uniform(40, width - 140), rng.uniform(40, height - 140)
+                page.draw_rect(fitz.Rect(x, y, x + 100, y + 60), color=(0, 0, 0.6), width=1)
+            if i % 3 == 0:
+                page.insert_image(fitz.Rect(60, height - 260, 360, height - 60),
+                                  stream=shared_images[i % len(shared_images)])
+            if i % 7 == 3:
+                page.set_rotation(90)
+
+    tmp_path = path + ".part"
+    doc.save(tmp_path, garbage=1, deflate=True)
+    doc.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def ensure_corpus(directory, kind, pages, seed=DEFAULT_SEED, log=print):
+    path = corpus_path(directory, kind, pages, seed)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        start = time.perf_counter()
+        generate_corpus(kind, pages, path, seed)
+        log(f"generated {path} ({time.perf_counter() - start:.1f}s)")
+    return path
+
+
+def split_corpus(path, out_dir, parts=MERGE_PARTS):
+    """'merge' aşaması için korpusu ardışık parçalara böler."""
+    paths = []
+    with fitz.open(path) as src:
+        size = max(1, -(-src.page_count // parts))
+        for n, start in enumerate(range(0, src.page_count, size)):
+            part = fitz.open()
+            part.insert_pdf(src, from_page=start, to_page=min(start + size, src.page_count) - 1)
+            part_path = os.path.join(out_dir, f"part{n}.pdf")
+            part.save(part_path)
+            part.close()
+            paths.append(part_path)
+    return paths
+
+
+# --- Aşamalar (her biri işlenen girdi sayfa sayısını döndürür) ---
+
+def _file_sources(path):
+    return [(path, i) for i in range(pypdf.PdfReader(path).get_num_pages())]
+
+
+def _stage_margin(inputs, out_dir, backend, fast=False):
+    from pdf_engine import process_sources
+    return process_sources(_file_sources(inputs[0]), os.path.join(out_dir, "margin.pdf"), "margin",
+                           backend=backend, margin=30, fast=fast)
+
+
+def _stage_margin_fast(inputs, out_dir, backend):
+    return _stage_margin(inputs, out_dir, backend, fast=True)
+
+
+def _stage_booklet(inputs, out_dir, backend):
+    from pdf_engine import process_sources
+    sources = _file_sources(inputs[0])
+    process_sources(sources, os.path.join(out_dir, "booklet.pdf"), "booklet", backend=backend)
+    return len(sources)
+
+
+def _stage_nup(inputs, out_dir, backend):
+    """El notu dizgisi: 16-up, kes-ve-yığ sırası."""
+    from pdf_engine import process_sources
+    sources = _file_sources(inputs[0])
+    process_sources(sources, os.path.join(out_dir, "nup.pdf"), "pipeline", backend=backend,
+                    stages=[NUp(16, "A3", "cut_stack")])
+    return len(sources)
+
+
+def _stage_merge(inputs, out_dir, backend):
+    """Arayüzdeki 'PROCESS PDF' birleştirmesi: birden çok dosya, worker thread'de."""
+    from processing import ProcessingJob
+    sources = []
+    for path in inputs:
+        sources.extend(_file_sources(path))
+    job = ProcessingJob(sources, os.path.join(out_dir, "merged.pdf"), "margin", 0, backend=backend)
+    job.start()
+    job.wait()
+    while not job.messages.empty():
+        msg = job.messages.get_nowait()
+        if msg[0] == "error":
+            raise RuntimeError(msg[1])
+    return len(sources)
+
+
+def _run_thumbnails(path, cache):
+    from thumbnails import ThumbnailLoader
+    loader = ThumbnailLoader(cache=cache)
+    loader.submit(path)
+    count = 0
+    while True:
+        msg = loader.results.get()
+        if msg[0] == "thumb":
+            count += 1
+        elif msg[0] == "error":
+            raise RuntimeError(msg[3])
+        elif msg[0] == "done":
+            return count
+
+
+def _thumbnail_cache(out_dir):
+    from thumb_cache import ThumbnailCache
+    return ThumbnailCache(directory=os.path.join(out_dir, "thumbs"))
+
+
+def _stage_thumbnails(inputs, out_dir, backend):
+    """add_pdf'in arka plandaki küçük resim üretimi (önbelleksiz)."""
+    return _run_thumbnails(inputs[0], None)
+
+
+def _stage_thumbnails_cached(inputs, out_dir, backend):
+    """Aynı dosya ikinci kez açıldığında: küçük resimler disk önbelleğinden gelir."""
+    return _run_thumbnails(inputs[0], _thumbnail_cache(out_dir))
+
+
+def _warm_thumbnail_cache(inputs, out_dir):
+    _run_thumbnails(inputs[0], _thumbnail_cache(out_dir))
+
+
+STAGES = {
+    "margin": _stage_margin,
+    "margin_fast": _stage_margin_fast,
+    "booklet": _stage_booklet,
+    "nup": _stage_nup,
+    "merge": _stage_merge,
+    "thumbnails": _stage_thumbnails,
+    "thumbnails_cached": _stage_thumbnails_cached,
+}
+
+# Backend'den bağımsız aşamalar (her korpus için bir kez ölçülür)
+BACKEND_INDEPENDENT = {"thumbnails", "thumbnails_cached"}
+
+# Ölçümden önce aynı process'te çalışan hazırlık adımları (süreye dahil edilmez)
+STAGE_SETUP = {
+    "thumbnails_cached": _warm_thumbnail_cache,
+}
+
+
+# --- Ölçüm ---
+
+def peak_rss_bytes():
+    """Bu process'in tepe bellek kullanımı (byte); ölçülemiyorsa None."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux'ta KB
+
+
+def _measure(stage, inputs, out_dir, backend):
+    """Worker process içinde tek bir aşamayı çalıştırır ve ölçer."""
+    setup = STAGE_SETUP.get(stage)
+    if setup is not None:
+        setup(inputs, out_dir)
+
+    start = time.perf_counter()
+    pages = STAGES[stage](inputs, out_dir, backend)
+    elapsed = time.perf_counter() - start
+    return pages, elapsed, peak_rss_bytes()
+
+
+def measure(stage, inputs, repeat=3, backend="pypdf"):
+    """Aşamayı her seferinde yeni bir process'te 'repeat' kez ölçer (en iyi süre, en yüksek bellek)."""
+    times, peaks, pages = [], [], 0
+    context = multiprocessing.get_context("spawn")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="pdf_bench_") as tmp:
+            stage_inputs = split_corpus(inputs[0], tmp) if stage == "merge" else inputs
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                pages, elapsed, peak = pool.submit(_measure, stage, stage_inputs, tmp, backend).result()
+        times.append(elapsed)
+        if peak is not None:
+            peaks.append(peak)
+
+    best = min(times)
+    return {
+        "pages": pages,
+        "seconds": round(best, 4),
+        "seconds_all": [round(t, 4) for t in times],
+        "pages_per_sec": round(pages / best, 1) if best > 0 else None,
+        "peak_rss_mb": round(max(peaks) / (1024 * 1024), 1) if peaks else None,
+    }
+
+
+def run_benchmarks(kinds, page_counts, stages, repeat=3, corpus_dir=None, seed=DEFAULT_SEED,
+                   backends=("pypdf",), log=print):
+    corpus_dir = corpus_dir or os.path.join(default_cache_dir(), "bench")
+    results = []
+    for kind in kinds:
+        for pages in page_counts:
+            path = ensure_corpus(corpus_dir, kind, pages, seed, log=log)
+            for stage in stages:
+                for backend in backends[:1] if stage in BACKEND_INDEPENDENT else backends:
+                    result = {"corpus": f"{kind}-{pages}", "kind": kind, "stage": stage, "backend": backend}
+                    result.update(measure(stage, [path], repeat=repeat, backend=backend))
+                    results.append(result)
+                    log(f"{result['corpus']:<14} {stage:<18} {backend:<8} {result['seconds']:>9.3f}s "
+                        f"{result['pages_per_sec'] or 0:>10.1f} pages/s {result['peak_rss_mb'] or 0:>8.1f} MB")
+    if len(backends) > 1:
+        log_backend_speedups(results, backends, log=log)
+    return {"version": RESULT_VERSION, "meta": environment_info(seed, repeat), "results": results}
+
+
+def log_backend_speedups(results, backends, log=print):
+    """Aynı korpus/aşama için backend'lerin ilkine göre hızlanma oranı."""
+    base_backend = backends[0]
+    times = {(r["corpus"], r["stage"], r["backend"]): r["seconds"] for r in results}
+    for (corpus, stage, backend), seconds in times.items():
+        base = times.get((corpus, stage, base_backend))
+        if backend == base_backend or not base or not seconds:
+            continue
+        log(f"{corpus:<14} {stage:<18} {backend} is {base / seconds:.2f}x vs {base_backend}")
+
+
+def environment_info(seed, repeat):
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "pypdf": pypdf.__version__,
+        "pymupdf": fitz.VersionBind,
+        "seed": seed,
+        "repeat": repeat,
+    }
+
+
+# --- Backend eşdeğerliği (parity) ---
+
+# (ad, mod, seçenekler)
+PARITY_CASES = (
+    ("margin", "margin", {"margin": 30}),
+    ("margin_fast", "margin", {"margin": 30, "fast": True}),
+    ("merge", "margin", {"margin": 0}),
+    ("booklet", "booklet", {}),
+    ("booklet_a3_sig", "booklet", {"sheet": "A3", "signature_sheets": 2, "creep": 2.0}),
+    ("pipeline", "pipeline", {"stages": [Margin(30), Scale(0.8), Booklet("A3", 1, 1.0)]}),
+    ("nup8_cut_stack", "pipeline", {"stages": [NUp(8, "A3", "cut_stack")]}),
+    ("nup4_step_repeat", "pipeline", {"stages": [NUp(4, "A4", "step_repeat")]}),
+)
+PARITY_DPI = 36
+PARITY_PIXEL_DELTA = 40     # Gri tonda bu kadar farklı olan "farklı piksel" sayılır
+PARITY_TOLERANCE = 0.005    # Sayfadaki farklı piksel oranı (kenar yumuşatma farkları için)
+
+
+def _page_difference(a, b):
+    pa = a.get_pixmap(dpi=PARITY_DPI)
+    pb = b.get_pixmap(dpi=PARITY_DPI)
+    if (pa.width, pa.height) != (pb.width, pb.height):
+        return 1.0
+    diff = ImageChops.difference(Image.frombytes("RGB", (pa.width, pa.height), pa.samples),
+                                 Image.frombytes("RGB", (pb.width, pb.height), pb.samples))
+    histogram = diff.convert("L").histogram()
+    return sum(histogram[PARITY_PIXEL_DELTA + 1:]) / (pa.width * pa.height)
+
+
+def check_parity(path, log=print):
+    """
+    Her PARITY_CASES için iki backend'in çıktısını render edip karşılaştırır
+    (döndürülmüş ve kırpılmış sayfalar dahil).
+    Uyuşmayan (durum, sayfa, fark) listesini döndürür.
+    """
+    from pdf_engine import process_sources
+    sources = _file_sources(path)
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="pdf_parity_") as tmp:
+        for name, mode, options in PARITY_CASES:
+            outputs = {}
+            for backend in ("pypdf", "pymupdf"):
+                outputs[backend] = os.path.join(tmp, f"{name}_{backend}.pdf")
+                process_sources(sources, outputs[backend], mode, backend=backend, **options)
+            with fitz.open(outputs["pypdf"]) as a, fitz.open(outputs["pymupdf"]) as b:
+                if a.page_count != b.page_count:
+                    failures.append((name, None, f"page count {a.page_count} != {b.page_count}"))
+                    log(f"{os.path.basename(path)} {name:<16} FAIL page count {a.page_count} != {b.page_count}")
+                    continue
+                for n in range(a.page_count):
+                    diff = _page_difference(a[n], b[n])
+                    if diff > PARITY_TOLERANCE:
+                        failures.append((name, n, diff))
+                bad = sum(1 for f in failures if f[0] == name)
+                log(f"{os.path.basename(path)} {name:<16} {'OK  ' if not bad else 'FAIL'} "
+                    f"{a.page_count} pages compared, {bad} different")
+    return failures
+
+
+# --- Açılış süresi ---
+
+def measure_startup(command, repeat=5, timeout=120):
+    """
+    GUI'yi 'command' ile (kaynak: python app.py, derlenmiş: exe yolu) --startup-benchmark
+    bayrağıyla 'repeat' kez başlatır. Süre process'in başlatılmasından ilk karenin
+    çizilmesine kadardır; onefile exe'nin açılması ve Python'un başlaması dahildir.
+    """
+    times, imports, heavy = [], [], set()
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="pdf_startup_") as tmp:
+            report_path = os.path.join(tmp, "startup.json")
+            started = time.time()
+            subprocess.run(command + ["--startup-benchmark", report_path], timeout=timeout, check=True,
+                           stdout=subprocess.DEVNULL)
+            with open(report_path, encoding="utf-8") as f:
+                report = json.load(f)
+        times.append(report["first_frame"] - started)
+        imports.append(report["import_seconds"])
+        heavy.update(report["heavy_modules"])
+
+    best = min(times)
+    return {
+        "seconds": round(best, 4),
+        "seconds_all": [round(t, 4) for t in times],
+        "import_seconds": min(imports),
+        "heavy_modules_at_first_frame": sorted(heavy),
+    }
+
+
+def run_startup(executables=(), source=True, repeat=5, log=print):
+    """Kaynaktan ve verilen exe'lerden açılış süresini ölçer; 'compare' ile uyumlu rapor döndürür."""
+    commands = []
+    if source:
+        app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+        commands.append(("source", [sys.executable, app_path]))
+    for exe in executables:
+        commands.append((os.path.basename(exe), [os.path.abspath(exe)]))
+
+    results = []
+    for name, command in commands:
+        result = {"corpus": "startup", "kind": "startup", "stage": name, "backend": "gui"}
+        result.update(measure_startup(command, repeat=repeat))
+        results.append(result)
+        loaded = ", ".join(result["heavy_modules_at_first_frame"]) or "none"
+        log(f"{'startup':<14} {name:<26} {result['seconds']:>9.3f}s first frame "
+            f"(imports {result['import_seconds']:.3f}s, heavy modules loaded: {loaded})")
+    return {"version": RESULT_VERSION, "meta": environment_info(None, repeat), "results": results}
+
+
+# --- Karşılaştırma ---
+
+def _pct(old, new):
+    if not old or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def _result_key(result):
+    # Backend alanı olmayan eski sonuç dosyaları pypdf ile ölçülmüştür
+    return result["corpus"], f"{result['stage']}[{result.get('backend', 'pypdf')}]"
+
+
+def compare_results(old, new, threshold=10.0, log=print):
+    """
+    İki sonuç dosyasını (corpus, stage) bazında karşılaştırır. Süresi threshold
+    yüzdesinden fazla artan ölçümlerin listesini döndürür.
+    """
+    old_map = {_result_key(r): r for r in old["results"]}
+    regressions = []
+    log(f"{'corpus':<14} {'stage':<26} {'old s':>9} {'new s':>9} {'time':>8} {'memory':>8}")
+    for r in new["results"]:
+        key = _result_key(r)
+        base = old_map.get(key)
+        if base is None:
+            log(f"{key[0]:<14} {key[1]:<26} {'-':>9} {r['seconds']:>9.3f}      new")
+            continue
+        dt = _pct(base["seconds"], r["seconds"])
+        dm = _pct(base.get("peak_rss_mb"), r.get("peak_rss_mb"))
+        flag = ""
+        if dt is not None and dt > threshold:
+            flag = "  REGRESSION"
+            regressions.append((key, dt))
+        mem = f"{dm:+7.1f}%" if dm is not None else f"{'-':>8}"
+        log(f"{key[0]:<14} {key[1]:<26} {base['seconds']:>9.3f} {r['seconds']:>9.3f} {dt:+7.1f}% {mem}{flag}")
+    return regressions
+
+
+# --- Komut satırı ---
+
+def _csv(value):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the PDF margin / booklet tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_corpus_args(p):
+        p.add_argument("--kinds", type=_csv, default=list(CORPUS_KINDS), help="Comma separated: text,scan,mixed")
+        p.add_argument("--pages", type=_csv, default=["10", "1000"], help="Comma separated page counts (10-10000)")
+        p.add_argument("--seed", type=int, default=DEFAULT_SEED)
+        p.add_argument("--corpus-dir", default=None, help="Where generated corpora are kept (default: user cache)")
+
+    gen = sub.add_parser("generate", help="Only generate the synthetic corpora")
+    add_corpus_args(gen)
+
+    run = sub.add_parser("run", help="Run benchmarks and write JSON results")
+    add_corpus_args(run)
+    run.add_argument("--stages", type=_csv, default=list(STAGES), help="Comma separated: " + ",".join(STAGES))
+    run.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best time is kept")
+    run.add_argument("--backends", type=_csv, default=["pypdf"],
+                     help="Comma separated processing engines to measure: pypdf,pymupdf")
+    run.add_argument("-o", "--output", required=True, help="JSON results file")
+
+    par = sub.add_parser("parity", help="Check that the pypdf and pymupdf engines produce the same pages")
+    add_corpus_args(par)
+
+    cmp_ = sub.add_parser("compare", help="Compare two JSON result files")
+    cmp_.add_argument("old")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--threshold", type=float, default=10.0, help="Time increase (%%) counted as a regression")
+
+    sub.add_parser("clean", help="Delete generated corpora").add_argument("--corpus-dir", default=None)
+
+    start = sub.add_parser("startup", help="Measure GUI time to first frame (source and/or frozen builds)")
+    start.add_argument("--exe", action="append", default=[], help="PyInstaller build to measure (repeatable)")
+    start.add_argument("--no-source", action="store_true", help="Only measure the --exe builds")
+    start.add_argument("--repeat", type=int, default=5, help="Launches per measurement; the best time is kept")
+    start.add_argument("-o", "--output", help="JSON results file (same format as 'run')")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.old, encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        return 1 if compare_results(old, new, args.threshold) else 0
+
+    if args.command == "clean":
+        shutil.rmtree(args.corpus_dir or os.path.join(default_cache_dir(), "bench"), ignore_errors=True)
+        return 0
+
+    if args.command == "startup":
+        if args.no_source and not args.exe:
+            parser.error("--no-source needs at least one --exe")
+        report = run_startup(args.exe, source=not args.no_source, repeat=max(1, args.repeat))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+            print(f"Results written to {args.output}")
+        return 0
+
+    for kind in args.kinds:
+        if kind not in CORPUS_KINDS:
+            parser.error(f"unknown corpus kind: {kind}")
+    try:
+        page_counts = [int(p) for p in args.pages]
+    except ValueError:
+        parser.error("--pages expects integers")
+    if any(not 1 <= p <= 10000 for p in page_counts):
+        parser.error("--pages values must be between 1 and 10000")
+
+    corpus_dir = args.corpus_dir or os.path.join(default_cache_dir(), "bench")
+    if args.command == "generate":
+        for kind in args.kinds:
+            for pages in page_counts:
+                ensure_corpus(corpus_dir, kind, pages, args.seed)
+        return 0
+
+    if args.command == "parity":
+        failures = []
+        for kind in args.kinds:
+            for pages in page_counts:
+                failures += check_parity(ensure_corpus(corpus_dir, kind, pages, args.seed))
+        return 1 if failures else 0
+
+    for stage in args.stages:
+        if stage not in STAGES:
+            parser.error(f"unknown stage: {stage}")
+    from pdf_engine import BACKENDS
+    for backend in args.backends:
+        if backend not in BACKENDS:
+            parser.error(f"unknown backend: {backend}")
+    report = run_benchmarks(args.kinds, page_counts, args.stages, repeat=max(1, args.repeat),
+                            corpus_dir=corpus_dir, seed=args.seed, backends=tuple(args.backends))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
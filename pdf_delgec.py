@@ -1,19 +1,22 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
-from pypdf import PdfReader, PdfWriter, Transformation
+
+from pdf_engine import add_binding_margin, delgec_output_path
+from pdf_trace import profile
 
 class PDFMarginApp:
     def __init__(self, root):
         self.root = root
         self.root.title("PDF Delgeç Payı Ekleyici")
-        self.root.geometry("500x250")
+        self.root.geometry("500x280")
         self.root.resizable(False, False)
 
         # Değişkenler
         self.input_path = tk.StringVar()
         self.output_folder = tk.StringVar()
         self.margin_value = tk.IntVar(value=30)
+        self.fast_mode = tk.BooleanVar(value=False)
 
         self.create_widgets()
 
@@ -36,14 +39,15 @@ class PDFMarginApp:
         ttk.Label(main_frame, text="Margin Değeri (Puan):").grid(row=2, column=0, sticky="w", pady=5)
         spinbox = ttk.Spinbox(main_frame, from_=0, to=200, textvariable=self.margin_value, width=10)
         spinbox.grid(row=2, column=1, sticky="w", padx=5, pady=5)
+        ttk.Checkbutton(main_frame, text="Hızlı mod (içerik yeniden yazılmaz)", variable=self.fast_mode).grid(row=3, column=1, sticky="w", padx=5)
 
         # 4. Başlat Butonu
         self.start_button = ttk.Button(main_frame, text="İşlemi Başlat", command=self.start_process)
-        self.start_button.grid(row=3, column=0, columnspan=3, pady=20, sticky="ew")
+        self.start_button.grid(row=4, column=0, columnspan=3, pady=20, sticky="ew")
 
         # Durum Çubuğu
         self.status_label = ttk.Label(main_frame, text="Hazır", foreground="gray")
-        self.status_label.grid(row=4, column=0, columnspan=3, sticky="w")
+        self.status_label.grid(row=5, column=0, columnspan=3, sticky="w")
 
     def select_input_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("PDF Dosyaları", "*.pdf")])
@@ -58,40 +62,6 @@ class PDFMarginApp:
         if folder_path:
             self.output_folder.set(folder_path)
 
-    def add_binding_margin(self, input_pdf_path, output_pdf_path, binding_margin_points):
-        """
-        Orijinal mantık korunmuştur:
-        Tek sayfalar (1, 3...): İçeriği SAĞA kaydırır.
-        Çift sayfalar (2, 4...): İçeriği SOLA yaslar (kaydırma 0).
-        """
-        reader = PdfReader(input_pdf_path)
-        writer = PdfWriter()
-
-        for i, page in enumerate(reader.pages):
-            # Sayfa boyutlarını al
-            width = float(page.mediabox.width)
-            height = float(page.mediabox.height)
-            page_num = i + 1
-
-            # Tek sayfalarda sağa kaydır (Boşluk solda kalır)
-            if page_num % 2 == 1:
-                tx = binding_margin_points
-            # Çift sayfalarda kaydırma yok (Boşluk sağda kalır, sayfa genişlediği için)
-            else:
-                tx = 0
-
-            # Dönüşüm oluştur
-            op = Transformation().translate(tx=tx, ty=0)
-
-            # Genişletilmiş yeni boş sayfa oluştur
-            new_page = writer.add_blank_page(width=width + binding_margin_points, height=height)
-
-            # Orijinal içeriği yeni sayfaya yerleştir
-            new_page.merge_transformed_page(page, op)
-
-        with open(output_pdf_path, "wb") as f:
-            writer.write(f)
-
     def start_process(self):
         input_file = self.input_path.get()
         output_dir = self.output_folder.get()
@@ -115,12 +85,9 @@ class PDFMarginApp:
         self.root.update()
 
         try:
-            filename = os.path.basename(input_file)
-            name, ext = os.path.splitext(filename)
-            output_filename = f"{name}_delgec{ext}"
-            output_path = os.path.join(output_dir, output_filename)
+            output_path = delgec_output_path(input_file, output_dir)
 
-            self.add_binding_margin(input_file, output_path, margin)
+            add_binding_margin(input_file, output_path, margin, fast=self.fast_mode.get())
 
             self.status_label.config(text="Tamamlandı", foreground="green")
             messagebox.showinfo("Başarılı", f"İşlem Tamamlandı!\nDosya konumu:\n{output_path}")
@@ -134,4 +101,5 @@ class PDFMarginApp:
 if __name__ == "__main__":
     root = tk.Tk()
     app = PDFMarginApp(root)
-    root.mainloop()
\ No newline at end of file
+    with profile():  # PDF_MARGIN_PROFILE ayarlıysa
+        root.mainloop()
\ No newline at end of file
@@ -0,0 +1,324 @@
+"""Arayüzden bağımsız PDF işleme motoru (Margin & Booklet).
+
+Tkinter'a hiç dokunmaz; hem GUI'ler (app.py, pdf_delgec.py) hem de
+komut satırı aracı (pdf_batch.py) bu fonksiyonları kullanır.
+
+pypdf ilk işlemde yüklenir; modülü içe aktarmak (ör. BACKENDS için) arayüzün
+açılışını yavaşlatmaz.
+"""
+import os
+
+from pdf_imposition import (
+    booklet_sheets,
+    fit_matrix,
+    make_sheet,
+    page_box,
+    page_rotation,
+    page_to_xobject,
+    sheet_size,
+    upright_matrix,
+    upright_size,
+)
+from pdf_optimize import optimize_pdf
+from pdf_pipeline import pipeline_pages
+from pdf_trace import count as trace_count, span
+
+
+class ProcessingCancelled(Exception):
+    """İşlem kullanıcı tarafından iptal edildi."""
+
+
+def check_progress(progress, cancel, stage, done, total):
+    """
+    Uzun döngülerde her adımda çağrılır: iptal istendiyse ProcessingCancelled
+    fırlatır, değilse ilerlemeyi progress(stage, done, total) ile bildirir.
+    """
+    if cancel is not None and cancel.is_set():
+        raise ProcessingCancelled()
+    if progress is not None:
+        progress(stage, done, total)
+
+
+# /Rotate değerine göre ekranda SOL ve SAĞ görünen kenarın MediaBox'taki karşılığı
+_VISUAL_LEFT_EDGE = {0: "left", 90: "bottom", 180: "right", 270: "top"}
+_VISUAL_RIGHT_EDGE = {0: "right", 90: "top", 180: "left", 270: "bottom"}
+
+
+def _expanded_box(box, edge, amount):
+    """Kutunun verilen kenardan 'amount' kadar büyütülmüş yeni bir kopyasını döndürür."""
+    from pypdf.generic import RectangleObject
+
+    left, bottom, right, top = (float(v) for v in (box.left, box.bottom, box.right, box.top))
+    if edge == "left":
+        left -= amount
+    elif edge == "right":
+        right += amount
+    elif edge == "bottom":
+        bottom -= amount
+    else:
+        top += amount
+    return RectangleObject([left, bottom, right, top])
+
+
+# Hızlı modda aynı kenardan genişletilen sayfa kutuları (pypdf özellik adı, PDF anahtarı)
+_PAGE_BOXES = (("mediabox", "/MediaBox"), ("cropbox", "/CropBox"), ("bleedbox", "/BleedBox"),
+               ("trimbox", "/TrimBox"), ("artbox", "/ArtBox"))
+
+
+def expand_page_for_margin(page, margin, odd):
+    """
+    Hızlı mod: İçerik akışına hiç dokunmadan sayfa kutularını (MediaBox, CropBox,
+    BleedBox, TrimBox, ArtBox) aynı kenardan genişletir; payı kesimden sonra da
+    sayfada kalır. Tek sayfalarda boşluk solda, çift sayfalarda sağda kalır
+    (döndürülmüş sayfalar dahil; /Rotate korunur, görünüm yavaş modla aynıdır).
+    Tek fark: CropBox sayfayı kırpıyorsa, genişleyen kenarda CropBox dışında kalan
+    içerik payda görünür (içerik akışına dokunulmadığı için kırpılamaz).
+    Kutular yeniden oluşturulur; kaynak sayfayla paylaşılan nesneler değişmez.
+    """
+    edge = (_VISUAL_LEFT_EDGE if odd else _VISUAL_RIGHT_EDGE)[page_rotation(page)]
+    for attr, key in _PAGE_BOXES:
+        if attr == "mediabox" or key in page:
+            setattr(page, attr, _expanded_box(getattr(page, attr), edge, margin))
+
+
+def margin_pages(pages, writer, margin, fast=False, progress=None, cancel=None, start=0):
+    """
+    Delgeç payı ekler ve sonucu writer'a yazar:
+    Tek sayfalar (1, 3...): İçeriği SAĞA kaydırır.
+    Çift sayfalar (2, 4...): İçeriği SOLA yaslar (kaydırma 0).
+    Sayfalar herhangi bir PdfReader'dan (veya birden fazlasından) gelebilir.
+    start: ilk sayfanın asıl belgedeki sırası (0 tabanlı); belge parça parça
+    üretilirken tek/çift kuralı buna göre uygulanır.
+
+    fast=True ise sayfalar olduğu gibi kopyalanır ve yalnızca sayfa kutuları
+    genişletilir; içerik akışları çözülmez/yeniden kodlanmaz.
+    """
+    total = len(pages) if hasattr(pages, "__len__") else None
+    count = 0
+    if fast or not margin:
+        # Pay yoksa (birleştirme) sayfalar olduğu gibi kopyalanır; PyMuPDF yoluyla aynı
+        for i, page in enumerate(pages):
+            check_progress(progress, cancel, "margin", i, total)
+            with span("margin.page", page=i, fast=True):
+                new_page = writer.add_page(page)
+                if margin:
+                    expand_page_for_margin(new_page, margin, odd=((start + i) % 2 == 0))
+            count += 1
+        return count
+
+    from pypdf import Transformation
+
+    for i, page in enumerate(pages):
+        check_progress(progress, cancel, "margin", i, total)
+        # Görünen (döndürülmüş, kırpılmış) boyut; içerik dik konuma taşınarak yerleşir
+        box = page_box(page)
+        rotation = page_rotation(page)
+        width, height = upright_size(box, rotation)
+        page_num = start + i + 1
+
+        # Tek sayfalarda sağa kaydır (Boşluk solda kalır)
+        if page_num % 2 == 1:
+            tx = margin
+        # Çift sayfalarda kaydırma yok (Boşluk sağda kalır, sayfa genişlediği için)
+        else:
+            tx = 0
+
+        op = Transformation(upright_matrix(box, rotation)).translate(tx=tx, ty=0)
+        with span("margin.page", page=i):
+            new_page = writer.add_blank_page(width=width + margin, height=height)
+            new_page.merge_transformed_page(page, op)
+        count += 1
+
+    return count
+
+
+def delgec_output_path(input_path, output_dir):
+    """Delgeç aracının çıktı adı: 'ders.pdf' -> '<output_dir>/ders_delgec.pdf'."""
+    name, ext = os.path.splitext(os.path.basename(input_path))
+    return os.path.join(output_dir, f"{name}_delgec{ext}")
+
+
+def add_binding_margin(input_path, output_path, margin, fast=False, streaming=False, memory_limit=None):
+    """Dosyadan dosyaya delgeç payı ekler. İşlenen sayfa sayısını döndürür."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(input_path)
+    return write_pages(reader.pages, output_path, "margin", margin, fast=fast,
+                       streaming=streaming, memory_limit=memory_limit)
+
+
+def booklet_pages(pages, writer, sheet="A4", signature_sheets=0, creep=0.0, progress=None, cancel=None):
+    """
+    Sayfaları yatay kağıda 2-up kitapçık (saddle-stitch) sırasıyla dizer.
+    sheet: SHEET_SIZES anahtarı. signature_sheets > 0 ise N kağıtlık formalar
+    üretilir. creep: formanın içine doğru her kağıtta sayfaların sırta kaydırılacağı
+    miktar (pt). Her kaynak sayfa tam bir kez yerleşir ve bir kez Form XObject olarak
+    gömülür; XObject'ler saklanmaz (bellek sayfa sayısıyla büyümez).
+    Üretilen kağıt yüzü sayısını döndürür.
+    """
+    pages = list(pages)
+    if not pages:
+        return 0
+
+    out_width, out_height = sheet_size(sheet)
+    half = out_width / 2
+    sheets = booklet_sheets(len(pages), signature_sheets)
+
+    def place(index, x_offset, shift):
+        if index >= len(pages):
+            return None  # Tamamlama için boş yüz
+        page = pages[index]
+        return page_to_xobject(page), fit_matrix(page_box(page), half, out_height, x_offset, 0, shift, page_rotation(page))
+
+    for n, (depth, front, back) in enumerate(sheets):
+        check_progress(progress, cancel, "booklet", n, len(sheets))
+        # İç kağıtlar dışarı taşar; sol sayfa sağa, sağ sayfa sola (sırta) kaydırılır
+        shift = creep * depth
+        with span("booklet.sheet", sheet=n):
+            for left, right in (front, back):
+                placements = [p for p in (place(left, 0, shift), place(right, half, -shift)) if p]
+                writer.add_page(make_sheet(out_width, out_height, placements))
+
+    return len(sheets) * 2
+
+
+def make_booklet(input_path, output_path, sheet="A4", signature_sheets=0, creep=0.0,
+                 streaming=False, memory_limit=None):
+    """Dosyadan dosyaya kitapçık dizer. Üretilen kağıt yüzü sayısını döndürür."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(input_path)
+    return write_pages(reader.pages, output_path, "booklet", sheet=sheet, signature_sheets=signature_sheets,
+                       creep=creep, streaming=streaming, memory_limit=memory_limit)
+
+
+def write_pages(pages, output_path, mode, margin=0, fast=False, progress=None, cancel=None,
+                streaming=False, memory_limit=None, sheet="A4", signature_sheets=0, creep=0.0,
+                optimize=False, stats=None, stages=None, margin_start=0):
+    """
+    Sayfalara (hangi reader'dan gelirse gelsin) seçilen işlemi uygular ve
+    sonucu tek seferde output_path'e yazar. Ara dosya oluşturmaz.
+    Önce '.part' dosyasına yazılır; hata veya iptalde yarım çıktı silinir.
+    streaming=True ise sayfalar işlendikçe diske yazılır ve bellek kullanımı
+    memory_limit (byte) civarında sınırlı kalır (bkz. pdf_stream_writer).
+    sheet / signature_sheets / creep sadece booklet modunda kullanılır.
+    mode="pipeline" ise stages (pdf_pipeline aşamaları) tek geçişte uygulanır.
+    margin_start: margin modunda ilk sayfanın asıl belgedeki sırası (bkz. margin_pages).
+    optimize=True ise çıktı pdf_optimize ile küçültülür; stats sözlüğü verilmişse
+    "size_before" / "size_after" byte değerleri yazılır.
+    """
+    from pypdf import PdfWriter
+
+    from pdf_stream_writer import StreamingPdfWriter
+
+    def produce(part_path):
+        with open(part_path, "wb") as f:
+            writer = StreamingPdfWriter(f, memory_limit) if streaming else PdfWriter()
+            with span(mode, streaming=streaming, fast=fast):
+                if mode == "margin":
+                    count = margin_pages(pages, writer, margin, fast=fast, progress=progress, cancel=cancel,
+                                         start=margin_start)
+                elif mode == "booklet":
+                    count = booklet_pages(pages, writer, sheet=sheet, signature_sheets=signature_sheets,
+                                          creep=creep, progress=progress, cancel=cancel)
+                elif mode == "pipeline":
+                    count = pipeline_pages(pages, writer, stages or [], progress=progress, cancel=cancel)
+                else:
+                    raise ValueError(f"Unknown mode: {mode}")
+
+            check_progress(progress, cancel, "write", 0, 1)
+            with span("writer.write") as write_span:
+                writer.write(f)
+                write_span.set(bytes=f.tell())
+        return count
+
+    return write_output(output_path, produce, progress, cancel, optimize, stats)
+
+
+def write_output(output_path, produce, progress=None, cancel=None, optimize=False, stats=None):
+    """
+    Her iki motorun ortak yazma adımı. produce(part_path) çıktıyı part_path'e yazar ve
+    sayfa sayısını döndürür; sonuç optimize edilir (istenirse) ve output_path'e taşınır.
+    Hata veya iptalde yarım dosyalar silinir. Sayfa yoksa produce dosya yazmayabilir:
+    boş çıktı iki motorda da aynı biçimde (sayfasız bir PDF) yazılır ve optimize edilmez.
+    """
+    from pypdf import PdfWriter
+
+    part_path = output_path + ".part"
+    opt_path = output_path + ".opt.part"
+    try:
+        count = produce(part_path)
+        if not count:
+            with open(part_path, "wb") as f:
+                PdfWriter().write(f)
+        written = os.path.getsize(part_path)
+        trace_count("pages_out", count)
+        trace_count("bytes_written", written)
+        check_progress(progress, cancel, "write", 1, 1)
+
+        if optimize and count:
+            check_progress(progress, cancel, "optimize", 0, 1)
+            with span("optimize") as opt_span:
+                before, after = optimize_pdf(part_path, opt_path)
+                opt_span.set(size_before=before, size_after=after)
+            os.replace(opt_path, part_path)
+            check_progress(progress, cancel, "optimize", 1, 1)
+        else:
+            before = after = written
+        if optimize and stats is not None:
+            stats["size_before"] = before
+            stats["size_after"] = after
+        os.replace(part_path, output_path)
+    except BaseException:
+        for path in (part_path, opt_path):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    return count
+
+
+BACKENDS = ("pypdf", "pymupdf")
+
+
+def read_pages(sources, progress=None, cancel=None, readers=None, pool=None):
+    """
+    (dosya yolu, sayfa numarası) listesini pypdf sayfalarına çevirir; her dosya bir kez açılır.
+    pool (pdf_pool.DocumentPool) verilirse reader'lar havuzdan alınır (büyük dosyalar mmap).
+    """
+    from pypdf import PdfReader
+
+    readers = {} if readers is None else readers
+    pages = []
+    total = len(sources)
+    for n, (file_path, page_index) in enumerate(sources):
+        check_progress(progress, cancel, "read", n, total)
+        reader = readers.get(file_path)
+        if reader is None:
+            if pool is not None:
+                reader = readers[file_path] = pool.reader(file_path)
+            else:
+                with span("PdfReader", path=file_path):
+                    reader = readers[file_path] = PdfReader(file_path)
+        pages.append(reader.pages[page_index])
+    return pages
+
+
+def process_sources(sources, output_path, mode, backend="pypdf", progress=None, cancel=None,
+                    readers=None, pool=None, **options):
+    """
+    (dosya yolu, sayfa numarası) listesinden seçilen backend ile çıktı üretir.
+    options write_pages'e (veya pdf_fitz_engine.write_sources'a) geçirilir.
+    pool verilirse kaynak dosyalar paylaşılan pdf_pool.DocumentPool'dan açılır.
+    """
+    sources = list(sources)
+    if backend == "pymupdf":
+        from pdf_fitz_engine import write_sources
+        # PyMuPDF çıktıyı kendi belleğinde kurar; streaming seçenekleri pypdf'e özel
+        options.pop("streaming", None)
+        options.pop("memory_limit", None)
+        return write_sources(sources, output_path, mode, progress=progress, cancel=cancel, pool=pool, **options)
+    if backend != "pypdf":
+        raise ValueError(f"Unknown backend: {backend}")
+    pages = read_pages(sources, progress, cancel, readers, pool)
+    return write_pages(pages, output_path, mode, progress=progress, cancel=cancel, **options)
@@ -0,0 +1,212 @@
+"""PyMuPDF (fitz) tabanlı işleme motoru.
+
+pdf_engine ile aynı işlemleri (margin, birleştirme, booklet) yapar ama sayfa
+içeriğini Python'da çözmez: sayfalar show_pdf_page ile Form XObject olarak
+yerleştirilir (her kaynak sayfa hedef belgede bir kez gömülür), sadece
+birleştirme / hızlı margin ise insert_pdf ile doğrudan kopyalanır.
+
+Girdi olarak sayfa nesneleri değil (dosya yolu, sayfa numarası) listesi alır;
+kullanımı pdf_engine.process_sources üzerinden backend="pymupdf" ile.
+
+Çıktı pypdf yoluyla aynıdır; döndürülmüş veya kırpılmış sayfalar her iki yolda
+da görüntüleyicide göründüğü gibi (döndürme ve CropBox uygulanmış) yerleşir.
+"""
+import os
+
+import fitz  # PyMuPDF
+
+from pdf_engine import check_progress, write_output
+from pdf_imposition import draw_xobject, upright_matrix
+from pdf_pipeline import Booklet, Margin, multiply, plan
+from pdf_pool import DocumentPool
+from pdf_trace import span
+
+# /Rotate değerine göre ekranda SOL ve SAĞ görünen kenarın MediaBox'taki karşılığı
+# (MediaBox dizisindeki index: 0=left, 1=bottom, 2=right, 3=top)
+_VISUAL_LEFT_EDGE = {0: 0, 90: 1, 180: 2, 270: 3}
+_VISUAL_RIGHT_EDGE = {0: 2, 90: 3, 180: 0, 270: 1}
+
+
+def _pdf_box(doc, page, key="MediaBox"):
+    """Sayfa kutusunu PDF koordinatlarında [left, bottom, right, top] olarak okur; yoksa None."""
+    kind, value = doc.xref_get_key(page.xref, key)
+    if kind != "array":
+        return None
+    return [float(v) for v in value.strip("[]").split()]
+
+
+def _set_pdf_box(doc, page, box, key="MediaBox"):
+    doc.xref_set_key(page.xref, key, "[" + " ".join(f"{v:g}" for v in box) + "]")
+
+
+def _expand_for_margin(doc, page, margin, odd):
+    """
+    Hızlı mod: İçeriğe dokunmadan sayfa kutularını (MediaBox, CropBox, BleedBox,
+    TrimBox, ArtBox) görünen sol/sağ kenardan genişletir.
+    """
+    edge = (_VISUAL_LEFT_EDGE if odd else _VISUAL_RIGHT_EDGE)[page.rotation % 360]
+    sign = -1 if edge in (0, 1) else 1
+    for key in ("MediaBox", "CropBox", "BleedBox", "TrimBox", "ArtBox"):
+        box = _pdf_box(doc, page, key)
+        if box is None:
+            if key != "MediaBox":
+                continue
+            r = page.mediabox
+            box = [r.x0, r.y0, r.x1, r.y1]
+        box[edge] += sign * margin
+        _set_pdf_box(doc, page, box, key)
+
+
+def _margin(out, pool, src_list, margin, fast, progress, cancel, start=0):
+    total = len(src_list)
+    if fast or not margin:
+        # Sayfalar olduğu gibi kopyalanır (annotation/link'ler dahil); sadece kutular genişler
+        for i, (path, page_index) in enumerate(src_list):
+            check_progress(progress, cancel, "margin", i, total)
+            with span("margin.page", page=i, fast=True), pool.document(path) as doc:
+                out.insert_pdf(doc, from_page=page_index, to_page=page_index,
+                               links=False, annots=True, widgets=False)
+                if margin:
+                    _expand_for_margin(out, out[-1], margin, odd=((start + i) % 2 == 0))
+        return total
+
+    # Tek sayfalarda içerik sağa kayar (boşluk solda), çiftlerde kaydırma yok; sayfalar
+    # görünen (döndürülmüş, kırpılmış) halleriyle yerleşir (show_pdf_page /Rotate'i yok sayar)
+    return _pipeline(out, pool, src_list, [Margin(margin, start)], progress, cancel, "margin")
+
+
+def _booklet(out, pool, src_list, sheet, signature_sheets, creep, progress, cancel):
+    if not src_list:
+        return 0
+    return _pipeline(out, pool, src_list, [Booklet(sheet, signature_sheets, creep)], progress, cancel, "booklet")
+
+
+def _visible_placement(page):
+    """
+    Kaynak sayfanın PDF koordinatlarını görünen alana (döndürülmüş, CropBox'a göre,
+    sol alt köşe 0,0) taşıyan matris ve CropBox varsa PDF koordinatlarında kırpma alanı.
+    """
+    mb, cb = page.mediabox, page.cropbox
+    # PyMuPDF MediaBox'ı PDF koordinatlarında, CropBox'ı MediaBox'ın üst kenarından aşağı doğru verir
+    box = (cb.x0, mb.y1 - cb.y1, cb.x1, mb.y1 - cb.y0)
+    clip = None
+    if box != tuple(mb):
+        clip = (box[0], box[1], box[2] - box[0], box[3] - box[1])
+    return upright_matrix(box, page.rotation % 360), clip
+
+
+def _visible_box(pool, path, page_index):
+    """Sayfanın görünen (döndürülmüş, kırpılmış) boyutu, planlama için kutu olarak."""
+    with pool.document(path) as doc:
+        rect = doc[page_index].rect
+    return 0, 0, rect.width, rect.height
+
+
+def _pipeline(out, pool, src_list, stages, progress, cancel, stage="pipeline"):
+    # Görünen sayfa boyutundan planlanır (döndürme ve kırpma uygulanmış)
+    output = plan([_visible_box(pool, path, page_index) for path, page_index in src_list], stages)
+    return _compose(out, pool, src_list, output, progress, cancel, stage)
+
+
+def _compose(out, pool, src_list, output, progress, cancel, stage="pipeline"):
+    """
+    Planlanmış çıktı sayfalarını (VirtualPage listesi) out belgesine yazar.
+    stage: ilerleme bildirimlerindeki aşama adı.
+    """
+    used = list(dict.fromkeys(src for vpage in output for src, _ in vpage.placements))
+    total = len(used) + len(output)
+
+    # Her kaynak sayfa bir kez Form XObject'e çevrilir. show_pdf_page hedef sayfanın tüm
+    # kaynaklarını her çağrıda taradığı için kağıt yüzlerinde kullanılmaz: XObject tek bir
+    # geçici sayfada oluşturulur (sayfa her seferinde boşaltılır, tarama sabit maliyetli
+    # kalır), kağıt yüzleri XObject'leri 'cm' matrisleriyle doğrudan çağırır.
+    scratch = out.new_page()
+    xobjects = {}
+    for n, src in enumerate(used):
+        check_progress(progress, cancel, stage, n, total)
+        path, page_index = src_list[src]
+        with pool.document(path) as doc:
+            xref = scratch.show_pdf_page(scratch.rect, doc, page_index)
+            xobjects[src] = (xref,) + _visible_placement(doc[page_index])
+        out.xref_set_key(scratch.xref, "Resources", "<<>>")
+        out.xref_set_key(scratch.xref, "Contents", "null")
+
+    for n, vpage in enumerate(output):
+        check_progress(progress, cancel, stage, len(used) + n, total)
+        with span(f"{stage}.page", page=n):
+            page = out.new_page(width=vpage.width, height=vpage.height)
+            names = {}
+            ops = []
+            for src, matrix in vpage.placements:
+                name = names.setdefault(src, f"/P{len(names)}")
+                _, visible, clip = xobjects[src]
+                ops.append(draw_xobject(name, multiply(visible, matrix), clip))
+            refs = "".join(f"{name} {xobjects[src][0]} 0 R" for src, name in names.items())
+            out.xref_set_key(page.xref, "Resources", f"<</XObject<<{refs}>>>>")
+            content = out.get_new_xref()
+            out.update_object(content, "<<>>")
+            out.update_stream(content, "\n".join(ops).encode("latin-1"))
+            out.xref_set_key(page.xref, "Contents", f"{content} 0 R")
+    out.delete_page(0)
+    return len(output)
+
+
+def preview_page(sources, stages, index, pool):
+    """
+    sources'taki index'inci sayfanın yer aldığı çıktı sayfasını tek sayfalık bellek içi
+    bir belge olarak üretir (canlı önizleme). Sadece o sayfaya yerleşen kaynaklar açılır;
+    diğer sayfaların boyutu yerleşimi etkilemez. Sayfa çıktıda yoksa None döndürür.
+    """
+    src_list = list(sources)
+    # Hangi çıktı sayfası: boyuttan bağımsız, birim kutularla planlanır
+    unit = plan([(0, 0, 1, 1)] * len(src_list), stages)
+    number = next((n for n, vpage in enumerate(unit) if any(src == index for src, _ in vpage.placements)), None)
+    if number is None:
+        return None
+    used = {src for src, _ in unit[number].placements}
+    boxes = [_visible_box(pool, *src_list[i]) if i in used else (0, 0, 1, 1) for i in range(len(src_list))]
+    out = fitz.open()
+    _compose(out, pool, src_list, [plan(boxes, stages)[number]], None, None)
+    return out
+
+
+def write_sources(sources, output_path, mode, margin=0, fast=False, progress=None, cancel=None,
+                  sheet="A4", signature_sheets=0, creep=0.0, optimize=False, stats=None, stages=None, pool=None,
+                  margin_start=0):
+    """
+    pdf_engine.write_pages'in PyMuPDF karşılığı; sources: (dosya yolu, sayfa numarası) listesi.
+    '.part' / iptal / optimize / boş çıktı adımı pdf_engine.write_output ile ortaktır.
+    Sayfa sayısını döndürür.
+    pool (pdf_pool.DocumentPool) verilirse kaynak belgeler oradan alınır ve iş bitince
+    açık kalır; verilmezse iş için geçici bir havuz kullanılır.
+    """
+    src_list = list(sources)
+    own_pool = pool is None
+    if own_pool:
+        pool = DocumentPool()
+    out = fitz.open()
+
+    def produce(part_path):
+        with span(mode, backend="pymupdf", fast=fast):
+            if mode == "margin":
+                count = _margin(out, pool, src_list, margin, fast, progress, cancel, margin_start)
+            elif mode == "booklet":
+                count = _booklet(out, pool, src_list, sheet, signature_sheets, creep, progress, cancel)
+            elif mode == "pipeline":
+                count = _pipeline(out, pool, src_list, stages or [], progress, cancel)
+            else:
+                raise ValueError(f"Unknown mode: {mode}")
+
+        check_progress(progress, cancel, "write", 0, 1)
+        if count:  # PyMuPDF sayfasız belge kaydetmez; boş çıktıyı write_output yazar
+            with span("writer.write") as write_span:
+                out.save(part_path, garbage=1, deflate=True)
+                write_span.set(bytes=os.path.getsize(part_path))
+        return count
+
+    try:
+        return write_output(output_path, produce, progress, cancel, optimize, stats)
+    finally:
+        out.close()
+        if own_pool:
+            pool.close()
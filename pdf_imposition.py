@@ -0,0 +1,243 @@
+"""Kitapçık dizgisi (imposition) yardımcıları.
+
+Sayfa sırası (tek kitapçık veya N kağıtlık formalar), kağıt boyutları, creep
+telafisi ve kaynak sayfaların Form XObject olarak gömülmesi burada hesaplanır.
+Her kaynak sayfa bir kez XObject'e çevrilir; kağıt yüzleri bu XObject'i sadece
+bir 'cm' matrisiyle çağırır, içerik akışı kopyalanmaz ve yeniden kodlanmaz.
+
+pypdf sadece XObject / kağıt yüzü üreten fonksiyonlarda yüklenir; sabitler ve
+yerleşim hesapları arayüzün açılışını yavaşlatmadan içe aktarılabilir.
+"""
+
+# Yatay kağıt boyutları (genişlik, yükseklik) pt cinsinden
+SHEET_SIZES = {
+    "A4": (841.89, 595.276),
+    "A3": (1190.551, 841.89),
+    "SRA3": (1275.591, 907.087),
+    "Letter": (792.0, 612.0),
+}
+
+
+def sheet_size(name):
+    try:
+        return SHEET_SIZES[name]
+    except KeyError:
+        raise ValueError(f"Unknown sheet size: {name}") from None
+
+
+def booklet_sheets(page_count, signature_sheets=0):
+    """
+    Saddle-stitch kağıt listesini döndürür. Her kağıt:
+        (forma içindeki sıra, (ön sol, ön sağ), (arka sol, arka sağ))
+    Index'ler page_count'u geçiyorsa o yüz boş kalır (4'ün katına tamamlama).
+    signature_sheets > 0 ise sayfalar o kadar kağıtlık formalara bölünür;
+    0 ise tüm belge tek forma (tek kitapçık) olur.
+    """
+    padded = (page_count + 3) // 4 * 4
+    if padded == 0:
+        return []
+    per_signature = signature_sheets * 4 if signature_sheets > 0 else padded
+
+    sheets = []
+    for base in range(0, padded, per_signature):
+        size = min(per_signature, padded - base)
+        last = base + size - 1
+        for i in range(size // 4):
+            front = (last - 2 * i, base + 2 * i)
+            back = (base + 2 * i + 1, last - 2 * i - 1)
+            sheets.append((i, front, back))
+    return sheets
+
+
+# N-up: kağıt yüzü başına sayfa -> (sütun, satır). Sütun = satır ise kağıt dikey kullanılır,
+# değilse yatay; böylece her yuva dikey sayfa oranına yakın kalır.
+NUP_GRIDS = {2: (2, 1), 4: (2, 2), 8: (4, 2), 16: (4, 4)}
+NUP_ORDERS = ("sequential", "cut_stack", "step_repeat")
+
+
+def nup_slots(n, sheet="A4"):
+    """
+    N-up yuva tablosu: (kağıt genişliği, yüksekliği, [(x, y, w, h), ...]).
+    Yuvalar okuma sırasındadır (soldan sağa, yukarıdan aşağı); koordinatlar PDF'teki gibi alttan.
+    """
+    try:
+        cols, rows = NUP_GRIDS[n]
+    except KeyError:
+        raise ValueError(f"Unsupported N-up count: {n} (use {', '.join(map(str, NUP_GRIDS))})") from None
+    width, height = sheet_size(sheet)
+    if cols == rows:
+        width, height = height, width
+    slot_w = width / cols
+    slot_h = height / rows
+    slots = [(col * slot_w, height - (row + 1) * slot_h, slot_w, slot_h)
+             for row in range(rows) for col in range(cols)]
+    return width, height, slots
+
+
+def nup_order(page_count, n, order="sequential"):
+    """
+    Kağıt yüzü başına yuvalara düşen sayfa index'leri (yüz listesi, her biri n elemanlı tuple).
+    page_count'u geçen index o yuvanın boş kalacağı anlamına gelir.
+        sequential   Yüz k, yuva s -> k*n + s (el notu / çoklu sayfa)
+        cut_stack    Yüz k, yuva s -> s*S + k (S = yüz sayısı). Tek yüz basılıp deste
+                     yuvalara göre kesildiğinde ve yığınlar sırayla üst üste konduğunda
+                     sayfalar sıralı çıkar.
+        step_repeat  Yüz k'nın tüm yuvalarında sayfa k (kartvizit, etiket)
+    """
+    if order == "step_repeat":
+        return [(k,) * n for k in range(page_count)]
+    sides = -(-page_count // n)
+    if order == "sequential":
+        return [tuple(range(k * n, k * n + n)) for k in range(sides)]
+    if order == "cut_stack":
+        return [tuple(s * sides + k for s in range(n)) for k in range(sides)]
+    raise ValueError(f"Unknown N-up order: {order}")
+
+
+def upright_matrix(box, rotation=0):
+    """
+    Kutuyu (left, bottom, right, top) /Rotate uygulanmış haliyle sol alt köşesi 0,0
+    olan alana taşıyan 'cm' matrisi (görüntüleyicide görüldüğü gibi; 90 = saat yönünde).
+    """
+    left, bottom, right, top = box
+    if rotation == 90:
+        return 0, -1, 1, 0, -bottom, right
+    if rotation == 180:
+        return -1, 0, 0, -1, right, top
+    if rotation == 270:
+        return 0, 1, -1, 0, top, -left
+    return 1, 0, 0, 1, -left, -bottom
+
+
+def upright_size(box, rotation=0):
+    """Kutunun döndürme uygulanmış (genişlik, yükseklik) değeri."""
+    left, bottom, right, top = box
+    if rotation in (90, 270):
+        return top - bottom, right - left
+    return right - left, top - bottom
+
+
+def fit_matrix(box, target_w, target_h, x_offset, y_offset, shift=0.0, rotation=0):
+    """
+    Kaynak kutuyu (left, bottom, right, top) hedef alana orantılı sığdırıp
+    ortalayan 'cm' matrisi (a, b, c, d, e, f). shift yatayda ek kaydırmadır (creep).
+    rotation: kaynağın /Rotate değeri; sayfa görüntüleyicideki yönüyle yerleşir.
+    """
+    src_w, src_h = upright_size(box, rotation)
+    a, b, c, d, e, f = upright_matrix(box, rotation)
+    if src_w <= 0 or src_h <= 0:
+        return a, b, c, d, e + x_offset + shift, f + y_offset
+
+    scale = min(target_w / src_w, target_h / src_h)
+    dx = x_offset + (target_w - src_w * scale) / 2 + shift
+    dy = y_offset + (target_h - src_h * scale) / 2
+    return a * scale, b * scale, c * scale, d * scale, e * scale + dx, f * scale + dy
+
+
+def page_box(page):
+    """Sayfanın görünen alanı: MediaBox ile kesiştirilmiş CropBox (PDF koordinatlarında)."""
+    mb = page.mediabox
+    cb = page.cropbox  # Yoksa pypdf MediaBox'ı döndürür
+    left = max(float(mb.left), float(cb.left))
+    bottom = max(float(mb.bottom), float(cb.bottom))
+    right = min(float(mb.right), float(cb.right))
+    top = min(float(mb.top), float(cb.top))
+    if right <= left or top <= bottom:
+        return float(mb.left), float(mb.bottom), float(mb.right), float(mb.top)
+    return left, bottom, right, top
+
+
+def page_rotation(page):
+    """Sayfanın /Rotate değeri 0, 90, 180 veya 270 olarak."""
+    return (page.rotation or 0) // 90 % 4 * 90
+
+
+def page_to_xobject(page):
+    """
+    Sayfayı Form XObject'e çevirir. Tek içerik akışı varsa sıkıştırılmış veri
+    ve filtreleri olduğu gibi kullanılır; kaynaklar referans olarak paylaşılır.
+    """
+    from pypdf.generic import (
+        ArrayObject,
+        ContentStream,
+        DecodedStreamObject,
+        EncodedStreamObject,
+        FloatObject,
+        NameObject,
+    )
+
+    contents = page.get("/Contents")
+    if contents is not None:
+        contents = contents.get_object()
+
+    if isinstance(contents, EncodedStreamObject) and not isinstance(contents, ContentStream):
+        xobj = EncodedStreamObject()
+        xobj._data = contents._data
+        for key in ("/Filter", "/DecodeParms"):
+            if key in contents:
+                xobj[NameObject(key)] = contents.raw_get(key)
+    else:
+        if contents is None:
+            data = b""
+        elif isinstance(contents, ArrayObject):
+            data = b"\n".join(part.get_object().get_data() for part in contents)
+        else:
+            data = contents.get_data()
+        xobj = DecodedStreamObject()
+        xobj.set_data(data)
+        if isinstance(contents, ArrayObject):
+            xobj = xobj.flate_encode()
+
+    xobj[NameObject("/Type")] = NameObject("/XObject")
+    xobj[NameObject("/Subtype")] = NameObject("/Form")
+    # BBox görünen alandır: CropBox dışında kalan içerik yerleşimde görünmez
+    xobj[NameObject("/BBox")] = ArrayObject(FloatObject(v) for v in page_box(page))
+    if "/Resources" in page:
+        xobj[NameObject("/Resources")] = page.raw_get("/Resources")
+    return xobj
+
+
+def _pdf_number(value):
+    """PDF sayısı: üslü gösterim (1e-14 gibi) PDF'te geçersizdir."""
+    text = f"{value:.5f}".rstrip("0").rstrip(".")
+    return "0" if text in ("", "-0") else text
+
+
+def draw_xobject(name, matrix, clip=None):
+    """
+    '/Ad' adlı XObject'i matrisle çizen içerik operatörleri. clip verilirse
+    (x, y, w, h, XObject koordinatlarında) çizim o dikdörtgenle kırpılır.
+    """
+    cm = " ".join(_pdf_number(v) for v in matrix)
+    if clip is None:
+        return f"q {cm} cm {name} Do Q"
+    rect = " ".join(_pdf_number(v) for v in clip)
+    return f"q {cm} cm {rect} re W n {name} Do Q"
+
+
+def make_sheet(width, height, placements):
+    """
+    placements: (xobject, matrix) listesi. XObject'leri çağıran tek bir
+    içerik akışıyla yeni bir kağıt yüzü oluşturur.
+    """
+    from pypdf import PageObject
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    sheet = PageObject.create_blank_page(None, width, height)
+    xobjects = DictionaryObject()
+    ops = []
+    names = {}
+    for xobj, matrix in placements:
+        name = names.get(id(xobj))
+        if name is None:
+            name = names[id(xobj)] = f"/P{len(names)}"
+            xobjects[NameObject(name)] = xobj
+        ops.append(draw_xobject(name, matrix))
+
+    resources = DictionaryObject()
+    resources[NameObject("/XObject")] = xobjects
+    sheet[NameObject("/Resources")] = resources
+    content = DecodedStreamObject()
+    content.set_data("\n".join(ops).encode("latin-1"))
+    sheet[NameObject("/Contents")] = content
+    return sheet
@@ -0,0 +1,39 @@
+"""Çıktı boyutunu küçülten optimizasyon aşaması.
+
+Birçok PDF birleştirildiğinde aynı fontlar, ICC profilleri ve logolar her
+girdiden ayrı ayrı kopyalanır. Bu aşama PyMuPDF ile dosyayı yeniden yazar:
+    - Aynı içerikli nesne ve stream'leri hash'leyip tek kopyaya indirir (garbage=4)
+    - Sıkıştırılmamış stream'leri Flate ile sıkıştırır (deflate)
+    - Nesneleri object stream'lere koyar, xref'i stream olarak yazar (use_objstms)
+Sayfa içeriği yorumlanmaz ve görsel çıktı değişmez.
+"""
+import os
+import shutil
+
+
+def optimize_pdf(input_path, output_path):
+    """
+    input_path'i optimize ederek output_path'e yazar. (önceki boyut, sonraki boyut)
+    döndürür. Sonuç büyürse girdi olduğu gibi kopyalanır.
+    """
+    import fitz  # PyMuPDF (yalnızca optimize edilirken yüklenir)
+
+    before = os.path.getsize(input_path)
+    with fitz.open(input_path) as doc:
+        doc.save(output_path, garbage=4, deflate=True, deflate_images=True, deflate_fonts=True,
+                 use_objstms=1, compression_effort=0)
+    after = os.path.getsize(output_path)
+    if after >= before:
+        shutil.copyfile(input_path, output_path)
+        after = before
+    return before, after
+
+
+def format_size(num_bytes):
+    """Byte sayısını okunabilir metne çevirir (ör. '12.3 MB')."""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
@@ -0,0 +1,307 @@
+"""Zincirlenebilir sayfa işlemleri (seçim, margin, ölçek, booklet, N-up) tek geçişte.
+
+Her aşama gerçek PDF'e dokunmaz; sanal sayfa listesini dönüştürür. Sanal sayfa
+bir boyut ve üzerine yerleştirilen kaynak sayfaların listesidir; her yerleşim
+(kaynak index, matris) çiftidir. Aşamalar matrisleri birbirine çarparak
+biriktirir, böylece her yerleşen sayfa için tek bir matris kalır ve çıktı
+tek seferde yazılır (ara dosya yok).
+
+Komut satırı / ayar metni biçimi (virgülle ayrılmış aşamalar):
+    select:1-10;15;20-      Sayfa seçimi / sıralama (1'den başlar)
+    margin:30               Delgeç payı (tek sayfalarda solda, çiftlerde sağda)
+    margin:30:2             ... ilk sayfa belgenin 2. sayfası olacaksa (tek/çift kuralı ona göre)
+    scale:0.9               Sayfayı ve içeriği ölçekler
+    fit:A4                  İçeriği dikey A4'e orantılı sığdırır
+    booklet:A3:4:0.5        Kitapçık (kağıt, forma başına kağıt, creep)
+    nup:4:A4:cut_stack      N-up (2/4/8/16; kağıt; sequential | cut_stack | step_repeat)
+"""
+from pdf_imposition import (
+    NUP_ORDERS,
+    SHEET_SIZES,
+    booklet_sheets,
+    fit_matrix,
+    make_sheet,
+    nup_order,
+    nup_slots,
+    page_box,
+    page_rotation,
+    page_to_xobject,
+    sheet_size,
+    upright_matrix,
+    upright_size,
+)
+from pdf_trace import span
+
+
+def multiply(m1, m2):
+    """Önce m1 sonra m2 uygulanan matris (PDF satır vektörü düzeni: p' = p × m1 × m2)."""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (a1 * a2 + b1 * c2, a1 * b2 + b1 * d2,
+            c1 * a2 + d1 * c2, c1 * b2 + d1 * d2,
+            e1 * a2 + f1 * c2 + e2, e1 * b2 + f1 * d2 + f2)
+
+
+def translate(tx, ty):
+    return 1, 0, 0, 1, tx, ty
+
+
+def scale(sx, sy=None):
+    return sx, 0, 0, sx if sy is None else sy, 0, 0
+
+
+class VirtualPage:
+    """Çıktıdaki bir sayfa: boyut + (kaynak index, matris) yerleşimleri."""
+    __slots__ = ("width", "height", "placements")
+
+    def __init__(self, width, height, placements):
+        self.width = width
+        self.height = height
+        self.placements = placements
+
+    def transformed(self, matrix, width, height):
+        """Tüm yerleşimlere matrisi ekleyerek yeni boyutta bir sayfa döndürür."""
+        return VirtualPage(width, height, [(src, multiply(m, matrix)) for src, m in self.placements])
+
+
+# --- Aşamalar ---
+
+class Select:
+    """Sayfa seçimi ve sıralaması (0 tabanlı index listesi)."""
+
+    def __init__(self, indices):
+        self.indices = list(indices)
+
+    def apply(self, pages):
+        return [pages[i] for i in self.indices if 0 <= i < len(pages)]
+
+
+class Margin:
+    """
+    Delgeç payı: tek sayfalarda (1, 3...) içerik sağa kayar, çiftlerde genişlik sağa eklenir.
+    start: ilk sayfanın asıl belgedeki sırası (parça parça üretimde tek/çift kuralı için).
+    """
+
+    def __init__(self, margin, start=0):
+        self.margin = margin
+        self.start = start
+
+    def apply(self, pages):
+        out = []
+        for i, page in enumerate(pages):
+            tx = self.margin if (self.start + i) % 2 == 0 else 0
+            out.append(page.transformed(translate(tx, 0), page.width + self.margin, page.height))
+        return out
+
+
+class Scale:
+    """Sayfayı ve içeriğini aynı oranda ölçekler."""
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def apply(self, pages):
+        f = self.factor
+        return [page.transformed(scale(f), page.width * f, page.height * f) for page in pages]
+
+
+class Fit:
+    """Her sayfayı dikey hedef boyuta orantılı sığdırır ve ortalar."""
+
+    def __init__(self, sheet):
+        w, h = sheet_size(sheet)
+        self.width, self.height = min(w, h), max(w, h)
+
+    def apply(self, pages):
+        out = []
+        for page in pages:
+            m = fit_matrix((0, 0, page.width, page.height), self.width, self.height, 0, 0)
+            out.append(page.transformed(m, self.width, self.height))
+        return out
+
+
+class Booklet:
+    """Saddle-stitch kitapçık (pdf_imposition ile aynı sıralama ve creep)."""
+
+    def __init__(self, sheet="A4", signature_sheets=0, creep=0.0):
+        self.sheet = sheet
+        self.signature_sheets = signature_sheets
+        self.creep = creep
+
+    def apply(self, pages):
+        out_width, out_height = sheet_size(self.sheet)
+        half = out_width / 2
+        out = []
+        for depth, front, back in booklet_sheets(len(pages), self.signature_sheets):
+            shift = self.creep * depth
+            for left, right in (front, back):
+                placements = []
+                for index, x_offset, dx in ((left, 0, shift), (right, half, -shift)):
+                    if index >= len(pages):
+                        continue  # Tamamlama için boş yüz
+                    page = pages[index]
+                    m = fit_matrix((0, 0, page.width, page.height), half, out_height, x_offset, 0, dx)
+                    placements.extend(page.transformed(m, half, out_height).placements)
+                out.append(VirtualPage(out_width, out_height, placements))
+        return out
+
+
+class NUp:
+    """
+    Genel N-up dizgi. Yuva tablosu ve sayfa->yuva sırası bir kez hesaplanır;
+    sığdırma matrisi her (sayfa boyutu, yuva) çifti için bir kez bulunur ve
+    aynı boyuttaki tüm sayfalarda tekrar kullanılır.
+    """
+
+    def __init__(self, n, sheet="A4", order="sequential"):
+        if order not in NUP_ORDERS:
+            raise ValueError(f"Unknown N-up order: {order}")
+        self.n = n
+        self.sheet = sheet
+        self.order = order
+        self.width, self.height, self.slots = nup_slots(n, sheet)
+
+    def apply(self, pages):
+        fits = {}
+        out = []
+        for side in nup_order(len(pages), self.n, self.order):
+            placements = []
+            for slot, index in enumerate(side):
+                if index >= len(pages):
+                    continue  # Boş yuva
+                page = pages[index]
+                key = (page.width, page.height, slot)
+                m = fits.get(key)
+                if m is None:
+                    x, y, w, h = self.slots[slot]
+                    m = fits[key] = fit_matrix((0, 0, page.width, page.height), w, h, x, y)
+                placements.extend((src, multiply(pm, m)) for src, pm in page.placements)
+            out.append(VirtualPage(self.width, self.height, placements))
+        return out
+
+
+def plan(boxes, stages):
+    """
+    Kaynak sayfa kutularından (left, bottom, right, top) başlayıp aşamaları
+    uygular; çıktı sayfalarının VirtualPage listesini döndürür.
+    """
+    pages = [VirtualPage(right - left, top - bottom, [(i, translate(-left, -bottom))])
+             for i, (left, bottom, right, top) in enumerate(boxes)]
+    for stage in stages:
+        pages = stage.apply(pages)
+    return pages
+
+
+def pipeline_pages(pages, writer, stages, progress=None, cancel=None):
+    """
+    pypdf sayfalarına aşamaları uygular ve writer'a yazar. Her kaynak sayfa bir
+    kez Form XObject olarak gömülür; yerleşim başına tek 'cm' matrisi kullanılır.
+    XObject, planda kaynağın son yerleştiği çıktı sayfası yazılınca bırakılır.
+    Üretilen sayfa sayısını döndürür.
+    """
+    from pdf_engine import check_progress
+
+    pages = list(pages)
+    # Görünen (döndürülmüş, kırpılmış) boyuttan planlanır; yerleşimde sayfa önce dik konuma taşınır
+    boxes = [(page_box(p), page_rotation(p)) for p in pages]
+    output = plan([(0, 0) + upright_size(*box) for box in boxes], stages)
+    last_use = {src: n for n, vpage in enumerate(output) for src, _ in vpage.placements}
+    xobjects = {}
+    for n, vpage in enumerate(output):
+        check_progress(progress, cancel, "pipeline", n, len(output))
+        with span("pipeline.page", page=n):
+            placements = []
+            for src, matrix in vpage.placements:
+                xobj = xobjects.get(src)
+                if xobj is None:
+                    xobj = xobjects[src] = page_to_xobject(pages[src])
+                # XObject kaynak sayfanın koordinatlarında çizer
+                placements.append((xobj, multiply(upright_matrix(*boxes[src]), matrix)))
+            writer.add_page(make_sheet(vpage.width, vpage.height, placements))
+        for src, _ in vpage.placements:
+            if last_use[src] == n:
+                xobjects.pop(src, None)
+    return len(output)
+
+
+# --- Ayar metni ---
+
+def parse_selection(text, page_count=None):
+    """
+    '1-3;7;10-' -> [0, 1, 2, 6, 9, ...]. Açık uçlu aralık sadece ileri sayar (başlangıç
+    sayfa sayısından büyükse boş kalır); '5-3' gibi kapalı aralık geriye de sayabilir.
+    page_count verilirse dosyada olmayan sayfalar ValueError verir; None ise (sayfa
+    sayısı bilinmiyor, sadece söz dizimi kontrolü) açık uçlu aralıklar boş döner.
+    """
+    def number(value):
+        n = int(value)
+        if n < 1:
+            raise ValueError(f"Page numbers start at 1: {value}")
+        if page_count is not None and n > page_count:
+            raise ValueError(f"Page {n} out of range (document has {page_count} pages)")
+        return n
+
+    indices = []
+    for part in text.replace(" ", "").split(";"):
+        if not part:
+            continue
+        if "-" in part:
+            start, _, end = part.partition("-")
+            if not end:
+                first = int(start) if start else 1
+                if first < 1:
+                    raise ValueError(f"Page numbers start at 1: {start}")
+                if page_count is not None:
+                    indices.extend(range(first - 1, page_count))
+                continue
+            first = number(start) if start else 1
+            last = number(end)
+            step = 1 if last >= first else -1
+            indices.extend(i - 1 for i in range(first, last + step, step))
+        else:
+            indices.append(number(part) - 1)
+    return indices
+
+
+def parse_pipeline(spec, page_count=None):
+    """
+    'select:1-4,margin:30,booklet:A3' biçimindeki metni aşama listesine çevirir.
+    page_count: girdi sayfa sayısı; select aşamaları önceki aşamaların çıktısına göre
+    sınır kontrolünden geçer. None ise sadece söz dizimi kontrol edilir.
+    """
+    stages = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, *args = item.split(":")
+        try:
+            if name == "select":
+                count = None if page_count is None else len(plan([(0, 0, 1, 1)] * page_count, stages))
+                stages.append(Select(parse_selection(args[0], count)))
+            elif name == "margin":
+                first = int(args[1]) if len(args) > 1 and args[1] else 1
+                if first < 1:
+                    raise ValueError(f"Invalid first page number: {first}")
+                stages.append(Margin(float(args[0]), first - 1))
+            elif name == "scale":
+                stages.append(Scale(float(args[0])))
+            elif name == "fit":
+                stages.append(Fit(args[0] if args else "A4"))
+            elif name == "booklet":
+                sheet = args[0] if len(args) > 0 and args[0] else "A4"
+                signature = int(args[1]) if len(args) > 1 and args[1] else 0
+                creep = float(args[2]) if len(args) > 2 and args[2] else 0.0
+                if sheet not in SHEET_SIZES:
+                    raise ValueError(f"Unknown sheet size: {sheet}")
+                stages.append(Booklet(sheet, signature, creep))
+            elif name == "nup":
+                n = int(args[0])
+                sheet = args[1] if len(args) > 1 and args[1] else "A4"
+                order = args[2] if len(args) > 2 and args[2] else "sequential"
+                stages.append(NUp(n, sheet, order))
+            else:
+                raise ValueError(f"Unknown pipeline stage: {name}")
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"Invalid pipeline stage '{item}': {e}") from None
+    return stages
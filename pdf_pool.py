@@ -0,0 +1,156 @@
+"""Kaynak PDF'ler için paylaşılan, LRU ile sınırlı belge havuzu.
+
+Küçük resim üretimi (PyMuPDF) ve çıktı (pypdf reader'ları veya PyMuPDF motoru)
+aynı havuzu kullanır: her dosya diskten bir kez okunur ve işler arasında açık
+kalır, aynı dosya tekrar işlendiğinde yeniden ayrıştırılmaz.
+
+- Büyük dosyalar (mmap_threshold ve üstü) belleğe kopyalanmaz, mmap ile eşlenir;
+  dosya eşlemeden hemen sonra kapanır (Python 3.13 öncesinde eşleme kendi kopyası
+  olan tek bir tanıtıcı tutar). Küçük dosyalar bytes olarak okunur.
+- pypdf reader'ı ve PyMuPDF belgesi ilk istendiğinde oluşturulur (pypdf xref'i
+  açılışta, sayfa ağacını ilk sayfa erişiminde okur).
+- Aynı anda açık tutulan dosya sayısı max_open ile sınırlıdır; en uzun süredir
+  kullanılmayan (ve o an kullanımda olmayan) dosya kapatılır. Havuzdan çıkan bir
+  pypdf reader'ı, sayfaları hâlâ kullanan iş bitene kadar yaşar. PyMuPDF iş içinde
+  yeniden açılan bir kaynağın sayfalarını tekrar gömer; çıktı aynıdır ama büyür,
+  bu yüzden max_open bir işteki dosya sayısından küçük seçilmemelidir.
+- Dosya diskte değişirse (boyut / değişiklik zamanı) yeniden açılır.
+
+PyMuPDF belgeleri thread-safe değildir; document() belgeyi kullanım süresince
+kilitler ve havuzdan çıkarılmasını engeller:
+    with pool.document(path) as doc:
+        pix = doc[0].get_pixmap()
+"""
+import collections
+import io
+import mmap
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+from pdf_trace import count, span
+from thumb_cache import file_signature
+
+DEFAULT_MAX_OPEN = 32
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+# Python 3.13 öncesinde mmap dosya tanıtıcısının bir kopyasını (dup) eşleme yaşadıkça tutar
+_MMAP_OPTIONS = {"trackfd": False} if sys.version_info >= (3, 13) else {}
+
+
+class _Entry:
+    __slots__ = ("path", "signature", "data", "reader", "doc", "lock", "pins")
+
+    def __init__(self, path, signature, data):
+        self.path = path
+        self.signature = signature
+        self.data = data
+        self.reader = None
+        self.doc = None
+        self.lock = threading.RLock()
+        self.pins = 0
+
+    def close(self):
+        # pypdf sayfaları hâlâ bir işte kullanılıyor olabilir: reader ve mmap'e sadece
+        # referans bırakılır, son kullanıcı bitince çöp toplayıcı kapatır.
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
+        self.reader = None
+        self.data = None
+
+
+class DocumentPool:
+    def __init__(self, max_open=DEFAULT_MAX_OPEN, mmap_threshold=MMAP_THRESHOLD):
+        self.max_open = max(1, max_open)
+        self.mmap_threshold = mmap_threshold
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self, path):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= self.mmap_threshold and size > 0:
+                count("pool_mmap_bytes", size)
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ, **_MMAP_OPTIONS)
+            return f.read()
+
+    def _entry(self, path, pin=False):
+        key = os.path.abspath(path)
+        signature = file_signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                count("pool_hits")
+            else:
+                if entry is not None:
+                    # Dosya değişmiş: eski kayıt kullanımdaysa kullanan bitince çöp toplayıcı kapatır
+                    del self._entries[key]
+                    if not entry.pins:
+                        entry.close()
+                with span("pool.load", path=key):
+                    entry = _Entry(key, signature, self._load(key))
+                self._entries[key] = entry
+                count("pool_loads")
+                self._evict()
+            if pin:
+                entry.pins += 1
+            return entry
+
+    def _evict(self):
+        """max_open aşıldıysa kullanımda olmayan en eski kayıtları kapatır (self._lock altında)."""
+        excess = len(self._entries) - self.max_open
+        if excess <= 0:
+            return
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if entry.pins:
+                continue
+            del self._entries[key]
+            entry.close()
+            count("pool_evictions")
+            excess -= 1
+            if excess <= 0:
+                break
+
+    def reader(self, path):
+        """Dosyanın pypdf reader'ı (havuzda paylaşılır)."""
+        entry = self._entry(path)
+        with entry.lock:
+            if entry.reader is None:
+                from pypdf import PdfReader
+
+                data = entry.data
+                with span("PdfReader", path=entry.path):
+                    entry.reader = PdfReader(data if isinstance(data, mmap.mmap) else io.BytesIO(data))
+            return entry.reader
+
+    @contextmanager
+    def document(self, path):
+        """Dosyanın PyMuPDF belgesi; blok süresince kilitli ve havuzdan çıkarılamaz."""
+        entry = self._entry(path, pin=True)
+        try:
+            with entry.lock:
+                if entry.doc is None:
+                    import fitz  # PyMuPDF
+
+                    data = entry.data
+                    with span("fitz.open", path=entry.path):
+                        entry.doc = fitz.open(stream=memoryview(data) if isinstance(data, mmap.mmap) else data,
+                                              filetype="pdf")
+                yield entry.doc
+        finally:
+            with self._lock:
+                entry.pins -= 1
+                self._evict()
+
+    def close(self):
+        with self._lock:
+            for entry in self._entries.values():
+                entry.close()
+            self._entries.clear()
@@ -0,0 +1,712 @@
+"""Yerel HTTP servis modu: margin / birleştirme-sıralama / booklet işleri.
+
+Sadece standart kütüphane (asyncio) kullanır ve tamamen yerelde çalışır. İşler
+process_sources ile sınırlı boyutlu bir process havuzunda çalışır; bekleyen iş
+sayısı --queue-limit'i aşarsa yeni işler 503 ile reddedilir. Bir worker çökerse
+(bellek yetersizliği, ayrıştırıcıda segfault) havuz yenilenir ve o sırada çalışan
+işler bir kez daha denenir.
+
+Yüklenen dosyalar ve çıktılar bellekte tutulmaz: istek gövdesi parça parça
+çalışma klasöründeki geçici dosyalara yazılır (worker process'ler kaynakları
+dosya yolundan açar), sonuç da diskten parça parça gönderilir. Dosyalar ve iş
+sonuçları --ttl süresi sonunda silinir.
+
+Uç noktalar:
+    POST   /files                    Gövde: PDF -> {"id", "size"}
+    DELETE /files/<id>
+    POST   /jobs                     Gövde: JSON iş tanımı -> 202 {"id", "status"}
+    GET    /jobs/<id>                Durum: queued | running | done | failed
+    GET    /jobs/<id>/result         Çıktı PDF
+    DELETE /jobs/<id>
+    POST   /process?mode=margin&margin=30   Gövde: PDF -> çıktı PDF (tek adımda)
+    GET    /metrics                  Gecikme, verim, kuyruk bilgileri (JSON)
+    GET    /health
+
+İş tanımı (POST /jobs):
+    {"files": ["<id>", ...],              # Sırayla birleştirilir
+     "pages": [[0, 3], [1, 0], ...],      # İsteğe bağlı: (dosya sırası, sayfa) seçimi/sıralaması
+     "mode": "margin" | "booklet" | "pipeline",
+     "margin": 30, "fast": false, "sheet": "A4", "signature_sheets": 0, "creep": 0,
+     "pipeline": "margin:30,booklet:A3", "backend": "pypdf", "optimize": false}
+
+Örnek:
+    python pdf_server.py --port 8765 --workers 2 --queue-limit 16
+    curl --data-binary @ders.pdf "http://127.0.0.1:8765/process?mode=margin&margin=30" -o ders_margin.pdf
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.parse
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+
+from pypdf.errors import PyPdfError
+
+from pdf_engine import BACKENDS, process_sources
+from pdf_imposition import SHEET_SIZES
+from pdf_pipeline import parse_pipeline
+from pdf_pool import DocumentPool
+from pdf_trace import TRACER, profile, span
+
+CHUNK_SIZE = 64 * 1024
+MODES = ("margin", "booklet", "pipeline")
+LATENCY_WINDOW = 1000  # /metrics yüzdelikleri son bu kadar iş üzerinden
+INPUT_ERRORS = (ValueError, PyPdfError)  # Motorun girdiyi reddettiği hatalar (422); diğerleri 500
+MAX_REQUEST_LINE = 8 * 1024  # Aşılırsa 414
+MAX_HEADER_BYTES = 32 * 1024  # Tüm başlık satırları toplamı; aşılırsa 431
+MAX_HEADERS = 100
+PDF_MAGIC = b"%PDF-"
+
+STATUS_TEXT = {200: "OK", 201: "Created", 202: "Accepted", 204: "No Content", 400: "Bad Request",
+               404: "Not Found", 405: "Method Not Allowed", 409: "Conflict", 411: "Length Required",
+               413: "Payload Too Large", 414: "URI Too Long", 422: "Unprocessable Content",
+               431: "Request Header Fields Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def run_job(file_paths, pages, output_path, mode, options):
+    """
+    Worker process'te çalışır. pages None ise tüm dosyaların tüm sayfaları sırayla alınır.
+    (çıktı sayfa sayısı, girdi sayfa sayısı, stats, süre, trace) döndürür.
+    """
+    start = time.perf_counter()
+    stats = {}
+    pool = DocumentPool()
+    with profile(), span("http.job", mode=mode, files=len(file_paths)), closing(pool):
+        readers = {path: pool.reader(path) for path in file_paths}
+        if pages is None:
+            sources = [(path, i) for path in file_paths for i in range(len(readers[path].pages))]
+        else:
+            sources = []
+            for file_index, page_index in pages:
+                path = file_paths[file_index]
+                if not 0 <= page_index < len(readers[path].pages):
+                    raise ValueError(f"Page {page_index} out of range for file {file_index}")
+                sources.append((path, page_index))
+        options = dict(options)
+        if mode == "pipeline":
+            options["stages"] = parse_pipeline(options.pop("pipeline"), len(sources))
+        count = process_sources(sources, output_path, mode, readers=readers, pool=pool, stats=stats, **options)
+    trace = TRACER.drain() if TRACER.enabled else None
+    return count, len(sources), stats, time.perf_counter() - start, trace
+
+
+def parse_bool(value, name):
+    """JSON boolean'ı veya '1'/'true'/'yes', '0'/'false'/'no' metnini çevirir; başka değerde ValueError."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        if value.lower() in ("1", "true", "yes"):
+            return True
+        if value.lower() in ("0", "false", "no"):
+            return False
+    raise ValueError(f"{name} must be true or false")
+
+
+def job_options(spec):
+    """İstemciden gelen iş tanımını doğrular; process_sources seçeneklerini döndürür."""
+    mode = spec.get("mode", "margin")
+    if mode not in MODES:
+        raise HTTPError(400, f"Unknown mode: {mode}")
+    try:
+        options = {
+            "backend": spec.get("backend", "pypdf"),
+            "margin": float(spec.get("margin", 0)),
+            "fast": parse_bool(spec.get("fast", False), "fast"),
+            "optimize": parse_bool(spec.get("optimize", False), "optimize"),
+        }
+        if mode == "booklet":
+            options["sheet"] = spec.get("sheet", "A4")
+            options["signature_sheets"] = int(spec.get("signature_sheets", 0))
+            options["creep"] = float(spec.get("creep", 0.0))
+            if options["sheet"] not in SHEET_SIZES:
+                raise ValueError(f"Unknown sheet size: {options['sheet']}")
+        if mode == "pipeline":
+            options["pipeline"] = spec["pipeline"]
+            if not isinstance(options["pipeline"], str):
+                raise ValueError("pipeline must be a string")
+            parse_pipeline(options["pipeline"])  # Sadece söz dizimi kontrolü
+    except KeyError as e:
+        raise HTTPError(400, f"Missing field: {e.args[0]}") from None
+    except (TypeError, ValueError) as e:
+        raise HTTPError(400, str(e)) from None
+    if not isinstance(options["backend"], str) or options["backend"] not in BACKENDS:
+        raise HTTPError(400, f"Unknown backend: {options['backend']}")
+    return mode, options
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "reader")
+
+    def __init__(self, method, path, query, headers, reader):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.reader = reader
+
+    async def body_chunks(self, limit):
+        """Gövdeyi parça parça verir (Content-Length veya chunked); limit aşılırsa 413."""
+        received = 0
+        if self.headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                try:
+                    size = int((await self.reader.readline()).split(b";")[0], 16)
+                except ValueError:
+                    raise HTTPError(400, "Invalid chunk size") from None
+                if size < 0:
+                    raise HTTPError(400, "Invalid chunk size")
+                if size == 0:
+                    await self.reader.readline()
+                    return
+                received += size
+                if received > limit:
+                    raise HTTPError(413, "Upload too large")
+                yield await self.reader.readexactly(size)
+                await self.reader.readline()
+        length = self.headers.get("content-length")
+        if length is None:
+            raise HTTPError(411, "Content-Length required")
+        try:
+            remaining = int(length)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length") from None
+        if remaining < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if remaining > limit:
+            raise HTTPError(413, "Upload too large")
+        while remaining > 0:
+            chunk = await self.reader.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise HTTPError(400, "Incomplete body")
+            remaining -= len(chunk)
+            yield chunk
+
+    async def read_json(self, limit=1024 * 1024):
+        data = b"".join([chunk async for chunk in self.body_chunks(limit)])
+        try:
+            return json.loads(data or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Invalid JSON body") from None
+
+
+class Job:
+    __slots__ = ("id", "mode", "status", "created", "started", "finished", "output_path", "pages_in",
+                 "pages_out", "error", "input_error", "stats", "done_event", "file_ids")
+
+    def __init__(self, mode, output_path):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.status = "queued"
+        self.created = time.time()
+        self.started = self.finished = None
+        self.output_path = output_path
+        self.pages_in = self.pages_out = None
+        self.error = None
+        self.input_error = False  # Hata girdiden mi (422) yoksa sunucudan mı (500)
+        self.stats = {}
+        self.done_event = asyncio.Event()
+        self.file_ids = ()  # Kullandığı yüklemeler; iş bitene kadar sweep silmez
+
+    def describe(self):
+        info = {"id": self.id, "mode": self.mode, "status": self.status, "created": self.created}
+        if self.finished is not None:
+            info.update(pages_in=self.pages_in, pages_out=self.pages_out,
+                        elapsed=round(self.finished - self.created, 3), **self.stats)
+        if self.error:
+            info["error"] = self.error
+        return info
+
+
+class PdfService:
+    def __init__(self, work_dir=None, workers=None, queue_limit=16, max_upload=512 * 1024 * 1024, ttl=3600,
+                 log=print):
+        """
+        workers: aynı anda çalışan iş sayısı (process havuzu boyutu).
+        queue_limit: çalışmayı bekleyebilecek en fazla iş; aşılırsa 503.
+        max_upload: tek yükleme için byte sınırı. ttl: dosya/sonuçların saklanma süresi (sn).
+        """
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="pdf_server_")
+        self._own_work_dir = work_dir is None
+        self.upload_dir = os.path.join(self.work_dir, "uploads")
+        self.result_dir = os.path.join(self.work_dir, "results")
+        os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.result_dir, exist_ok=True)
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_limit = queue_limit
+        self.max_upload = max_upload
+        self.ttl = ttl
+        self.log = log
+
+        self.files = {}  # id -> (yol, yüklenme zamanı)
+        self.jobs = {}
+        self._pool = None
+        self._pool_lock = None
+        self._slots = None
+        self._server = None
+        self._sweeper = None
+
+        self.started = time.monotonic()
+        self.counters = collections.Counter()
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._waits = collections.deque(maxlen=LATENCY_WINDOW)
+
+    # --- Yaşam döngüsü ---
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Sunucuyu başlatır; (host, port) döndürür (port=0 ise boş bir port seçilir)."""
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._pool_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._sweeper = asyncio.create_task(self._sweep_loop())
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        if self._own_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(min(60, self.ttl))
+            self.sweep()
+
+    def sweep(self, now=None):
+        """
+        Süresi dolan yüklemeleri ve bitmiş işlerin çıktılarını siler. Bekleyen veya
+        çalışan bir işin kullandığı yüklemeler iş bitene kadar kalır.
+        """
+        now = time.time() if now is None else now
+        in_use = {file_id for job in self.jobs.values() if job.finished is None for file_id in job.file_ids}
+        for file_id, (path, created) in list(self.files.items()):
+            if now - created > self.ttl and file_id not in in_use:
+                self._remove_file(file_id)
+        for job_id, job in list(self.jobs.items()):
+            if job.finished is not None and now - job.created > self.ttl:
+                self._remove_job(job_id)
+
+    def _remove_file(self, file_id):
+        path, _ = self.files.pop(file_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _remove_job(self, job_id):
+        job = self.jobs.pop(job_id)
+        if os.path.exists(job.output_path):
+            os.remove(job.output_path)
+
+    # --- HTTP ---
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            try:
+                request = await self._read_request(reader)
+            except HTTPError as e:
+                await self._send_json(writer, e.status, {"error": str(e)}, e.headers)
+                return
+            if request is None:
+                return
+            try:
+                await self._dispatch(request, writer)
+            except HTTPError as e:
+                await self._send_json(writer, e.status, {"error": str(e)}, e.headers)
+            except Exception as e:
+                self.log(f"Error handling {request.method} {request.path}: {e}")
+                await self._send_json(writer, 500, {"error": str(e)})
+            self.counters["requests"] += 1
+            TRACER.count("http_requests")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _read_line(reader, limit, status, message):
+        """Tek satır okur; limit (veya StreamReader'ın kendi sınırı) aşılırsa HTTPError(status)."""
+        try:
+            line = await reader.readline()
+        except ValueError:  # asyncio.LimitOverrunError readline'da ValueError olarak gelir
+            raise HTTPError(status, message) from None
+        if len(line) > limit:
+            raise HTTPError(status, message)
+        return line
+
+    @classmethod
+    async def _read_request(cls, reader):
+        """İstek satırı ve başlıkları okur; boş bağlantıda None, bozuk veya çok büyükse HTTPError."""
+        line = await cls._read_line(reader, MAX_REQUEST_LINE, 414, "Request line too long")
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line") from None
+        headers = {}
+        header_bytes = header_lines = 0
+        while True:
+            line = await cls._read_line(reader, MAX_HEADER_BYTES, 431, "Request headers too large")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_bytes += len(line)
+            header_lines += 1
+            if header_bytes > MAX_HEADER_BYTES or header_lines > MAX_HEADERS:
+                raise HTTPError(431, "Request headers too large")
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        url = urllib.parse.urlsplit(target)
+        query = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+        return Request(method.upper(), url.path, query, headers, reader)
+
+    @staticmethod
+    async def _send(writer, status, body=b"", content_type="application/json", headers=None):
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head.extend(f"{k}: {v}" for k, v in (headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _send_json(self, writer, status, data, headers=None):
+        await self._send(writer, status, json.dumps(data).encode("utf-8"), headers=headers)
+
+    async def _send_file(self, writer, path, filename):
+        """Dosyayı parça parça gönderir (tamamı belleğe alınmaz)."""
+        size = os.path.getsize(path)
+        head = ["HTTP/1.1 200 OK", "Content-Type: application/pdf", f"Content-Length: {size}",
+                f'Content-Disposition: attachment; filename="{filename}"', "Connection: close"]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        with open(path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+        self.counters["bytes_out"] += size
+
+    async def _dispatch(self, request, writer):
+        parts = [p for p in request.path.split("/") if p]
+        method = request.method
+        with span("http.request", method=method, path=request.path):
+            if parts == ["health"] and method == "GET":
+                return await self._send_json(writer, 200, {"status": "ok"})
+            if parts == ["metrics"] and method == "GET":
+                return await self._send_json(writer, 200, self.metrics())
+            if parts == ["files"] and method == "POST":
+                file_id, size = await self._receive_upload(request)
+                return await self._send_json(writer, 201, {"id": file_id, "size": size})
+            if len(parts) == 2 and parts[0] == "files" and method == "DELETE":
+                if parts[1] not in self.files:
+                    raise HTTPError(404, "No such file")
+                self._remove_file(parts[1])
+                return await self._send(writer, 204)
+            if parts == ["jobs"] and method == "POST":
+                spec = await request.read_json()
+                job = self._submit(spec)
+                return await self._send_json(writer, 202, job.describe())
+            if parts == ["process"] and method == "POST":
+                return await self._process_now(request, writer)
+            if len(parts) >= 2 and parts[0] == "jobs":
+                job = self.jobs.get(parts[1])
+                if job is None:
+                    raise HTTPError(404, "No such job")
+                if len(parts) == 2 and method == "GET":
+                    return await self._send_json(writer, 200, job.describe())
+                if len(parts) == 2 and method == "DELETE":
+                    if job.finished is None:
+                        raise HTTPError(409, "Job is not finished")
+                    self._remove_job(job.id)
+                    return await self._send(writer, 204)
+                if parts[2:] == ["result"] and method == "GET":
+                    if job.status != "done":
+                        raise HTTPError(409, f"Job is {job.status}")
+                    return await self._send_file(writer, job.output_path, f"{job.id}.pdf")
+            raise HTTPError(404, "Not found")
+
+    async def _receive_upload(self, request):
+        file_id = uuid.uuid4().hex
+        path = os.path.join(self.upload_dir, file_id + ".pdf")
+        size = 0
+        head = b""  # İlk parçalar imzadan kısa olabilir; imza birikince kontrol edilir
+        try:
+            with open(path, "wb") as f:
+                async for chunk in request.body_chunks(self.max_upload):
+                    if len(head) < len(PDF_MAGIC):
+                        head += chunk[:len(PDF_MAGIC)]
+                        if len(head) >= len(PDF_MAGIC) and not head.startswith(PDF_MAGIC):
+                            raise HTTPError(400, "Body is not a PDF")
+                    await asyncio.to_thread(f.write, chunk)
+                    size += len(chunk)
+            if size == 0:
+                raise HTTPError(400, "Empty upload")
+            if len(head) < len(PDF_MAGIC):
+                raise HTTPError(400, "Body is not a PDF")
+        except BaseException:
+            os.remove(path)
+            raise
+        self.files[file_id] = (path, time.time())
+        self.counters["uploads"] += 1
+        self.counters["bytes_in"] += size
+        return file_id, size
+
+    # --- İşler ---
+
+    def _queued_count(self):
+        return sum(1 for job in self.jobs.values() if job.status == "queued")
+
+    def _submit(self, spec):
+        if not isinstance(spec, dict):
+            raise HTTPError(400, "Job spec must be a JSON object")
+        mode, options = job_options(spec)
+        file_ids = spec.get("files") or []
+        if not isinstance(file_ids, list) or not all(isinstance(f, str) for f in file_ids):
+            raise HTTPError(400, "files must be a list of file ids")
+        if not file_ids:
+            raise HTTPError(400, "No files given")
+        missing = [f for f in file_ids if f not in self.files]
+        if missing:
+            raise HTTPError(404, f"Unknown file id(s): {', '.join(missing)}")
+        pages = spec.get("pages")
+        if pages is not None:
+            try:
+                pages = [(int(f), int(p)) for f, p in pages]
+            except (TypeError, ValueError):
+                raise HTTPError(400, "pages must be a list of [file_index, page_index] pairs") from None
+            if any(not 0 <= f < len(file_ids) for f, _ in pages):
+                raise HTTPError(400, "File index out of range in pages")
+        # Çalışmayı bekleyen iş sınırı (çalışanlar havuz boyutuyla zaten sınırlı)
+        if self._queued_count() >= self.queue_limit:
+            self.counters["jobs_rejected"] += 1
+            raise HTTPError(503, "Queue is full, retry later", {"Retry-After": "5"})
+
+        job = Job(mode, None)
+        job.output_path = os.path.join(self.result_dir, job.id + ".pdf")
+        job.file_ids = tuple(file_ids)
+        self.jobs[job.id] = job
+        self.counters["jobs_submitted"] += 1
+        paths = [self.files[f][0] for f in file_ids]
+        asyncio.create_task(self._run(job, paths, pages, options))
+        return job
+
+    async def _run(self, job, paths, pages, options):
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            job.status = "running"
+            job.started = time.time()
+            self._waits.append(job.started - job.created)
+            try:
+                for attempt in range(2):
+                    pool = self._pool
+                    try:
+                        count, pages_in, stats, _, trace = await loop.run_in_executor(
+                            pool, run_job, paths, pages, job.output_path, job.mode, options)
+                        break
+                    except BrokenProcessPool:
+                        # Çöken iş bu olmayabilir: havuz yenilenir, iş bir kez daha denenir
+                        await self._replace_pool(pool)
+                        if attempt:
+                            raise
+            except BrokenProcessPool:
+                job.status = "failed"
+                job.error = "Worker process crashed"
+                self.counters["jobs_failed"] += 1
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                job.input_error = isinstance(e, INPUT_ERRORS)
+                self.counters["jobs_failed"] += 1
+            else:
+                TRACER.merge(trace)
+                job.status = "done"
+                job.pages_in = pages_in
+                job.pages_out = count
+                job.stats = stats
+                self.counters["jobs_done"] += 1
+                self.counters["pages_in"] += pages_in
+                self.counters["pages_out"] += count
+            job.finished = time.time()
+            self._latencies.append(job.finished - job.created)
+            job.done_event.set()
+
+    async def _replace_pool(self, broken):
+        """Bozulan havuzu kapatıp yenisini kurar; aynı havuz için birden çok iş çağırsa da bir kez."""
+        async with self._pool_lock:
+            if self._pool is not broken:
+                return
+            self.log("Worker process crashed, restarting the pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self.counters["pool_restarts"] += 1
+
+    async def _process_now(self, request, writer):
+        """Tek adım: yükle, işle, sonucu gönder; geçici dosyalar sonra silinir."""
+        file_id, _ = await self._receive_upload(request)
+        job = None
+        try:
+            spec = dict(request.query)
+            spec["files"] = [file_id]
+            job = self._submit(spec)
+            await job.done_event.wait()
+            if job.status != "done":
+                raise HTTPError(422 if job.input_error else 500, job.error or "Processing failed")
+            await self._send_file(writer, job.output_path, f"{job.mode}.pdf")
+        finally:
+            # Bitmemiş iş (istemci koptu) çalışmaya devam eder; süresi dolunca sweep siler
+            if job is not None and job.finished is not None and job.id in self.jobs:
+                self._remove_job(job.id)
+            if file_id in self.files:
+                self._remove_file(file_id)
+
+    # --- Ölçüm ---
+
+    @staticmethod
+    def _percentiles(values):
+        if not values:
+            return None
+        ordered = sorted(values)
+
+        def pick(q):
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+        return {"mean": round(sum(ordered) / len(ordered), 4), "p50": pick(0.5), "p95": pick(0.95),
+                "p99": pick(0.99), "max": round(ordered[-1], 4)}
+
+    def metrics(self):
+        uptime = time.monotonic() - self.started
+        c = self.counters
+        running = sum(1 for job in self.jobs.values() if job.status == "running")
+        return {
+            "uptime_s": round(uptime, 1),
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "queued": self._queued_count(),
+            "running": running,
+            "requests": c["requests"],
+            "uploads": c["uploads"],
+            "bytes_in": c["bytes_in"],
+            "bytes_out": c["bytes_out"],
+            "jobs": {"submitted": c["jobs_submitted"], "done": c["jobs_done"], "failed": c["jobs_failed"],
+                     "rejected": c["jobs_rejected"]},
+            "pool_restarts": c["pool_restarts"],
+            "throughput": {
+                "jobs_per_min": round(c["jobs_done"] / uptime * 60, 3) if uptime > 0 else 0.0,
+                "pages_per_s": round(c["pages_in"] / uptime, 3) if uptime > 0 else 0.0,
+            },
+            "latency_s": self._percentiles(self._latencies),
+            "queue_wait_s": self._percentiles(self._waits),
+        }
+
+
+class LocalClient:
+    """
+    Aynı process (ve event loop) içinde çalışan servise istek atan küçük istemci;
+    testler ve betikler için. Gövde bytes veya dosya yolu olabilir (dosya parça parça gönderilir).
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    async def request(self, method, path, body=None, json_body=None, output_path=None):
+        """(status, headers, body) döndürür; output_path verilirse gövde dosyaya yazılır."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if json_body is not None:
+                body = json.dumps(json_body).encode("utf-8")
+            if isinstance(body, str):
+                length = os.path.getsize(body)
+            else:
+                length = len(body or b"")
+            writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                         f"Content-Length: {length}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+            if isinstance(body, str):
+                with open(body, "rb") as f:
+                    while chunk := f.read(CHUNK_SIZE):
+                        writer.write(chunk)
+                        await writer.drain()
+            elif body:
+                writer.write(body)
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            remaining = int(headers.get("content-length", 0))
+            if output_path is not None and status == 200:
+                with open(output_path, "wb") as f:
+                    while remaining > 0:
+                        chunk = await reader.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        remaining -= len(chunk)
+                return status, headers, None
+            data = await reader.readexactly(remaining) if remaining else b""
+            if headers.get("content-type") == "application/json" and data:
+                data = json.loads(data)
+            return status, headers, data
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+
+async def serve(host, port, **options):
+    service = PdfService(**options)
+    host, port = await service.start(host, port)
+    service.log(f"Listening on http://{host}:{port} ({service.workers} workers, queue limit "
+                f"{service.queue_limit}, work dir {service.work_dir})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP service for margin / merge / booklet jobs.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Jobs run at the same time (default: CPU count)")
+    parser.add_argument("--queue-limit", type=int, default=16, help="Jobs allowed to wait; more are rejected with 503")
+    parser.add_argument("--max-upload", type=int, default=512, metavar="MB", help="Largest accepted upload")
+    parser.add_argument("--ttl", type=int, default=3600, metavar="SEC", help="Keep uploads and results this long")
+    parser.add_argument("--work-dir", help="Folder for uploads and results (default: a new temp folder)")
+    parser.add_argument("--trace", metavar="FILE", help="Write a JSON timing trace (per request and per job)")
+    parser.add_argument("--profile", metavar="FILE", help="Write merged cProfile stats of all workers (pstats)")
+    args = parser.parse_args(argv)
+    TRACER.configure(trace_path=args.trace, profile_path=args.profile)
+    try:
+        asyncio.run(serve(args.host, args.port, work_dir=args.work_dir, workers=args.workers,
+                          queue_limit=args.queue_limit, max_upload=args.max_upload * 1024 * 1024, ttl=args.ttl))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""Sınırlı bellekle çalışan, sayfaları diske parça parça yazan PDF writer.
+
+PdfWriter tüm sayfaları ve kaynaklarını write() çağrılana kadar bellekte tutar.
+StreamingPdfWriter ise her sayfayı (ve ondan erişilen nesneleri) bir sonraki
+sayfa eklendiğinde dosyaya yazar ve bırakır. Kaynak reader'lardan çözülen
+nesnelerin (reader'ın önbelleğinde kalanların) yaklaşık boyutu memory_limit'i
+aştıkça bu önbellekler boşaltılır. Boyut tahminidir: stream verisi byte olarak,
+sözlük/dizi girdileri sabit bir payla sayılır; çağıranın kendi tuttuğu nesneler
+(ör. henüz yerleştirilmemiş XObject'ler) sayılmaz.
+
+Dolaylı olmayan (doğrudan) stream'ler, örneğin birden çok kağıt yüzüne yerleşen
+aynı Form XObject, nesne kimliğiyle eşlenir ve bir kez yazılır.
+
+Engine'in kullandığı kadar PdfWriter API'sini taklit eder:
+add_page(page), add_blank_page(width, height), write(stream) / close().
+
+Varsayım (requirements.txt'deki pypdf aralığı): PdfReader.resolved_objects,
+(generation, idnum) -> nesne biçiminde çözülmüş nesne önbelleğidir ve
+boşaltıldığında nesneler gerektikçe dosyadan yeniden okunur. Belgelenmiş bir API
+değildir; bulunmazsa önbellek boşaltılmaz (çıktı yine doğrudur, sadece bellek
+sınırı tutmaz) ve trace'e "stream_purge_unsupported" sayılır.
+"""
+import os
+import weakref
+import zlib
+
+from pypdf import PageObject
+from pypdf.generic import (
+    ArrayObject,
+    ContentStream,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NullObject,
+    NumberObject,
+    StreamObject,
+)
+
+from pdf_trace import count
+
+DEFAULT_MEMORY_LIMIT_MB = 256
+ENTRY_OVERHEAD = 64  # Çözülmüş sözlük/dizi girdisi başına tahmini bellek (byte)
+
+
+def default_memory_limit():
+    return int(os.environ.get("PDF_MARGIN_STREAM_MEMORY_MB", DEFAULT_MEMORY_LIMIT_MB)) * 1024 * 1024
+
+
+class StreamingPdfWriter:
+    def __init__(self, stream, memory_limit=None):
+        self.stream = stream
+        self.memory_limit = default_memory_limit() if memory_limit is None else memory_limit
+        self._offsets = {}          # yeni nesne no -> dosya ofseti
+        self._next_num = 1
+        self._ref_map = {}          # (id(pdf), idnum, gen) -> yeni nesne no
+        self._direct_map = {}       # id(doğrudan stream) -> (weakref, yeni nesne no); nesne ölünce silinir
+        self._pending = []          # (yeni no, anahtar, kaynak nesne) yazılmayı bekleyen
+        self._deferred_pages = {}   # Henüz eklenmemiş sayfalara verilen numaralar
+        self._sources = {}          # id(pdf) -> pdf (id'ler yeniden kullanılmasın diye)
+        self._page_nums = []        # Pages /Kids sırası
+        self._current = None        # Henüz yazılmamış son sayfa (değiştirilebilir)
+        self._resolved_bytes = 0    # Son boşaltmadan beri kaynaklardan çözülen (tahmini) byte
+        self._closed = False
+
+        self._root_num = self._allocate()
+        self._pages_num = self._allocate()
+        self.stream.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    # --- PdfWriter uyumlu API ---
+
+    def add_page(self, page):
+        """
+        Sayfanın değiştirilebilir bir kopyasını döndürür. Sayfa, bir sonraki
+        sayfa eklendiğinde veya close() çağrıldığında diske yazılır.
+        """
+        self._flush_current()
+        copy = PageObject(pdf=None, indirect_reference=page.indirect_reference)
+        copy.update(page)
+        self._current = copy
+        return copy
+
+    def add_blank_page(self, width, height):
+        self._flush_current()
+        self._current = PageObject.create_blank_page(None, width, height)
+        return self._current
+
+    def write(self, stream=None):
+        """PdfWriter.write ile uyum için; akış zaten yazılıyor, sadece kapatır."""
+        self.close()
+
+    @property
+    def page_count(self):
+        return len(self._page_nums) + (1 if self._current is not None else 0)
+
+    def close(self):
+        if self._closed:
+            return
+        self._flush_current()
+        # Hiç eklenmeyen sayfalara yapılan linkler boş kalır
+        for num in self._deferred_pages.values():
+            self._write_object(num, NullObject())
+        self._deferred_pages.clear()
+
+        pages = DictionaryObject()
+        pages[NameObject("/Type")] = NameObject("/Pages")
+        pages[NameObject("/Kids")] = ArrayObject(self._ref(n) for n in self._page_nums)
+        pages[NameObject("/Count")] = NumberObject(len(self._page_nums))
+        self._write_object(self._pages_num, pages)
+
+        catalog = DictionaryObject()
+        catalog[NameObject("/Type")] = NameObject("/Catalog")
+        catalog[NameObject("/Pages")] = self._ref(self._pages_num)
+        self._write_object(self._root_num, catalog)
+
+        xref_offset = self.stream.tell()
+        size = self._next_num
+        self.stream.write(f"xref\n0 {size}\n".encode())
+        self.stream.write(b"0000000000 65535 f \n")
+        for num in range(1, size):
+            offset = self._offsets.get(num)
+            if offset is None:
+                self.stream.write(b"0000000000 65535 f \n")
+            else:
+                self.stream.write(f"{offset:010d} 00000 n \n".encode())
+        self.stream.write(f"trailer\n<< /Size {size} /Root {self._root_num} 0 R >>\n".encode())
+        self.stream.write(f"startxref\n{xref_offset}\n%%EOF\n".encode())
+        self._closed = True
+
+    # --- İç işleyiş ---
+
+    def _allocate(self):
+        num = self._next_num
+        self._next_num += 1
+        return num
+
+    def _ref(self, num):
+        return IndirectObject(num, 0, self)
+
+    def _flush_current(self):
+        page = self._current
+        if page is None:
+            return
+        self._current = None
+
+        num = None
+        # Kaynaktaki sayfaya yapılan referanslar (ör. annotation /P, link) bu sayfaya baksın
+        if page.indirect_reference is not None:
+            key = self._ref_key(page.indirect_reference)
+            num = self._deferred_pages.pop(key, None)
+            if num is None:
+                num = self._allocate()
+            self._ref_map[key] = num
+        else:
+            num = self._allocate()
+
+        out = self._translate_dict(page, skip=("/Parent",))
+        out[NameObject("/Parent")] = self._ref(self._pages_num)
+        self._write_object(num, out)
+        self._page_nums.append(num)
+        self._drain()
+
+        if self._resolved_bytes > self.memory_limit:
+            self._purge_sources()
+
+    def _ref_key(self, ref):
+        self._sources.setdefault(id(ref.pdf), ref.pdf)
+        return id(ref.pdf), ref.idnum, ref.generation
+
+    def _drain(self):
+        """Sayfadan erişilen ve henüz yazılmamış tüm dolaylı nesneleri yazar."""
+        while self._pending:
+            num, key, obj = self._pending.pop()
+            if isinstance(obj, DictionaryObject):
+                obj_type = obj.get("/Type")
+                if obj_type == "/Page" and key is not None:
+                    # Henüz eklenmemiş bir sayfaya link: numarayı sakla, sayfa gelirse kullanılır
+                    self._deferred_pages[key] = num
+                    continue
+                if obj_type in ("/Page", "/Pages"):
+                    # Sayfa ağacına link: tüm belgeyi çekmemek için null yaz
+                    self._write_object(num, NullObject())
+                    continue
+            self._write_object(num, self._translate_top(obj))
+
+    def _translate_top(self, obj):
+        if isinstance(obj, StreamObject):
+            return self._translate_stream(obj)
+        if isinstance(obj, DictionaryObject):
+            return self._translate_dict(obj)
+        return self._translate(obj)
+
+    def _translate(self, obj):
+        """Nesneyi kopyalar; kaynak referanslarını yeni nesne numaralarına çevirir."""
+        if isinstance(obj, IndirectObject):
+            key = self._ref_key(obj)
+            num = self._ref_map.get(key)
+            if num is None:
+                num = self._allocate()
+                self._ref_map[key] = num
+                resolved = obj.get_object()
+                self._resolved_bytes += _approx_size(resolved)
+                self._pending.append((num, key, resolved))
+            return self._ref(num)
+        if isinstance(obj, StreamObject):
+            # Doğrudan (dolaylı olmayan) stream'ler ayrı nesne olarak yazılmalı; aynı nesne
+            # birden çok sayfadan erişilse de bir kez. id yeniden kullanılmasın diye kayıt
+            # nesne yaşadıkça tutulur (weakref geri çağrısı siler).
+            entry = self._direct_map.get(id(obj))
+            if entry is not None:
+                return self._ref(entry[1])
+            num = self._allocate()
+            key, direct_map = id(obj), self._direct_map
+            self._direct_map[key] = (weakref.ref(obj, lambda _: direct_map.pop(key, None)), num)
+            self._pending.append((num, None, obj))
+            return self._ref(num)
+        if isinstance(obj, DictionaryObject):
+            return self._translate_dict(obj)
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._translate(item) for item in obj)
+        return obj
+
+    def _translate_dict(self, obj, skip=()):
+        out = DictionaryObject()
+        for key, value in obj.items():
+            if key in skip:
+                continue
+            out[NameObject(key)] = self._translate(value)
+        return out
+
+    def _translate_stream(self, obj):
+        if isinstance(obj, ContentStream):
+            # İşlem listesinden yeniden üretilen veri çözülmüş haldedir: kaynağın filtreleri
+            # geçerli değil, veri yeniden sıkıştırılır
+            out = self._translate_dict(obj, skip=("/Length", "/Filter", "/DecodeParms"))
+            out[NameObject("/Filter")] = NameObject("/FlateDecode")
+            return _RawStream(out, zlib.compress(obj.get_data()))
+        out = self._translate_dict(obj, skip=("/Length",))
+        return _RawStream(out, obj._data)
+
+    def _write_object(self, num, obj):
+        self._offsets[num] = self.stream.tell()
+        self.stream.write(f"{num} 0 obj\n".encode())
+        obj.write_to_stream(self.stream)
+        self.stream.write(b"\nendobj\n")
+
+    def _purge_sources(self):
+        """Kaynak reader'ların çözülmüş nesne önbelleklerini boşaltır."""
+        for pdf in self._sources.values():
+            cache = getattr(pdf, "resolved_objects", None)  # Bkz. modül açıklamasındaki varsayım
+            if isinstance(cache, dict):
+                cache.clear()
+            else:
+                count("stream_purge_unsupported")
+        count("stream_purges")
+        self._resolved_bytes = 0
+
+
+def _approx_size(obj):
+    """Çözülmüş nesnenin bellekteki yaklaşık boyutu (içindeki doğrudan nesneler dahil)."""
+    if isinstance(obj, StreamObject):
+        data = obj._data
+        return len(data or b"") + ENTRY_OVERHEAD * (len(obj) + 1)
+    if isinstance(obj, DictionaryObject):
+        return ENTRY_OVERHEAD + sum(ENTRY_OVERHEAD + _approx_size(v) for v in obj.values()
+                                    if not isinstance(v, IndirectObject))
+    if isinstance(obj, ArrayObject):
+        return ENTRY_OVERHEAD + sum(_approx_size(v) for v in obj if not isinstance(v, IndirectObject))
+    return ENTRY_OVERHEAD
+
+
+class _RawStream:
+    """Sözlüğü çevrilmiş, verisi olduğu gibi (yeniden kodlanmadan) yazılan stream."""
+    __slots__ = ("dictionary", "data")
+
+    def __init__(self, dictionary, data):
+        self.dictionary = dictionary
+        self.data = data
+
+    def write_to_stream(self, stream):
+        self.dictionary[NameObject("/Length")] = NumberObject(len(self.data))
+        self.dictionary.write_to_stream(stream)
+        stream.write(b"\nstream\n")
+        stream.write(self.data)
+        stream.write(b"\nendstream")
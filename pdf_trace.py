@@ -0,0 +1,236 @@
+"""İsteğe bağlı zamanlama / profil ölçümü.
+
+Kapalıyken (varsayılan) span() hiçbir şey yapmayan ortak bir nesne döndürür;
+açıkken her aşama ve sayfa için süre, thread ve ek bilgiler kaydedilir.
+
+Açmak için:
+    PDF_MARGIN_TRACE=trace.json      Chrome/Perfetto uyumlu JSON trace + özet
+    PDF_MARGIN_PROFILE=run.prof      İşçi thread'lerini cProfile ile sarar (pstats formatı)
+veya komut satırı araçlarında --trace / --profile.
+
+Trace dosyası program çıkarken yazılır. Alt process'ler (pdf_batch worker'ları)
+kendi kayıtlarını drain() ile döndürür, ana process merge() ile birleştirir.
+json / cProfile / pstats / multiprocessing sadece ölçüm açıkken yüklenir.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import defaultdict
+
+TRACE_ENV = "PDF_MARGIN_TRACE"
+PROFILE_ENV = "PDF_MARGIN_PROFILE"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._record(self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+    def set(self, **args):
+        """Span bitmeden bilinen bilgileri (ör. yazılan byte) ekler."""
+        self.args.update(args)
+
+
+class _RawStats:
+    """pstats.Stats'a başka process'ten gelen ham profil sözlüğünü vermek için."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class Tracer:
+    def __init__(self, trace_path=None, profile_path=None):
+        self.trace_path = trace_path
+        self.profile_path = profile_path
+        self._lock = threading.Lock()
+        self._events = []
+        self._counters = defaultdict(int)
+        self._stats = None
+        self._export_registered = False
+
+    @property
+    def enabled(self):
+        return bool(self.trace_path or self.profile_path)
+
+    def configure(self, trace_path=None, profile_path=None):
+        """
+        Komut satırı bayraklarından açar. Ortam değişkenleri de ayarlanır ki
+        alt process'ler (ProcessPoolExecutor) aynı ayarla başlasın.
+        """
+        if trace_path:
+            self.trace_path = os.path.abspath(trace_path)
+            os.environ[TRACE_ENV] = self.trace_path
+        if profile_path:
+            self.profile_path = os.path.abspath(profile_path)
+            os.environ[PROFILE_ENV] = self.profile_path
+        self._register_export()
+
+    def _register_export(self):
+        # Worker process'ler dosya yazmaz, kayıtlarını drain() ile ana process'e döndürür
+        if not self.enabled or self._export_registered:
+            return
+        import multiprocessing
+
+        if multiprocessing.parent_process() is None:
+            atexit.register(self.export)
+            self._export_registered = True
+
+    # --- Kayıt ---
+
+    def span(self, name, **args):
+        """'with span("margin.page", page=i):' — kapalıyken maliyeti yok denecek kadar az."""
+        if not self.trace_path:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def count(self, name, value=1):
+        if self.trace_path:
+            with self._lock:
+                self._counters[name] += value
+
+    def _record(self, name, start_ns, end_ns, args):
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": start_ns // 1000,
+            "dur": (end_ns - start_ns) // 1000,
+            "pid": os.getpid(),
+            "tid": threading.current_thread().name,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+
+    def profile(self):
+        """Bulunulan thread'i cProfile ile sarar (profil açık değilse boş)."""
+        if not self.profile_path:
+            return _NULL_SPAN
+        return _ProfileBlock(self)
+
+    def _add_profile(self, stats):
+        import pstats
+
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(stats)
+            else:
+                self._stats.add(stats)
+
+    # --- Process'ler arası taşıma ---
+
+    def drain(self):
+        """Şimdiye kadarki kayıtları (pickle edilebilir) döndürür ve temizler."""
+        with self._lock:
+            data = {"events": self._events, "counters": dict(self._counters),
+                    "profile": self._stats.stats if self._stats is not None else None}
+            self._events = []
+            self._counters = defaultdict(int)
+            self._stats = None
+        return data
+
+    def merge(self, data):
+        if not data:
+            return
+        with self._lock:
+            self._events.extend(data["events"])
+            for name, value in data["counters"].items():
+                self._counters[name] += value
+        if data.get("profile"):
+            self._add_profile(_RawStats(data["profile"]))
+
+    # --- Dışa aktarma ---
+
+    def summary(self):
+        """Span adına göre toplam/ortalama/en uzun süre (ms)."""
+        totals = {}
+        with self._lock:
+            events = list(self._events)
+        for event in events:
+            entry = totals.setdefault(event["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            ms = event["dur"] / 1000
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+        for entry in totals.values():
+            entry["mean_ms"] = round(entry["total_ms"] / entry["count"], 3)
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+        return dict(sorted(totals.items(), key=lambda item: -item[1]["total_ms"]))
+
+    def export(self):
+        if self.trace_path:
+            import json
+
+            with self._lock:
+                events = list(self._events)
+                counters = dict(self._counters)
+            data = {"traceEvents": events, "displayTimeUnit": "ms",
+                    "summary": self.summary(), "counters": counters}
+            tmp_path = self.trace_path + ".part"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.trace_path)
+        if self.profile_path and self._stats is not None:
+            self._stats.dump_stats(self.profile_path)
+
+
+class _ProfileBlock:
+    __slots__ = ("tracer", "profiler")
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def __enter__(self):
+        import cProfile
+
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        self.tracer._add_profile(self.profiler)
+        return False
+
+    def set(self, **args):
+        pass
+
+
+TRACER = Tracer(os.environ.get(TRACE_ENV) or None, os.environ.get(PROFILE_ENV) or None)
+TRACER._register_export()
+
+span = TRACER.span
+count = TRACER.count
+profile = TRACER.profile
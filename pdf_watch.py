@@ -0,0 +1,424 @@
+"""Klasör izleme: bırakılan PDF'lere otomatik delgeç payı ekler (uzun süre çalışan mod).
+
+Girdi klasörü belirli aralıklarla taranır. Bir dosya, boyutu ve değişiklik zamanı
+'settle' süresi boyunca değişmediğinde ve sonunda %%EOF işareti olduğunda tamamlanmış
+sayılır (kopyalanmakta olan dosyalar beklenir). Hazır dosyalar kuyruğa alınır ve
+sınırlı sayıda worker process'te add_binding_margin ile işlenir; çıktı adları
+pdf_delgec ile aynıdır ('ders.pdf' -> 'ders_delgec.pdf').
+
+İşlenen dosyalar boyut + değişiklik zamanıyla birlikte JSON kayıt dosyasına
+yazılır; yeniden başlatmada aynı dosya tekrar işlenmez. Dosya değişirse (yeni sürüm
+bırakılırsa) yeniden işlenir. Hata veren dosyalar ayrıca kaydedilir ve artan
+bekleme süreleriyle (retry_delay, 2x, 4x...) en fazla max_attempts kez denenir.
+Hatalar ayırt edilmez: geçici (kilitli dosya) de olsa her hata bir deneme sayılır;
+deneme hakkı biten dosya ancak değişirse yeniden denenir.
+
+Bir worker process çökerse (bellek yetmezliği, PyMuPDF'te segfault) havuz
+bozulur ve yeniden oluşturulur; izleme durmaz. Çökmenin hangi dosyadan olduğu
+bilinemediği için o an birlikte işlenen dosyalar hata sayılmadan kuyruğun başına
+döner ve teker teker (yanlarında başka dosya olmadan) işlenir; sadece tek başına
+işlenirken çöken dosyaya deneme yazılır.
+
+Örnek:
+    python pdf_watch.py gelen/ -o basilacak/ --margin 30
+    python pdf_watch.py gelen/ -o basilacak/ --fast -j 4 --stats-interval 60
+    python pdf_watch.py gelen/ -o basilacak/ --once      # Mevcutları işle ve çık
+"""
+import argparse
+import collections
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from pdf_engine import add_binding_margin, delgec_output_path
+from pdf_trace import TRACER, profile, span
+
+STATE_FILENAME = ".pdf_watch.json"
+EOF_SEARCH_BYTES = 2048  # %%EOF dosyanın son birkaç KB'ı içinde aranır
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 30.0  # sn; her başarısız denemede iki katına çıkar
+
+
+def is_complete_pdf(path):
+    """Dosyanın sonunda %%EOF var mı (yazımı bitmemiş dosyalar için hızlı kontrol)."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - EOF_SEARCH_BYTES))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+def process_file(input_path, output_path, margin, fast=False):
+    """Worker process'te tek dosya: (sayfa sayısı, süre, trace) döndürür."""
+    start = time.perf_counter()
+    with profile(), span("file", path=input_path):
+        pages = add_binding_margin(input_path, output_path, margin, fast=fast)
+    trace = TRACER.drain() if TRACER.enabled else None
+    return pages, time.perf_counter() - start, trace
+
+
+class WatchState:
+    """
+    Kalıcı kayıt, atomik olarak yazılır:
+        files     dosya adı -> imza (boyut, mtime) ve sonuç (işlenenler)
+        failures  dosya adı -> imza, deneme sayısı, son hata ve bir sonraki deneme zamanı
+    """
+
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS, retry_delay=DEFAULT_RETRY_DELAY):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.files = {}
+        self.failures = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                self.files = data.get("files", {})
+                self.failures = data.get("failures", {})
+                # Eski kayıtlarda hatalar işlenenlerle birlikteydi: tekrar denenebilsinler
+                for name, entry in list(self.files.items()):
+                    if entry.get("status") == "failed":
+                        del self.files[name]
+                        self.failures[name] = {"signature": entry["signature"], "attempts": 1,
+                                               "error": entry.get("error", ""), "retry_at": 0}
+            except (OSError, ValueError):
+                self.files = {}  # Bozuk kayıt: baştan başla (çıktılar yine .part ile güvenli)
+                self.failures = {}
+
+    def _entry(self, table, name, signature):
+        entry = table.get(name)
+        return entry if entry is not None and tuple(entry["signature"]) == signature else None
+
+    def is_done(self, name, signature):
+        """İşlendi veya deneme hakkı bitti (dosya değişene kadar tekrar denenmez)."""
+        if self._entry(self.files, name, signature) is not None:
+            return True
+        failure = self._entry(self.failures, name, signature)
+        return failure is not None and failure["attempts"] >= self.max_attempts
+
+    def retry_wait(self, name, signature):
+        """Başarısız dosyanın tekrar denenmesine kalan süre (sn); beklemek gerekmiyorsa 0."""
+        failure = self._entry(self.failures, name, signature)
+        if failure is None:
+            return 0.0
+        return max(0.0, failure["retry_at"] - time.time())
+
+    def record(self, name, signature, **result):
+        self.files[name] = {"signature": list(signature), "finished": time.time(), **result}
+        self.failures.pop(name, None)
+
+    def record_failure(self, name, signature, error):
+        """Hatayı kaydeder; dosyanın toplam deneme sayısını döndürür."""
+        previous = self._entry(self.failures, name, signature)
+        attempts = (previous["attempts"] if previous else 0) + 1
+        self.failures[name] = {"signature": list(signature), "attempts": attempts, "error": error,
+                               "retry_at": time.time() + self.retry_delay * 2 ** (attempts - 1)}
+        self.files.pop(name, None)
+        return attempts
+
+    def save(self, stats=None):
+        data = {"files": self.files, "failures": self.failures}
+        if stats is not None:
+            data["stats"] = stats
+        tmp_path = self.path + ".part"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+class FolderWatcher:
+    def __init__(self, input_dir, output_dir, margin=30, fast=False, workers=None, settle=2.0,
+                 state_path=None, max_attempts=DEFAULT_MAX_ATTEMPTS, retry_delay=DEFAULT_RETRY_DELAY, log=print):
+        """
+        workers: aynı anda işlenen en fazla dosya (varsayılan CPU sayısı).
+        settle: dosyanın tamamlanmış sayılması için boyut/mtime'ın değişmeden kalacağı süre (sn).
+        max_attempts / retry_delay: hata veren dosyanın deneme sayısı ve ilk bekleme süresi (sn).
+        """
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.margin = margin
+        self.fast = fast
+        self.workers = workers or os.cpu_count() or 1
+        self.settle = settle
+        self.state = WatchState(state_path or os.path.join(output_dir, STATE_FILENAME),
+                                max_attempts=max_attempts, retry_delay=retry_delay)
+        self.log = log
+
+        self._candidates = {}  # ad -> (imza, imzanın ilk görüldüğü an)
+        self._pending = collections.deque()  # (ad, imza, kuyruğa giriş anı)
+        self._queued = set()
+        self._running = {}  # future -> (ad, imza, kuyruğa giriş anı, başlama anı)
+        self._isolate = set()  # Bir çökmede birlikte çalışan, tek başına işlenecek dosyalar
+        self._crashed = []  # Havuz bozulunca sonuçlanmayan işler: (ad, imza, kuyruğa giriş anı)
+        self._last_scan = time.monotonic()
+
+        self.started = time.monotonic()
+        self.done = 0
+        self.failed = 0
+        self.restarts = 0
+        self.pages = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_queue_depth = 0
+
+    # --- Tarama ---
+
+    def scan(self):
+        """Girdi klasöründeki hazır ve henüz işlenmemiş dosyaları kuyruğa ekler."""
+        now = self._last_scan = time.monotonic()
+        present = set()
+        try:
+            entries = list(os.scandir(self.input_dir))
+        except OSError as e:
+            self.log(f"Cannot read {self.input_dir}: {e}")
+            return
+        for entry in entries:
+            name = entry.name
+            if not name.lower().endswith(".pdf") or name.lower().endswith("_delgec.pdf") or not entry.is_file():
+                continue
+            present.add(name)
+            try:
+                st = entry.stat()
+            except OSError:
+                continue  # Bu arada silinmiş
+            signature = (st.st_size, st.st_mtime_ns)
+            if name in self._queued or self.state.is_done(name, signature) or self.state.retry_wait(name, signature):
+                continue
+            seen = self._candidates.get(name)
+            if seen is None or seen[0] != signature:
+                self._candidates[name] = (signature, now)  # Yeni veya hâlâ yazılıyor
+                continue
+            if now - seen[1] < self.settle or not is_complete_pdf(entry.path):
+                continue
+            del self._candidates[name]
+            self._queued.add(name)
+            self._pending.append((name, signature, now))
+        # Kaybolan dosyaları unut
+        for name in list(self._candidates):
+            if name not in present:
+                del self._candidates[name]
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def _settling(self):
+        """
+        Son taramada boyutu/mtime'ı 'settle' süresi içinde değişmiş (hâlâ yazılıyor
+        olabilecek) dosya var mı. Taramanın anına göre bakılır: o andan beri durulan
+        bir dosya bir sonraki taramada kontrol edilmeden 'bitti' sayılmaz.
+        """
+        return any(self._last_scan - since < self.settle for _, since in self._candidates.values())
+
+    @property
+    def queue_depth(self):
+        """Bekleyen + işlenmekte olan dosya sayısı."""
+        return len(self._pending) + len(self._running)
+
+    # --- İşleme ---
+
+    def _submit(self, pool):
+        # Eş zamanlı iş sayısı worker sayısıyla sınırlı; gerisi kuyrukta bekler
+        while self._pending and len(self._running) < self.workers:
+            # Şüpheli dosya tek başına çalışır: başkası çalışırken başlamaz, o çalışırken başkası başlamaz
+            if self._running and (self._pending[0][0] in self._isolate
+                                  or any(job[0] in self._isolate for job in self._running.values())):
+                break
+            name, signature, queued_at = self._pending.popleft()
+            input_path = os.path.join(self.input_dir, name)
+            output_path = delgec_output_path(input_path, self.output_dir)
+            try:
+                future = pool.submit(process_file, input_path, output_path, self.margin, self.fast)
+            except BrokenProcessPool:
+                self._pending.appendleft((name, signature, queued_at))
+                raise
+            self._running[future] = (name, signature, queued_at, time.monotonic())
+
+    def _collect(self, futures):
+        """
+        Biten işleri kaydeder. Bir worker çöktüyse (havuz bozuldu) True döndürür;
+        sonuçlanmayan işler hata sayılmadan _crashed'e alınır, kararı _restart verir.
+        """
+        broken = False
+        for future in futures:
+            name, signature, queued_at, started_at = self._running.pop(future)
+            try:
+                pages, elapsed, trace = future.result()
+            except BrokenProcessPool:
+                broken = True
+                self._crashed.append((name, signature, queued_at))
+                continue
+            except Exception as e:
+                self._finish(name, queued_at, started_at)
+                self._fail(name, signature, str(e))
+                continue
+            self._finish(name, queued_at, started_at)
+            TRACER.merge(trace)
+            self.done += 1
+            self.pages += pages
+            self.busy_seconds += elapsed
+            output_name = os.path.basename(delgec_output_path(name, self.output_dir))
+            self.state.record(name, signature, status="ok", output=output_name, pages=pages,
+                              elapsed=round(elapsed, 3))
+            self.log(f"OK    {name} -> {output_name} ({pages} pages, {elapsed:.2f}s, "
+                     f"queue {self.queue_depth})")
+        self.state.save(self.stats())
+        return broken
+
+    def _finish(self, name, queued_at, started_at):
+        self._queued.discard(name)
+        self._isolate.discard(name)
+        self.wait_seconds += started_at - queued_at
+
+    def _fail(self, name, signature, error):
+        self.failed += 1
+        attempts = self.state.record_failure(name, signature, error)
+        if attempts >= self.state.max_attempts:
+            self.log(f"FAIL  {name}: {error} (attempt {attempts}, giving up until the file changes)")
+        else:
+            self.log(f"FAIL  {name}: {error} (attempt {attempts}, retry in "
+                     f"{self.state.retry_wait(name, signature):.0f}s)")
+
+    def _restart(self, pool):
+        """
+        Bozulan havuzu kapatır ve yeni bir havuz döndürür. Çöken iş tek başına
+        çalışıyorsa ona deneme yazılır; birlikte çalışanlar kuyruğun başına dönüp
+        teker teker işlenir (çökmeye hangisinin yol açtığı bilinmez).
+        """
+        self.restarts += 1
+        # Bozuk havuzun tüm işleri hata ile sonlanmıştır; beklemek takılmaz
+        finished, _ = wait(list(self._running))
+        self._collect(finished)
+        crashed, self._crashed = self._crashed, []
+        if len(crashed) == 1:
+            name, signature, _ = crashed[0]
+            self._queued.discard(name)
+            self._isolate.discard(name)
+            self._fail(name, signature, "worker process crashed")
+        else:
+            for item in reversed(crashed):
+                self._isolate.add(item[0])
+                self._pending.appendleft(item)
+        self.log(f"Worker process crashed, restarting the pool ({len(crashed)} file(s) were running, "
+                 f"{len(self._pending)} waiting)")
+        pool.shutdown(wait=False, cancel_futures=True)
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def stats(self):
+        uptime = time.monotonic() - self.started
+        finished = self.done + self.failed
+        return {
+            "uptime_s": round(uptime, 1),
+            "done": self.done,
+            "failed": self.failed,
+            "restarts": self.restarts,
+            "pages": self.pages,
+            "queue_depth": self.queue_depth,
+            "pending": len(self._pending),
+            "running": len(self._running),
+            "max_queue_depth": self.max_queue_depth,
+            "files_per_min": round(self.done / uptime * 60, 2) if uptime > 0 else 0.0,
+            "pages_per_s": round(self.pages / uptime, 2) if uptime > 0 else 0.0,
+            "mean_process_s": round(self.busy_seconds / self.done, 3) if self.done else None,
+            "mean_wait_s": round(self.wait_seconds / finished, 3) if finished else None,
+        }
+
+    def log_stats(self):
+        s = self.stats()
+        self.log(f"Stats: {s['done']} ok, {s['failed']} failed, {s['pages']} pages, "
+                 f"{s['files_per_min']} files/min, {s['pages_per_s']} pages/s, "
+                 f"queue {s['queue_depth']} ({s['running']} running, max {s['max_queue_depth']})")
+
+    def run(self, interval=1.0, once=False, stats_interval=None):
+        """
+        Durdurulana kadar (Ctrl+C) tarar ve işler. once=True ise mevcut dosyalar
+        hazır olup işlendikten sonra döner. İşlenmekte olanlar bitirilip kayıt yazılır.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.log(f"Watching {self.input_dir} -> {self.output_dir} "
+                 f"(margin {self.margin}, {self.workers} workers)")
+        last_stats = time.monotonic()
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            while True:
+                self.scan()
+                try:
+                    self._submit(pool)
+                except BrokenProcessPool:
+                    pool = self._restart(pool)
+                    continue
+                if once and not self.queue_depth and not self._settling():
+                    # Kalan adaylar değişmiyor ama tamamlanmamış (%%EOF yok): atla
+                    for name in self._candidates:
+                        self.log(f"SKIP  {name}: incomplete PDF")
+                    break
+                if self._running:
+                    finished, _ = wait(list(self._running), timeout=interval, return_when=FIRST_COMPLETED)
+                    if self._collect(finished):
+                        pool = self._restart(pool)
+                else:
+                    time.sleep(interval)
+                if stats_interval and time.monotonic() - last_stats >= stats_interval:
+                    self.log_stats()
+                    last_stats = time.monotonic()
+        except KeyboardInterrupt:
+            self.log(f"Stopping, waiting for {len(self._running)} running file(s)...")
+            self._pending.clear()
+            finished, _ = wait(list(self._running))
+            self._collect(finished)
+        finally:
+            pool.shutdown()
+        self.state.save(self.stats())
+        self.log_stats()
+        return self.stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a folder and add a binding margin to PDFs dropped into it.")
+    parser.add_argument("input_dir", help="Folder to watch")
+    parser.add_argument("-o", "--output-dir", required=True, help="Folder for *_delgec.pdf results")
+    parser.add_argument("--margin", type=int, default=30, help="Binding margin in points")
+    parser.add_argument("--fast", action="store_true",
+                        help="Margin by expanding page boxes only (content streams are not rewritten)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Files processed at the same time (default: CPU count)")
+    parser.add_argument("--interval", type=float, default=1.0, metavar="SEC", help="Folder scan interval")
+    parser.add_argument("--settle", type=float, default=2.0, metavar="SEC",
+                        help="How long a file must stay unchanged before it is processed")
+    parser.add_argument("--retries", type=int, default=DEFAULT_MAX_ATTEMPTS, metavar="N",
+                        help="Attempts per file before giving up until the file changes")
+    parser.add_argument("--retry-delay", type=float, default=DEFAULT_RETRY_DELAY, metavar="SEC",
+                        help="Wait before the first retry of a failed file (doubles each attempt)")
+    parser.add_argument("--state", metavar="FILE",
+                        help=f"Processed-files record (default: OUTPUT_DIR/{STATE_FILENAME})")
+    parser.add_argument("--stats-interval", type=float, default=300, metavar="SEC",
+                        help="Log throughput and queue depth every SEC seconds (0 disables)")
+    parser.add_argument("--once", action="store_true", help="Process the files present now, then exit")
+    parser.add_argument("--trace", metavar="FILE", help="Write a JSON timing trace (per file and per page)")
+    parser.add_argument("--profile", metavar="FILE", help="Write merged cProfile stats of all workers (pstats)")
+    args = parser.parse_args(argv)
+    TRACER.configure(trace_path=args.trace, profile_path=args.profile)
+
+    if not os.path.isdir(args.input_dir):
+        print(f"Not a directory: {args.input_dir}", file=sys.stderr)
+        return 2
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Servis olarak çalışırken (systemd vb.) SIGTERM de Ctrl+C gibi düzgün kapatır
+    signal.signal(signal.SIGTERM, stop)
+    watcher = FolderWatcher(args.input_dir, args.output_dir, margin=args.margin, fast=args.fast,
+                            workers=args.workers, settle=args.settle, state_path=args.state,
+                            max_attempts=max(1, args.retries), retry_delay=args.retry_delay)
+    stats = watcher.run(interval=args.interval, once=args.once, stats_interval=args.stats_interval)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Arka planda (Tk ana thread'i dışında) çıktı üretimi.
+
+İlerleme ve sonuç mesajları thread-safe bir kuyruğa konur; arayüz bunları
+root.after ile okur:
+    ("progress", stage, done, total)   stage: "read" | "margin" | "booklet" | "pipeline" | "write" | "optimize"
+    ("done", output_path, count, stats)   stats: optimize edildiyse size_before/size_after,
+                                          önbellekten geldiyse cached=True (output_path önceki çıktı olabilir)
+    ("cancelled",)
+    ("error", message)
+"""
+import queue
+import threading
+
+from pdf_engine import ProcessingCancelled, process_sources
+from pdf_trace import profile, span
+
+
+class ProcessingJob:
+    def __init__(self, sources, output_path, mode, margin=0, fast=False, streaming=False, booklet_options=None,
+                 optimize=False, backend="pypdf", stages=None, pool=None, cache=None):
+        """
+        sources: sırasıyla (dosya yolu, sayfa numarası) listesi.
+        backend: "pypdf" veya "pymupdf" (bkz. pdf_engine.BACKENDS).
+        booklet_options: write_pages'e geçirilir (sheet, signature_sheets, creep).
+        stages: mode="pipeline" için pdf_pipeline aşamaları.
+        pool: küçük resimlerle paylaşılan pdf_pool.DocumentPool (kaynaklar yeniden açılmaz).
+        cache: output_cache.OutputCache; verilirse aynı iş yeniden işlenmez.
+        """
+        self.sources = list(sources)
+        self.output_path = output_path
+        self.mode = mode
+        self.margin = margin
+        self.fast = fast
+        self.streaming = streaming
+        self.booklet_options = booklet_options or {}
+        self.optimize = optimize
+        self.backend = backend
+        self.stages = stages
+        self.pool = pool
+        self.cache = cache
+        self.messages = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ProcessingJob", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        """İşi bir sonraki sayfada durdurur; yarım çıktı dosyası silinir."""
+        self._cancel.set()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """İş bitene kadar (veya timeout saniye) bekler; iş bittiyse True döndürür."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _progress(self, stage, done, total):
+        self.messages.put(("progress", stage, done, total))
+
+    def _run(self):
+        with profile(), span("job", mode=self.mode, pages=len(self.sources), backend=self.backend):
+            self._process()
+
+    def _process(self):
+        try:
+            stats = {}
+            options = dict(backend=self.backend, progress=self._progress, cancel=self._cancel, margin=self.margin,
+                           fast=self.fast, streaming=self.streaming, optimize=self.optimize, stats=stats,
+                           stages=self.stages, pool=self.pool, **self.booklet_options)
+            if self.cache is not None:
+                output_path, count = self.cache.process(self.sources, self.output_path, self.mode, **options)
+            else:
+                output_path = self.output_path
+                count = process_sources(self.sources, output_path, self.mode, **options)
+            self.messages.put(("done", output_path, count, stats))
+        except ProcessingCancelled:
+            self.messages.put(("cancelled",))
+        except Exception as e:
+            self.messages.put(("error", str(e)))
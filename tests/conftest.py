@@ -0,0 +1,48 @@
+"""Testler için ortak ayarlar: depo kökü import yoluna eklenir, küçük bir PDF derlemi üretilir."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_pdf(path, pages):
+    """
+    pages: (genişlik, yükseklik, döndürme, CropBox) listesi; CropBox None veya
+    PyMuPDF koordinatlarında (x0, y0, x1, y1). Her sayfada metin, dolu kutu ve çerçeve vardır.
+    """
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for i, (width, height, rotation, cropbox) in enumerate(pages):
+        page = doc.new_page(width=width, height=height)
+        page.draw_rect(page.rect, color=(0.8, 0, 0), fill=(1, 0.9, 0.9), width=4)
+        page.insert_text((40, 80), f"Page {i + 1}", fontsize=28)
+        page.draw_rect(fitz.Rect(40, height / 2, 40 + width / 3, height / 2 + 90), color=(0, 0, 1), fill=(0, 0, 1))
+        if cropbox is not None:
+            page.set_cropbox(fitz.Rect(cropbox))
+        if rotation:
+            page.set_rotation(rotation)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.fixture(scope="session")
+def corpus(tmp_path_factory):
+    """Düz, döndürülmüş, kırpılmış ve farklı boyutlu sayfalardan oluşan iki dosya."""
+    root = tmp_path_factory.mktemp("corpus")
+    a = make_pdf(str(root / "a.pdf"), [
+        (595, 842, 0, None),
+        (595, 842, 90, None),
+        (595, 842, 0, (30, 40, 565, 800)),
+        (842, 595, 0, None),
+        (595, 842, 270, (20, 20, 575, 822)),
+    ])
+    b = make_pdf(str(root / "b.pdf"), [
+        (420, 595, 180, None),
+        (612, 792, 0, None),
+        (612, 792, 90, (10, 30, 600, 780)),
+    ])
+    return [(a, i) for i in range(5)] + [(b, i) for i in range(3)]
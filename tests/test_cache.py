@@ -0,0 +1,131 @@
+"""thumb_cache.DiskCache tabanı: hash belleği, LRU silme; ThumbnailCache ve OutputCache."""
+import os
+
+from pypdf import PdfReader
+
+import output_cache
+import thumb_cache
+from conftest import make_pdf
+from output_cache import OutputCache
+from pdf_engine import process_sources
+from pdf_pool import DocumentPool
+from thumb_cache import ThumbnailCache
+
+
+def test_file_key_is_keyed_by_path_and_capped(tmp_path, monkeypatch):
+    cache = ThumbnailCache(str(tmp_path / "thumbs"))
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"one")
+    first = cache.file_key(str(path))
+    path.write_bytes(b"two!")
+    second = cache.file_key(str(path))
+    assert first != second
+    assert len(cache._digests) == 1  # Değişen dosya eski kaydın yerine geçer
+
+    monkeypatch.setattr(thumb_cache, "MAX_DIGESTS", 3)
+    for i in range(5):
+        other = tmp_path / f"{i}.bin"
+        other.write_bytes(bytes([i]))
+        cache.file_key(str(other))
+    assert len(cache._digests) == 3
+    assert list(cache._digests) == [str(tmp_path / f"{i}.bin") for i in (2, 3, 4)]
+
+
+def test_thumbnail_eviction_keeps_recent(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), max_bytes=2500)
+    for i in range(3):
+        cache.put("ab" * 20, i, 1.0, b"x" * 1000)
+        os.utime(cache._path("ab" * 20, i, 1.0), (i, i))
+    cache.put("ab" * 20, 3, 1.0, b"x" * 1000)
+    assert [cache.get("ab" * 20, i, 1.0) is not None for i in range(4)] == [False, False, True, True]
+    assert cache._total == 2000
+
+
+def test_output_cache_reuse_and_eviction(tmp_path):
+    source = make_pdf(str(tmp_path / "in.pdf"), [(595, 842, 0, None), (595, 842, 0, None)])
+    cache = OutputCache(str(tmp_path / "outputs"))
+    sources = [(source, 0), (source, 1)]
+    output = str(tmp_path / "out.pdf")
+    stats = {}
+    assert cache.process(sources, output, "margin", margin=20) == (output, 2)
+    assert cache.process(sources, str(tmp_path / "again.pdf"), "margin", margin=20, stats=stats) == (output, 2)
+    assert stats["cached"]
+
+    metas = [os.path.join(d, f) for d, _, files in os.walk(cache.directory) for f in files if f.endswith(".json")]
+    assert metas
+    cache.max_bytes = 0
+    cache.evict()
+    assert cache._entries() == []
+    assert not any(os.path.exists(m) for m in metas)  # Silinen PDF'lerin meta dosyaları da gider
+
+
+def _merge(tmp_path, cache, name, pool=None):
+    """İki dosyalık margin işi (parçalara bölünür); ((çıktı, sayfa sayısı), parça yolları)."""
+    a, b = str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf")
+    if not os.path.exists(a):
+        make_pdf(a, [(595, 842, 0, None), (595, 842, 0, None)])
+        make_pdf(b, [(612, 792, 0, None)])
+    output = str(tmp_path / name)
+    result = cache.process([(a, 0), (a, 1), (b, 0)], output, "margin", margin=20, pool=pool)
+    parts = sorted(path for path, _, _ in cache._entries() if os.sep + "part" + os.sep in path)
+    return result, parts
+
+
+def test_damaged_part_is_regenerated(tmp_path):
+    cache = OutputCache(str(tmp_path / "outputs"))
+    (_, pages), parts = _merge(tmp_path, cache, "first.pdf")
+    assert pages == 3 and len(parts) == 2
+    with open(parts[0], "r+b") as f:
+        f.truncate(100)  # Yarım kalmış / bozulmuş parça
+    os.remove(parts[1])
+    # İş kaydı silinince iş parçalardan yeniden kurulur
+    for path, _, _ in cache._entries():
+        if os.sep + "job" + os.sep in path:
+            os.remove(path)
+    (output, pages), again = _merge(tmp_path, cache, "second.pdf")
+    assert pages == 3 and again == parts
+    assert len(PdfReader(output).pages) == 3
+    assert all(len(PdfReader(path).pages) for path in parts)
+
+
+def test_pinned_files_survive_eviction(tmp_path):
+    cache = OutputCache(str(tmp_path / "outputs"))
+    _, parts = _merge(tmp_path, cache, "out.pdf")
+    cache.max_bytes = 0
+    with cache.pinned() as pin:
+        pin(parts[0])
+        cache.evict()
+        assert [path for path, _, _ in cache._entries()] == [parts[0]]
+    cache.evict()
+    assert cache._entries() == []
+
+
+def test_parts_use_a_private_pool(tmp_path):
+    cache = OutputCache(str(tmp_path / "outputs"))
+    pool = DocumentPool()
+    _merge(tmp_path, cache, "out.pdf", pool=pool)
+    assert sorted(os.path.basename(path) for path in pool._entries) == ["a.pdf", "b.pdf"]
+    pool.close()
+
+
+def test_part_lost_during_assembly_is_rebuilt(tmp_path, monkeypatch):
+    cache = OutputCache(str(tmp_path / "outputs"))
+    _, parts = _merge(tmp_path, cache, "first.pdf")
+    for path, _, _ in cache._entries():
+        if os.sep + "job" + os.sep in path:
+            os.remove(path)
+
+    calls = []
+
+    def losing(sources, output_path, mode, **options):
+        # Başka bir process'in evict'i gibi: ilk birleştirmeden hemen önce parça silinir
+        if not calls and sources[0][0] in parts:
+            os.remove(parts[0])
+            calls.append(mode)
+        return process_sources(sources, output_path, mode, **options)
+
+    monkeypatch.setattr(output_cache, "process_sources", losing)
+    (output, pages), _ = _merge(tmp_path, cache, "second.pdf")
+    assert calls  # Parça gerçekten birleştirme sırasında silindi
+    assert pages == 3 and len(PdfReader(output).pages) == 3
+    assert os.path.exists(parts[0])
@@ -0,0 +1,33 @@
+"""page_model.PageImageStore: JPEG'ler bütçe dahilinde tutulur, bırakılanlar geri okunur."""
+import page_model
+from page_model import PageImageStore
+
+
+def test_encoded_pages_share_the_budget(monkeypatch):
+    monkeypatch.setattr(page_model, "MIN_CACHED_IMAGES", 2)
+    reloads = []
+
+    def reload(file_id, page_index):
+        reloads.append(page_index)
+        return b"%d" % page_index * 100
+
+    store = PageImageStore(budget_bytes=300, reload=reload)
+    for i in range(10):
+        store.set_data(0, i, b"%d" % i * 100)
+    # Bellek belge boyutuyla büyümez: sadece son sayfalar tutulur
+    assert store._data_bytes <= 300 and list(store._data) == [(0, 7), (0, 8), (0, 9)]
+    assert all(store.has_data(0, i) for i in range(10)) and not store.has_data(0, 10)
+
+    assert store.data(0, 1) == b"1" * 100 and reloads == [1]
+    assert store.data(0, 1) == b"1" * 100 and reloads == [1]  # Geri okunan tekrar LRU'ya girer
+    assert (0, 7) not in store._data and store._data_bytes <= 300
+    # Henüz yüklenmemiş sayfa geri okunmaz (yer tutucu gösterilir)
+    assert store.data(0, 10) is None and reloads == [1]
+
+
+def test_without_reload_pages_are_kept(monkeypatch):
+    monkeypatch.setattr(page_model, "MIN_CACHED_IMAGES", 2)
+    store = PageImageStore(budget_bytes=300)
+    for i in range(10):
+        store.set_data(0, i, b"x" * 100)
+    assert len(store._data) == 10 and store.data(0, 0) == b"x" * 100
@@ -0,0 +1,92 @@
+"""PyMuPDF backend'inin çıktısı pypdf backend'iyle aynı olmalı (sayfa sayısı, kutular, görüntü)."""
+import pytest
+
+from pdf_engine import process_sources
+from pdf_pipeline import Booklet, Margin, NUp, Select
+
+fitz = pytest.importorskip("fitz")
+
+RENDER_DPI = 36
+PIXEL_DELTA = 40        # Gri tonda bu kadar farklı olan piksel "farklı" sayılır
+TOLERANCE = 0.005       # Sayfadaki farklı piksel oranı (kenar yumuşatma farkları için)
+
+CASES = [
+    ("margin", "margin", {"margin": 30}),
+    ("margin_fast", "margin", {"margin": 30, "fast": True}),
+    ("merge", "margin", {"margin": 0}),
+    ("booklet", "booklet", {}),
+    ("booklet_a3_signature", "booklet", {"sheet": "A3", "signature_sheets": 1, "creep": 2.0}),
+    ("margin_booklet", "pipeline", {"stages": [Margin(25), Booklet("A4")]}),
+    ("nup4", "pipeline", {"stages": [NUp(4, "A4", "sequential")]}),
+    ("nup8_cut_stack", "pipeline", {"stages": [NUp(8, "A3", "cut_stack")]}),
+]
+
+
+def _boxes(page):
+    boxes = (page.rect, page.mediabox, page.cropbox, page.trimbox, page.bleedbox, page.artbox)
+    return page.rotation, [tuple(round(v, 1) for v in box) for box in boxes]
+
+
+def _difference(a, b):
+    pa = a.get_pixmap(dpi=RENDER_DPI, colorspace=fitz.csGRAY)
+    pb = b.get_pixmap(dpi=RENDER_DPI, colorspace=fitz.csGRAY)
+    assert (pa.width, pa.height) == (pb.width, pb.height)
+    different = sum(1 for x, y in zip(pa.samples, pb.samples) if abs(x - y) > PIXEL_DELTA)
+    return different / (pa.width * pa.height)
+
+
+@pytest.mark.parametrize("name, mode, options", CASES, ids=[c[0] for c in CASES])
+def test_backends_match(tmp_path, corpus, name, mode, options):
+    outputs = {}
+    counts = {}
+    for backend in ("pypdf", "pymupdf"):
+        outputs[backend] = str(tmp_path / f"{name}_{backend}.pdf")
+        counts[backend] = process_sources(corpus, outputs[backend], mode, backend=backend, **options)
+    assert counts["pypdf"] == counts["pymupdf"]
+
+    with fitz.open(outputs["pypdf"]) as a, fitz.open(outputs["pymupdf"]) as b:
+        assert a.page_count == b.page_count == counts["pypdf"]
+        for n in range(a.page_count):
+            assert _boxes(a[n]) == _boxes(b[n]), f"page {n + 1}"
+            assert _difference(a[n], b[n]) <= TOLERANCE, f"page {n + 1}"
+
+
+def test_margin_fast_matches_slow(tmp_path, corpus):
+    """Hızlı mod (sadece kutular) yavaş modla aynı görünür; döndürülmüş sayfalar dahil."""
+    slow = str(tmp_path / "slow.pdf")
+    fast = str(tmp_path / "fast.pdf")
+    # Kırpılmış sayfalarda hızlı mod CropBox dışındaki içeriği payda gösterebilir
+    plain = [corpus[i] for i in (0, 1, 3, 5, 6)]
+    process_sources(plain, slow, "margin", margin=30)
+    process_sources(plain, fast, "margin", margin=30, fast=True)
+    with fitz.open(slow) as a, fitz.open(fast) as b:
+        assert a.page_count == b.page_count == len(plain)
+        for n in range(a.page_count):
+            assert tuple(a[n].rect) == pytest.approx(tuple(b[n].rect))
+            assert _difference(a[n], b[n]) <= TOLERANCE, f"page {n + 1}"
+
+
+EMPTY_CASES = [
+    ("no_sources_margin", "margin", {"margin": 30}),
+    ("no_sources_booklet", "booklet", {}),
+    ("no_sources_optimize", "booklet", {"optimize": True}),
+    ("empty_selection", "pipeline", {"stages": [Select([]), Booklet("A4")]}),
+]
+
+
+@pytest.mark.parametrize("name, mode, options", EMPTY_CASES, ids=[c[0] for c in EMPTY_CASES])
+def test_empty_output_matches(tmp_path, corpus, name, mode, options):
+    """Çıktıda sayfa yoksa iki backend de aynı sayfasız PDF'i yazar."""
+    sources = corpus if mode == "pipeline" else []
+    data = {}
+    for backend in ("pypdf", "pymupdf"):
+        output = tmp_path / f"{name}_{backend}.pdf"
+        stats = {}
+        assert process_sources(sources, str(output), mode, backend=backend, stats=stats, **options) == 0
+        assert not list(tmp_path.glob("*.part"))
+        data[backend] = output.read_bytes()
+        if options.get("optimize"):
+            assert stats["size_before"] == stats["size_after"] == len(data[backend])
+    assert data["pypdf"] == data["pymupdf"]
+    with fitz.open(stream=data["pypdf"], filetype="pdf") as doc:
+        assert doc.page_count == 0
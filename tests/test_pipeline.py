@@ -0,0 +1,68 @@
+"""pdf_pipeline: sayfa seçimi ve aşama metni ayrıştırma."""
+import pytest
+
+from pdf_pipeline import Select, parse_pipeline, parse_selection
+
+
+@pytest.mark.parametrize("text, page_count, expected", [
+    ("1-3;7;10-", 12, [0, 1, 2, 6, 9, 10, 11]),
+    ("3-1", 3, [2, 1, 0]),
+    ("-2", 3, [0, 1]),
+    ("2-", 3, [1, 2]),
+    ("3-", 3, [2]),
+    # Açık uçlu aralık sadece ileri sayar; başlangıç sonu geçtiyse boş
+    ("5-", 3, []),
+    ("4-;1", 3, [0]),
+    # Sayfa sayısı bilinmiyorsa (söz dizimi kontrolü) açık uçlu aralık boş döner
+    ("2-;9", None, [8]),
+])
+def test_parse_selection(text, page_count, expected):
+    assert parse_selection(text, page_count) == expected
+
+
+@pytest.mark.parametrize("text, page_count", [
+    ("0", 3),
+    ("0", None),
+    ("9", 3),
+    ("2-9", 3),
+    ("9-2", 3),
+    ("0-2", None),
+    ("0-", 3),
+    ("x", 3),
+])
+def test_parse_selection_rejects_out_of_range(text, page_count):
+    with pytest.raises(ValueError):
+        parse_selection(text, page_count)
+
+
+def test_select_is_checked_against_previous_stages():
+    # 6 sayfa 2-up ile 3 kağıt yüzüne iner: 3. yüz var, 4. yok
+    stages = parse_pipeline("nup:2,select:3", page_count=6)
+    assert isinstance(stages[1], Select) and stages[1].indices == [2]
+    with pytest.raises(ValueError):
+        parse_pipeline("nup:2,select:4", page_count=6)
+    with pytest.raises(ValueError):
+        parse_pipeline("select:1-2,select:3", page_count=6)
+    assert parse_pipeline("select:5-", page_count=3)[0].indices == []
+    # Sadece söz dizimi: sayfa sayısı bilinmeden açık uçlu aralık kabul edilir
+    assert parse_pipeline("select:2-,margin:30")[0].indices == []
+
+
+def test_xobject_is_kept_until_last_use(tmp_path, monkeypatch):
+    import pdf_pipeline
+    from conftest import make_pdf
+    from pdf_engine import process_sources
+
+    converted = []
+    to_xobject = pdf_pipeline.page_to_xobject
+
+    def counting(page):
+        converted.append(page.page_number)
+        return to_xobject(page)
+
+    monkeypatch.setattr(pdf_pipeline, "page_to_xobject", counting)
+    source = make_pdf(str(tmp_path / "in.pdf"), [(595, 842, 0, None), (595, 842, 90, None)])
+    stages = parse_pipeline("select:1;2;1;2", page_count=2)
+    assert process_sources([(source, 0), (source, 1)], str(tmp_path / "out.pdf"), "pipeline", stages=stages) == 4
+    # Her kaynak bir kez çevrilir: son kullanımdan önce bırakılmaz
+    assert converted == [0, 1]
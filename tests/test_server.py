@@ -0,0 +1,273 @@
+"""pdf_server: LocalClient ile yükleme, iş, sonuç, dolu kuyruk ve bozuk istekler."""
+import asyncio
+import multiprocessing
+import os
+import time
+
+import pytest
+from pypdf import PdfReader
+
+import pdf_server
+from conftest import make_pdf
+from pdf_server import LocalClient, PdfService
+
+_process_sources = pdf_server.process_sources
+
+
+def _crashing_process_sources(sources, output_path, mode, **options):
+    """booklet her zaman, diğerleri '.crash' işaret dosyası varsa bir kez worker'ı öldürür."""
+    flag = sources[0][0] + ".crash"
+    if mode == "booklet" or os.path.exists(flag):
+        if os.path.exists(flag):
+            os.remove(flag)
+        os._exit(1)  # Segfault / bellek yetmezliği gibi: worker process ölür
+    return _process_sources(sources, output_path, mode, **options)
+
+
+@pytest.fixture
+def sample(tmp_path):
+    return make_pdf(str(tmp_path / "in.pdf"), [(595, 842, 0, None), (595, 842, 90, None), (612, 792, 0, None)])
+
+
+def serve(tmp_path, scenario, **options):
+    """scenario(service, client) coroutine'ini çalışan bir servisle çalıştırır."""
+    async def main():
+        service = PdfService(work_dir=str(tmp_path / "work"), workers=1, log=lambda _: None, **options)
+        host, port = await service.start(port=0)
+        try:
+            return await scenario(service, LocalClient(host, port))
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+async def raw_request(client, data):
+    """Ham baytları gönderir, yanıtın durum kodunu döndürür."""
+    reader, writer = await asyncio.open_connection(client.host, client.port)
+    try:
+        writer.write(data)
+        await writer.drain()
+        return int((await reader.readline()).split()[1])
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def cleaned_up(service, timeout=2.0):
+    """Yanıt gönderildikten sonra sunucu geçici dosya/işleri siler; bunu bekler."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while service.files or service.jobs:
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+def test_upload_job_result(tmp_path, sample):
+    output = str(tmp_path / "out.pdf")
+
+    async def scenario(service, client):
+        status, _, upload = await client.request("POST", "/files", body=sample)
+        assert status == 201
+        status, _, job = await client.request("POST", "/jobs", json_body={"files": [upload["id"]], "margin": 30})
+        assert status == 202
+        assert job["status"] == "queued"
+        await service.jobs[job["id"]].done_event.wait()
+        status, _, info = await client.request("GET", f"/jobs/{job['id']}")
+        assert (status, info["status"], info["pages_out"]) == (200, "done", 3)
+        status, _, _ = await client.request("GET", f"/jobs/{job['id']}/result", output_path=output)
+        assert status == 200
+        status, _, _ = await client.request("DELETE", f"/jobs/{job['id']}")
+        assert status == 204
+        status, _, _ = await client.request("GET", f"/jobs/{job['id']}")
+        assert status == 404
+
+    serve(tmp_path, scenario)
+    reader = PdfReader(output)
+    assert len(reader.pages) == 3
+    assert float(reader.pages[0].mediabox.width) == pytest.approx(625)
+
+
+def chunked(*parts):
+    body = b"".join(b"%x\r\n%s\r\n" % (len(p), p) for p in parts)
+    return b"POST /files HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n" + body + b"0\r\n\r\n"
+
+
+def test_pdf_signature_across_chunks(tmp_path, sample):
+    with open(sample, "rb") as f:
+        pdf = f.read()
+
+    async def scenario(service, client):
+        return (await raw_request(client, chunked(pdf[:2], pdf[2:4], pdf[4:])),
+                await raw_request(client, chunked(b"%P", b"XX", b"-1.7 rest")),
+                await raw_request(client, chunked(b"%PD")))
+
+    assert serve(tmp_path, scenario) == (201, 400, 400)
+
+
+def test_sweep_keeps_uploads_of_pending_jobs(tmp_path, sample):
+    async def scenario(service, client):
+        _, _, used = await client.request("POST", "/files", body=sample)
+        _, _, unused = await client.request("POST", "/files", body=sample)
+        await service._slots.acquire()
+        try:
+            _, _, job = await client.request("POST", "/jobs", json_body={"files": [used["id"]], "margin": 10})
+            service.sweep(now=time.time() + service.ttl + 1)
+            assert list(service.files) == [used["id"]]
+        finally:
+            service._slots.release()
+        await service.jobs[job["id"]].done_event.wait()
+        assert service.jobs[job["id"]].status == "done"
+        service.sweep(now=time.time() + service.ttl + 1)
+        assert not service.files and not service.jobs
+
+    serve(tmp_path, scenario)
+
+
+def test_process_in_one_step(tmp_path, sample):
+    output = str(tmp_path / "booklet.pdf")
+
+    async def scenario(service, client):
+        status, _, _ = await client.request("POST", "/process?mode=booklet&sheet=A3", body=sample,
+                                            output_path=output)
+        assert status == 200
+        # Geçici yükleme ve iş silinmiş olmalı
+        assert await cleaned_up(service)
+
+    serve(tmp_path, scenario)
+    assert len(PdfReader(output).pages) == 2
+
+
+def test_process_failure_is_cleaned_up(tmp_path, sample):
+    async def scenario(service, client):
+        results = {
+            # Sayfa seçimi dosyada olmayan sayfaları istiyor: girdi hatası
+            "bad selection": (await client.request("POST", "/process?mode=pipeline&pipeline=select:7-9",
+                                                   body=sample))[0],
+            "broken pdf": (await client.request("POST", "/process?mode=margin&margin=10",
+                                                body=b"%PDF-1.7\nnot really a pdf"))[0],
+            "ok": (await client.request("POST", "/process?mode=margin&margin=10&fast=false&optimize=0",
+                                        body=sample))[0],
+        }
+        assert await cleaned_up(service)
+        return results
+
+    assert serve(tmp_path, scenario) == {"bad selection": 422, "broken pdf": 422, "ok": 200}
+
+
+def test_full_queue_is_rejected(tmp_path, sample):
+    async def scenario(service, client):
+        _, _, upload = await client.request("POST", "/files", body=sample)
+        spec = {"files": [upload["id"]], "margin": 10}
+        # Tek worker yuvası tutulur: ilk iş kuyrukta bekler, ikincisi sınırı aşar
+        await service._slots.acquire()
+        try:
+            status, _, first = await client.request("POST", "/jobs", json_body=spec)
+            assert status == 202
+            status, headers, body = await client.request("POST", "/jobs", json_body=spec)
+            assert status == 503
+            assert headers["retry-after"] == "5"
+            assert service.metrics()["jobs"]["rejected"] == 1
+        finally:
+            service._slots.release()
+        await service.jobs[first["id"]].done_event.wait()
+        assert service.jobs[first["id"]].status == "done"
+
+    serve(tmp_path, scenario, queue_limit=1)
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    "files",
+    {"files": "abc"},
+    {"files": [1, 2]},
+    {"files": []},
+    {"files": ["x"], "mode": "nope"},
+    {"files": ["x"], "backend": ["pypdf"]},
+    {"files": ["x"], "mode": "pipeline", "pipeline": 5},
+    {"files": ["x"], "fast": "maybe"},
+    {"files": ["x"], "optimize": 1},
+])
+def test_malformed_job_spec(tmp_path, body):
+    async def scenario(service, client):
+        status, _, data = await client.request("POST", "/jobs", json_body=body)
+        assert status == 400, data
+        assert not service.jobs
+
+    serve(tmp_path, scenario)
+
+
+def test_malformed_requests(tmp_path, sample):
+    async def scenario(service, client):
+        with open(sample, "rb") as f:
+            pdf = f.read()
+        results = {
+            "invalid json": (await client.request("POST", "/jobs", body=b"{nope"))[0],
+            "not a pdf": (await client.request("POST", "/files", body=b"hello"))[0],
+            "empty upload": (await client.request("POST", "/files", body=b""))[0],
+            "unknown file": (await client.request("POST", "/jobs", json_body={"files": ["missing"]}))[0],
+            "bad chunk size": await raw_request(
+                client, b"POST /files HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n" + pdf[:10]),
+            "bad content length": await raw_request(client, b"POST /files HTTP/1.1\r\nContent-Length: x\r\n\r\n"),
+            "bad request line": await raw_request(client, b"GARBAGE\r\n\r\n"),
+            "long request line": await raw_request(client, b"GET /" + b"a" * 20000 + b" HTTP/1.1\r\n\r\n"),
+            "huge header": await raw_request(client, b"GET /health HTTP/1.1\r\nX: " + b"a" * 100000 + b"\r\n\r\n"),
+            "many headers": await raw_request(
+                client, b"GET /health HTTP/1.1\r\n" + b"X-A: 1\r\n" * 200 + b"\r\n"),
+        }
+        assert not service.files
+        # Sunucu bozuk isteklerden sonra çalışmaya devam eder
+        assert (await client.request("GET", "/health"))[0] == 200
+        return results
+
+    results = serve(tmp_path, scenario)
+    assert results == {
+        "invalid json": 400, "not a pdf": 400, "empty upload": 400, "unknown file": 404, "bad chunk size": 400,
+        "bad content length": 400, "bad request line": 400, "long request line": 414, "huge header": 431,
+        "many headers": 431,
+    }
+
+
+# Sahte işleyici worker'a fork ile geçer (modül durumu kopyalanır)
+needs_fork = pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="needs the fork start method")
+
+
+@needs_fork
+def test_worker_crash_is_retried(tmp_path, sample, monkeypatch):
+    monkeypatch.setattr(pdf_server, "process_sources", _crashing_process_sources)
+
+    async def scenario(service, client):
+        _, _, upload = await client.request("POST", "/files", body=sample)
+        open(service.files[upload["id"]][0] + ".crash", "w").close()
+        _, _, job = await client.request("POST", "/jobs", json_body={"files": [upload["id"]], "margin": 10})
+        await service.jobs[job["id"]].done_event.wait()
+        assert service.jobs[job["id"]].status == "done"
+        assert service.metrics()["pool_restarts"] == 1
+
+    serve(tmp_path, scenario)
+
+
+@needs_fork
+def test_worker_crash_does_not_break_service(tmp_path, sample, monkeypatch):
+    monkeypatch.setattr(pdf_server, "process_sources", _crashing_process_sources)
+
+    async def scenario(service, client):
+        _, _, upload = await client.request("POST", "/files", body=sample)
+        _, _, bad = await client.request("POST", "/jobs", json_body={"files": [upload["id"]], "mode": "booklet"})
+        await service.jobs[bad["id"]].done_event.wait()
+        status, _, info = await client.request("GET", f"/jobs/{bad['id']}")
+        assert (info["status"], info["error"]) == ("failed", "Worker process crashed")
+        assert service.metrics()["pool_restarts"] == 2  # İlk deneme ve tekrar
+
+        # Tek adımlı istekte çöken iş sunucu hatasıdır ve kayıtları silinir
+        status, _, _ = await client.request("POST", "/process?mode=booklet", body=sample)
+        assert status == 500
+        assert list(service.jobs) == [bad["id"]]
+
+        # Sonraki işler yeni havuzda çalışır
+        _, _, good = await client.request("POST", "/jobs", json_body={"files": [upload["id"]], "margin": 10})
+        await service.jobs[good["id"]].done_event.wait()
+        assert service.jobs[good["id"]].status == "done"
+
+    serve(tmp_path, scenario)
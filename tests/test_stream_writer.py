@@ -0,0 +1,49 @@
+"""pdf_stream_writer: doğrudan stream'lerin tek yazılması ve önbellek boşaltma eşiği."""
+import io
+
+import pytest
+from pypdf import PdfReader
+
+from conftest import make_pdf
+from pdf_pipeline import parse_pipeline, pipeline_pages
+from pdf_stream_writer import StreamingPdfWriter
+
+
+@pytest.fixture
+def source(tmp_path):
+    return make_pdf(str(tmp_path / "in.pdf"), [(595, 842, 0, None), (595, 842, 90, None), (612, 792, 0, None)])
+
+
+def write(source, spec, memory_limit=None):
+    reader = PdfReader(source)
+    buffer = io.BytesIO()
+    writer = StreamingPdfWriter(buffer, memory_limit)
+    pipeline_pages(reader.pages, writer, parse_pipeline(spec, len(reader.pages)))
+    writer.close()
+    return writer, PdfReader(io.BytesIO(buffer.getvalue()))
+
+
+def test_shared_direct_stream_is_written_once(source):
+    writer, out = write(source, "select:1;2;1;2;1")
+    refs = [[ref.idnum for ref in page["/Resources"]["/XObject"].values()] for page in out.pages]
+    assert refs[0] == refs[2] == refs[4] and refs[1] == refs[3] and refs[0] != refs[1]
+    # Kayıtlar nesnelerle birlikte bırakılır (sayfa sayısıyla büyümez)
+    assert not writer._direct_map
+
+
+def test_purge_follows_resolved_bytes(source, monkeypatch):
+    purges = []
+    original = StreamingPdfWriter._purge_sources
+
+    def counting(self):
+        purges.append(self._resolved_bytes)
+        original(self)
+
+    monkeypatch.setattr(StreamingPdfWriter, "_purge_sources", counting)
+    _, out = write(source, "margin:30", memory_limit=10 ** 9)
+    assert not purges and len(out.pages) == 3
+
+    # Her sayfanın içeriği ve kaynakları okunup çözülür: küçük sınırda her sayfadan sonra boşaltılır
+    _, out = write(source, "margin:30", memory_limit=1)
+    assert len(purges) == 3 and all(size > 1 for size in purges)
+    assert [len(page.extract_text()) > 0 for page in out.pages] == [True] * 3
@@ -0,0 +1,96 @@
+"""Klasör izleme: çöken worker ve geçici hatalar izlemeyi durdurmamalı."""
+import multiprocessing
+import os
+
+import pytest
+
+import pdf_watch
+
+from conftest import make_pdf
+
+# Sahte işleyici worker'a fork ile geçer (fonksiyon pickle edilmez, modül durumu kopyalanır)
+pytestmark = pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                                reason="needs the fork start method")
+
+
+def _fake_margin(input_path, output_path, margin, fast=False):
+    name = os.path.basename(input_path)
+    if name.startswith("crash"):
+        os._exit(1)  # Segfault / bellek yetmezliği gibi: worker process ölür
+    flag = input_path + ".fail"
+    if os.path.exists(flag):
+        os.remove(flag)  # Bir kez başarısız olur
+        raise OSError("file is locked")
+    with open(output_path, "wb") as f:
+        f.write(b"%PDF-1.7\n%%EOF\n")
+    return 1
+
+
+@pytest.fixture
+def folders(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_watch, "add_binding_margin", _fake_margin)
+    inbox = tmp_path / "in"
+    inbox.mkdir()
+    return inbox, tmp_path / "out"
+
+
+def _watcher(inbox, outbox, **options):
+    options.setdefault("workers", 1)
+    return pdf_watch.FolderWatcher(str(inbox), str(outbox), settle=0.05, log=lambda *_: None, **options)
+
+
+def test_worker_crash_restarts_pool(folders):
+    inbox, outbox = folders
+    for name in ("a.pdf", "crash.pdf", "b.pdf", "c.pdf"):
+        make_pdf(str(inbox / name), [(200, 200, 0, None)])
+    watcher = _watcher(inbox, outbox, max_attempts=2, retry_delay=0)
+    stats = watcher.run(interval=0.01, once=True)
+
+    assert stats["done"] == 3
+    assert stats["restarts"] == 2
+    for name in ("a", "b", "c"):
+        assert (outbox / f"{name}_delgec.pdf").exists()
+    failure = watcher.state.failures["crash.pdf"]
+    assert failure["attempts"] == 2 and "crashed" in failure["error"]
+
+
+def test_crash_is_charged_only_to_the_crashing_file(folders):
+    inbox, outbox = folders
+    for name in ("a.pdf", "crash.pdf", "b.pdf", "c.pdf"):
+        make_pdf(str(inbox / name), [(200, 200, 0, None)])
+    # Tek deneme hakkı: birlikte çalışan dosyalar da hata sayılsaydı işlenmeden kalırlardı
+    watcher = _watcher(inbox, outbox, workers=2, max_attempts=1, retry_delay=0)
+    stats = watcher.run(interval=0.01, once=True)
+
+    assert stats["done"] == 3 and stats["failed"] == 1
+    for name in ("a", "b", "c"):
+        assert (outbox / f"{name}_delgec.pdf").exists()
+    assert list(watcher.state.failures) == ["crash.pdf"]
+    assert watcher.state.failures["crash.pdf"]["attempts"] == 1
+
+
+def test_transient_failure_is_retried(folders):
+    inbox, outbox = folders
+    path = make_pdf(str(inbox / "locked.pdf"), [(200, 200, 0, None)])
+    open(path + ".fail", "w").close()
+    watcher = _watcher(inbox, outbox, retry_delay=0)
+    stats = watcher.run(interval=0.01, once=True)
+
+    assert stats["failed"] == 1 and stats["done"] == 1
+    assert "locked.pdf" in watcher.state.files and "locked.pdf" not in watcher.state.failures
+
+
+def test_failures_back_off_and_persist(folders):
+    inbox, outbox = folders
+    make_pdf(str(inbox / "crash.pdf"), [(200, 200, 0, None)])
+    watcher = _watcher(inbox, outbox, retry_delay=60)
+    watcher.run(interval=0.01, once=True)
+    assert watcher.state.failures["crash.pdf"]["attempts"] == 1
+
+    # Yeniden başlatmada kayıt okunur: bekleme süresi dolmadan tekrar denenmez, işlenmiş de sayılmaz
+    again = _watcher(inbox, outbox, retry_delay=60)
+    stats = again.run(interval=0.01, once=True)
+    assert stats["failed"] == 0 and stats["done"] == 0
+    signature = tuple(again.state.failures["crash.pdf"]["signature"])
+    assert not again.state.is_done("crash.pdf", signature)
+    assert again.state.retry_wait("crash.pdf", signature) > 0
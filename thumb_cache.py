@@ -0,0 +1,209 @@
+"""Diskte kalıcı küçük resim önbelleği (LRU, boyut sınırlı).
+
+Anahtar: dosya içeriğinin hash'i + sayfa numarası + zoom. Aynı PDF tekrar
+açıldığında sayfalar render edilmeden önbellekten (JPEG) okunur. En uzun süre
+kullanılmayan dosyalar (mtime'a göre) boyut sınırı aşılınca silinir.
+"""
+import collections
+import hashlib
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+DEFAULT_MAX_MB = 256
+MAX_DIGESTS = 1024  # Bellekte hash'i tutulan en fazla dosya
+
+
+def default_cache_dir():
+    """Kullanıcıya ait önbellek klasörü (PDF_MARGIN_CACHE_DIR ile değiştirilebilir)."""
+    override = os.environ.get("PDF_MARGIN_CACHE_DIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "PDF_Margin")
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Dosya içeriğinin SHA-1 hash'i."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_signature(path):
+    """Dosyanın değişip değişmediğini anlamak için (boyut, mtime_ns)."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class DiskCache:
+    """
+    Klasör/2 harflik alt klasör/dosya düzeninde, boyut sınırlı LRU önbellek tabanı.
+    Alt sınıflar suffix'i (sayılan dosya uzantısı) ve gerekirse _roots / _removed'ı belirler.
+    """
+    suffix = ""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._digests = collections.OrderedDict()  # mutlak yol -> (boyut, mtime, hash)
+        self._digest_lock = threading.Lock()
+        self._pinned = collections.Counter()  # evict'in silmeyeceği dosyalar (bu process içinde)
+
+    @contextmanager
+    def pinned(self):
+        """
+        Blok süresince pin(path) ile işaretlenen dosyalar evict ile silinmez. Pin evict ile
+        aynı kilidi aldığı için pin'den sonra yapılan varlık kontrolü blok boyunca geçerlidir.
+        """
+        paths = []
+
+        def pin(path):
+            with self._lock:
+                self._pinned[path] += 1
+            paths.append(path)
+
+        try:
+            yield pin
+        finally:
+            with self._lock:
+                self._pinned.subtract(paths)
+                for path in paths:
+                    if self._pinned[path] <= 0:
+                        del self._pinned[path]
+
+    def file_key(self, path):
+        """Dosyanın içerik hash'i (boyut/mtime değişmedikçe bellekte tutulur)."""
+        key = os.path.abspath(path)
+        signature = file_signature(key)
+        with self._digest_lock:
+            cached = self._digests.get(key)
+            if cached is not None and cached[:2] == signature:
+                self._digests.move_to_end(key)
+                return cached[2]
+        digest = file_digest(key)
+        with self._digest_lock:
+            self._digests[key] = signature + (digest,)
+            self._digests.move_to_end(key)
+            while len(self._digests) > MAX_DIGESTS:
+                self._digests.popitem(last=False)
+        return digest
+
+    def _roots(self):
+        """Alt klasörleri (2 harflik parçalar) taranacak klasörler."""
+        return [self.directory]
+
+    def _entries(self):
+        """(yol, boyut, mtime) listesi."""
+        entries = []
+        for root in self._roots():
+            if not os.path.isdir(root):
+                continue
+            for shard in os.scandir(root):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(self.suffix):
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((entry.path, st.st_size, st.st_mtime))
+        return entries
+
+    def _removed(self, path):
+        """Sınır yüzünden silinen her dosyadan sonra çağrılır (yan dosyaları temizlemek için)."""
+
+    def evict(self):
+        """Sınır aşıldıysa en eski kullanılanlardan başlayarak sınırın %90'ına inene kadar siler."""
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """evict'in gövdesi; _lock tutulurken çağrılır, kalan toplam boyutu döndürür."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return total
+        target = self.max_bytes * 0.9
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= target:
+                break
+            if path in self._pinned:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self._removed(path)
+        return total
+
+
+class ThumbnailCache(DiskCache):
+    suffix = ".jpg"
+
+    def __init__(self, directory=None, max_bytes=None):
+        if directory is None:
+            directory = os.path.join(default_cache_dir(), "thumbs")
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("PDF_MARGIN_THUMB_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        super().__init__(directory, max_bytes)
+        self._total = None  # İlk yazmada hesaplanır
+
+    def _path(self, file_key, page_index, zoom):
+        name = f"{file_key}_{page_index}_{zoom:g}.jpg"
+        return os.path.join(self.directory, file_key[:2], name)
+
+    def get(self, file_key, page_index, zoom):
+        """Önbellekteki JPEG verisini döndürür, yoksa None."""
+        path = self._path(file_key, page_index, zoom)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # LRU için son kullanım zamanını güncelle
+        except OSError:
+            return None
+        return data
+
+    def put(self, file_key, page_index, zoom, data):
+        """JPEG verisini önbelleğe yazar."""
+        path = self._path(file_key, page_index, zoom)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += len(data)
+            over = self._total > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        with self._lock:
+            self._total = self._evict_locked()
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total = 0
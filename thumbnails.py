@@ -0,0 +1,123 @@
+"""Arka planda (Tk ana thread'ini bloklamadan) küçük resim üretimi.
+
+Küçük resimler sıkıştırılmış (JPEG) olarak taşınır; arayüz sadece ekranda
+görünen sayfaları açar. Daha önce render edilmiş sayfalar diskteki önbellekten
+(thumb_cache) doğrudan okunur.
+Tüm PyMuPDF çağrıları tek bir worker thread'de yapılır; sonuçlar thread-safe
+bir kuyruğa konur ve arayüz bunları root.after ile parça parça (batch) alır.
+PyMuPDF ve Pillow ilk dosyada worker thread'de yüklenir (arayüzün açılışı beklemez).
+
+Kuyruğa konan mesajlar:
+    ("open",  job_id, file_path, page_count, (width, height), file_key)
+    ("thumb", job_id, page_index, jpeg_bytes)
+    ("error", job_id, file_path, message)
+    ("done",  job_id)
+"""
+import io
+import queue
+import threading
+
+from pdf_pool import DocumentPool
+from pdf_trace import count, profile, span
+
+THUMB_ZOOM = 0.2
+JPEG_QUALITY = 80
+
+
+def encode_thumbnail(pix):
+    """PyMuPDF pixmap'ini JPEG byte'larına çevirir."""
+    from PIL import Image
+
+    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=JPEG_QUALITY)
+    return buf.getvalue()
+
+
+class ThumbnailLoader:
+    def __init__(self, zoom=THUMB_ZOOM, cache=None, pool=None):
+        """pool: çıktı üretimiyle paylaşılan pdf_pool.DocumentPool (verilmezse kendi havuzu)."""
+        self.zoom = zoom
+        self.cache = cache
+        self.pool = pool if pool is not None else DocumentPool()
+        self.results = queue.Queue()
+        self._jobs = queue.Queue()
+        self._generation = 0  # cancel() her çağrıldığında artar
+        self._next_job_id = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="ThumbnailLoader", daemon=True)
+        self._thread.start()
+
+    def submit(self, file_path):
+        """Dosyayı yükleme kuyruğuna ekler ve iş numarasını döndürür."""
+        with self._lock:
+            self._next_job_id += 1
+            job_id = self._next_job_id
+            generation = self._generation
+        self._jobs.put((job_id, generation, file_path))
+        return job_id
+
+    def cancel(self):
+        """Bekleyen tüm işleri düşürür, çalışan işi bir sonraki sayfada durdurur."""
+        with self._lock:
+            self._generation += 1
+
+    def _is_cancelled(self, generation):
+        return generation != self._generation
+
+    def _run(self):
+        while True:
+            job_id, generation, file_path = self._jobs.get()
+            try:
+                if not self._is_cancelled(generation):
+                    with profile(), span("thumbnails.file", path=file_path):
+                        self._render_file(job_id, generation, file_path)
+            except Exception as e:
+                self.results.put(("error", job_id, file_path, str(e)))
+            self.results.put(("done", job_id))
+
+    def _render_file(self, job_id, generation, file_path):
+        # Belge havuzda açık kalır (çıktı üretimi aynı belgeyi yeniden açmaz); her sayfa
+        # kısa bir kilitle render edilir, böylece aynı anda çalışan iş beklemez.
+        with self.pool.document(file_path) as doc:
+            page_count = doc.page_count
+            if page_count:
+                first = doc[0].rect
+                size = (int(first.width * self.zoom), int(first.height * self.zoom))
+            else:
+                size = (0, 0)
+
+        file_key = None
+        if self.cache is not None:
+            try:
+                file_key = self.cache.file_key(file_path)
+            except OSError:
+                file_key = None
+        self.results.put(("open", job_id, file_path, page_count, size, file_key))
+
+        for i in range(page_count):
+            if self._is_cancelled(generation):
+                return
+            self.results.put(("thumb", job_id, i, self.page_data(file_path, file_key, i)))
+
+    def page_data(self, file_path, file_key, page_index):
+        """
+        Sayfanın JPEG byte'ları: önce disk önbelleğinden, yoksa render edilip önbelleğe
+        yazılır. Arayüz bellekten bıraktığı küçük resimleri de bununla geri okur.
+        """
+        import fitz  # PyMuPDF
+
+        if file_key is not None:
+            data = self.cache.get(file_key, page_index, self.zoom)
+            if data is not None:
+                count("thumbnail_cache_hits")
+                return data
+        matrix = fitz.Matrix(self.zoom, self.zoom)
+        with span("thumbnails.render", page=page_index), self.pool.document(file_path) as doc:
+            pix = doc[page_index].get_pixmap(matrix=matrix)
+        with span("thumbnails.encode", page=page_index):
+            data = encode_thumbnail(pix)
+        # Önbelleğe sonuç kuyruğa konmadan yazılır: arayüz bıraktığı veriyi hemen geri okuyabilir
+        if file_key is not None:
+            self.cache.put(file_key, page_index, self.zoom, data)
+        return data